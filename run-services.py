@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Start Insurance Service, Patient Service and the Frontend from services.toml
+
+    prod  one gunicorn master per service: uvicorn workers (uvicorn-worker) for
+          the FastAPI services, threaded gthread workers for Flask; worker
+          count from the CPU count, workers recycled after max_requests,
+          graceful reload on SIGHUP
+    dev   one process per service with auto-reload (uvicorn --reload,
+          flask --debug)
+
+Services start in depends_on order, each one once the services it depends on
+answer their health URL (no fixed sleeps). Ctrl+C / SIGTERM stops them
+gracefully in reverse order; if one of them dies, the others are stopped too.
+
+Sử dụng:
+    python3 run-services.py                          # start everything (mode from services.toml)
+    python3 run-services.py start --dev              # auto-reload, one process per service
+    python3 run-services.py start --only patient_backend frontend
+    python3 run-services.py reload                   # graceful reload of every service
+    python3 run-services.py reload frontend          # graceful reload of one service
+    python3 run-services.py stop
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from types import SimpleNamespace
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_CONFIG = ROOT / "services.toml"
+ASGI_WORKER_CLASS = "uvicorn_worker.UvicornWorker"
+LAUNCHER_PID_FILE = "launcher.pid"
+
+
+def load_config(path: Path):
+    """(launcher settings, services by name, run directory)"""
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+    launcher = config.get("launcher", {})
+    defaults = config.get("defaults", {})
+    services = {}
+    for name, settings in config.get("services", {}).items():
+        service = {**defaults, **settings, "name": name}
+        service["path"] = (path.parent / settings["path"]).resolve()
+        service.setdefault("depends_on", [])
+        service["url"] = f"http://127.0.0.1:{service['port']}"
+        services[name] = service
+    for service in services.values():
+        unknown = [name for name in service["depends_on"] if name not in services]
+        if unknown:
+            raise SystemExit(f"❌ {service['name']}: unknown depends_on {unknown}")
+    return launcher, services, (path.parent / launcher.get("run_dir", ".run")).resolve()
+
+
+def start_order(services: dict) -> list:
+    """Service names, dependencies first"""
+    order, visiting = [], set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise SystemExit(f"❌ depends_on cycle through {name}")
+        visiting.add(name)
+        for dependency in services[name]["depends_on"]:
+            visit(dependency)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in services:
+        visit(name)
+    return order
+
+
+def worker_count(value) -> int:
+    if value == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+def python_for(service: dict) -> str:
+    """The service's own venv if it has one (like run-all.py), else this interpreter"""
+    if service.get("python"):
+        return service["python"]
+    for candidate in ("venv/bin/python3", "venv/Scripts/python.exe"):
+        if (service["path"] / candidate).exists():
+            return str(service["path"] / candidate)
+    return sys.executable
+
+
+def build_command(service: dict, mode: str, host: str, run_dir: Path) -> list:
+    python = python_for(service)
+    port = str(service["port"])
+    if mode == "dev":
+        if service["kind"] == "asgi":
+            return [python, "-m", "uvicorn", service["app"], "--host", host, "--port", port, "--reload"]
+        return [python, "-m", "flask", "--app", service["app"].split(":")[0], "run",
+                "--debug", "--host", host, "--port", port]
+
+    command = [
+        python, "-m", "gunicorn", service["app"],
+        "--bind", f"{host}:{port}",
+        "--workers", str(worker_count(service.get("workers", "auto"))),
+        "--max-requests", str(service.get("max_requests", 0)),
+        "--max-requests-jitter", str(service.get("max_requests_jitter", 0)),
+        "--graceful-timeout", str(service.get("graceful_timeout", 30)),
+        "--timeout", str(service.get("timeout", 60)),
+        "--keep-alive", str(service.get("keep_alive", 5)),
+        "--pid", str(run_dir / f"{service['name']}.pid"),
+    ]
+    if service["kind"] == "asgi":
+        command += ["--worker-class", ASGI_WORKER_CLASS]
+    else:
+        command += ["--worker-class", "gthread", "--threads", str(service.get("threads", 8))]
+    return command
+
+
+def build_env(service: dict, services: dict, mode: str, run_dir: Path) -> dict:
+    """Inherited environment plus the service's [env] table ({name.url} / {name.port} are filled in)"""
+    env = dict(os.environ)
+    references = {name: SimpleNamespace(url=other["url"], port=other["port"]) for name, other in services.items()}
+    for key, value in service.get("env", {}).items():
+        # Variables already set in the environment win over the file
+        env.setdefault(key, str(value).format_map(references))
+    if mode == "prod":
+        env["WORKER_LEADER_LOCK"] = str(run_dir / f"{service['name']}.leader.lock")
+        # Lets a service refuse settings that only work in a single process
+        env["WEB_CONCURRENCY"] = str(worker_count(service.get("workers", "auto")))
+    return env
+
+
+def missing_env(service: dict, env: dict, mode: str) -> list:
+    """required_env entries that are unset (only checked for multi-worker prod launches)"""
+    if mode != "prod" or worker_count(service.get("workers", "auto")) < 2:
+        return []
+    return [key for key in service.get("required_env", []) if not env.get(key)]
+
+
+def wait_ready(service: dict, process: subprocess.Popen, timeout: float) -> bool:
+    """Poll the health URL until it answers (any status below 500)"""
+    url = service["url"] + service.get("health", "/")
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return True
+        except urllib.error.HTTPError as e:
+            if e.code < 500:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+class Launcher:
+    def __init__(self, launcher: dict, services: dict, run_dir: Path, mode: str):
+        self.services = services
+        self.run_dir = run_dir
+        self.mode = mode
+        self.host = launcher.get("host", "0.0.0.0")
+        self.ready_timeout = float(launcher.get("ready_timeout", 60))
+        self.stop_timeout = float(launcher.get("stop_timeout", 40))
+        self.processes = {}
+        self.stop_requested = False
+        self.reload_requested = False
+
+    def start(self, names: list) -> bool:
+        for name in names:
+            service = self.services[name]
+            command = build_command(service, self.mode, self.host, self.run_dir)
+            env = build_env(service, self.services, self.mode, self.run_dir)
+            missing = missing_env(service, env, self.mode)
+            if missing:
+                print(f"❌ {name} needs {', '.join(missing)} in the environment to run more than one worker")
+                return False
+            workers = "" if self.mode == "dev" else f", {command[command.index('--workers') + 1]} workers"
+            print(f"🚀 Starting {name} on port {service['port']} ({self.mode}{workers})...")
+            self.processes[name] = subprocess.Popen(
+                command,
+                cwd=service["path"],
+                env=env,
+                # Own process group: Ctrl+C reaches only the launcher, which stops services gracefully
+                start_new_session=True,
+            )
+            if not wait_ready(service, self.processes[name], self.ready_timeout):
+                print(f"❌ {name} did not become healthy at {service['url']}{service.get('health', '/')}")
+                if self.mode == "prod":
+                    print("   Are gunicorn and uvicorn-worker installed? (pip install -r requirements.txt)")
+                return False
+            print(f"✅ {name} ready: {service['url']}")
+            if self.stop_requested:
+                return False
+        return True
+
+    def reload(self):
+        if self.mode == "dev":
+            print("ℹ️  dev mode reloads on file changes; nothing to do")
+            return
+        for name, process in self.processes.items():
+            if process.poll() is None:
+                print(f"🔄 Reloading {name} (new workers start, old ones finish their requests)")
+                process.send_signal(signal.SIGHUP)
+
+    def stop(self):
+        running = [(name, process) for name, process in reversed(list(self.processes.items())) if process.poll() is None]
+        for name, process in running:
+            print(f"🛑 Stopping {name}...")
+            # gunicorn and uvicorn both treat SIGTERM as a graceful shutdown
+            process.terminate()
+        deadline = time.monotonic() + self.stop_timeout
+        for name, process in running:
+            try:
+                process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                print(f"⚠️  {name} did not stop in {self.stop_timeout:.0f}s, killing it")
+                process.kill()
+                process.wait()
+
+    def supervise(self) -> int:
+        while not self.stop_requested:
+            if self.reload_requested:
+                self.reload_requested = False
+                self.reload()
+            for name, process in self.processes.items():
+                if process.poll() is not None:
+                    print(f"❌ {name} exited with code {process.returncode}; stopping the others")
+                    return 1
+            time.sleep(0.5)
+        return 0
+
+
+def start(args, config_path: Path) -> int:
+    launcher_settings, services, run_dir = load_config(config_path)
+    mode = "dev" if args.dev else launcher_settings.get("mode", "prod")
+    names = start_order(services)
+    if args.only:
+        unknown = [name for name in args.only if name not in services]
+        if unknown:
+            raise SystemExit(f"❌ Unknown service(s): {', '.join(unknown)} (known: {', '.join(services)})")
+        names = [name for name in names if name in args.only]
+
+    run_dir.mkdir(parents=True, exist_ok=True)
+    pid_file = run_dir / LAUNCHER_PID_FILE
+    pid_file.write_text(str(os.getpid()))
+
+    launcher = Launcher(launcher_settings, services, run_dir, mode)
+
+    def request_stop(sig, frame):
+        launcher.stop_requested = True
+
+    def request_reload(sig, frame):
+        launcher.reload_requested = True
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, request_reload)
+
+    print("🏥 Starting Hospital Management System...")
+    print("=" * 60)
+    try:
+        if not launcher.start(names):
+            return 1
+        print("=" * 60)
+        for name in names:
+            print(f"   {name:<16} {services[name]['url']}")
+        print(f"⏹️  Ctrl+C to stop, `python3 {Path(__file__).name} reload` for a graceful reload")
+        return launcher.supervise()
+    finally:
+        launcher.stop()
+        pid_file.unlink(missing_ok=True)
+
+
+def send_signal(pid_file: Path, sig, what: str) -> int:
+    try:
+        pid = int(pid_file.read_text())
+        os.kill(pid, sig)
+    except (FileNotFoundError, ValueError, ProcessLookupError):
+        print(f"❌ {what} is not running (no live pid in {pid_file})")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", type=Path, default=DEFAULT_CONFIG, help="Launch configuration (TOML)")
+    commands = parser.add_subparsers(dest="command")
+    start_parser = commands.add_parser("start", help="Start services and supervise them (default)")
+    start_parser.add_argument("--dev", action="store_true", help="One process per service with auto-reload")
+    start_parser.add_argument("--only", nargs="+", metavar="SERVICE", help="Start only these services")
+    reload_parser = commands.add_parser("reload", help="Graceful reload: replace workers without dropping requests")
+    reload_parser.add_argument("service", nargs="?", help="Reload only this service")
+    commands.add_parser("stop", help="Stop a running launcher and its services")
+    args = parser.parse_args()
+
+    if args.command in (None, "start"):
+        args.dev = getattr(args, "dev", False)
+        args.only = getattr(args, "only", None)
+        sys.exit(start(args, args.config))
+
+    _, services, run_dir = load_config(args.config)
+    if args.command == "stop":
+        sys.exit(send_signal(run_dir / LAUNCHER_PID_FILE, signal.SIGTERM, "The launcher"))
+    if args.service:
+        if args.service not in services:
+            raise SystemExit(f"❌ Unknown service: {args.service} (known: {', '.join(services)})")
+        sys.exit(send_signal(run_dir / f"{args.service}.pid", signal.SIGHUP, args.service))
+    sys.exit(send_signal(run_dir / LAUNCHER_PID_FILE, signal.SIGHUP, "The launcher"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+Modules shared by the Patient Service and the Insurance Service
+
+    instrumentation  request metrics, Server-Timing spans, profiling
+    slow_queries     slow MongoDB operation log with explain capture
+    http_caching     ETag / If-None-Match and gzip/brotli for GET responses
+    worker_leader    one worker per service runs the once-per-service jobs
+    stream_readers   chunked upload decoding and streaming CSV parsing
+"""
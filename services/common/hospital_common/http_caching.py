@@ -0,0 +1,161 @@
+"""
+Conditional GET and response compression
+
+ConditionalCompressionMiddleware (pure ASGI) looks at GET responses whose body
+arrives in a single message (every JSON endpoint; streamed NDJSON/CSV exports
+and batch validation pass through untouched):
+
+    ETag         a 200 JSON response without one gets a weak ETag hashed from
+                 its body; endpoints that can derive one more cheaply (the
+                 patient detail from updated_at) set it themselves
+    304          when If-None-Match matches the ETag, the body is dropped and
+                 the client reuses its copy
+    compression  bodies of at least minimum_size are sent with brotli when the
+                 client accepts it and the brotli package is installed,
+                 otherwise gzip, with Vary: Accept-Encoding
+
+The ETag is computed before compression, so it names the representation
+whatever encoding the client negotiated.
+"""
+
+import gzip
+from hashlib import blake2b
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Headers a 304 keeps (RFC 9110 section 15.4.5); body-describing ones are dropped
+NOT_MODIFIED_DROP = {b"content-length", b"content-type", b"content-encoding"}
+
+
+def weak_etag(value: str) -> str:
+    return f'W/"{value}"'
+
+
+def body_etag(body: bytes) -> str:
+    return weak_etag(blake2b(body, digest_size=16).hexdigest())
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison is weak: W/"x" and "x" match each other"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    """Codings in Accept-Encoding that are not refused with q=0"""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted
+
+
+class ConditionalCompressionMiddleware:
+    """Pure ASGI middleware; the response start is held until the first body message"""
+
+    def __init__(self, app, etags: bool = True, compress: bool = True, minimum_size: int = 1024,
+                 gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.etags = etags
+        self.compress = compress
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoding_for(self, accept_encoding: Optional[str]) -> Optional[str]:
+        accepted = accepted_encodings(accept_encoding)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+    def _encode(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        if_none_match = request_headers.get("if-none-match")
+        accept_encoding = request_headers.get("accept-encoding")
+        start = None
+
+        async def send_conditional(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] == "http.response.body" and start is not None:
+                held, start = start, None
+                if not message.get("more_body", False):
+                    held, message = self._finish(held, message, if_none_match, accept_encoding)
+                await send(held)
+            await send(message)
+
+        await self.app(scope, receive, send_conditional)
+
+    def _finish(self, start: dict, message: dict, if_none_match: Optional[str], accept_encoding: Optional[str]):
+        if start["status"] != 200:
+            return start, message
+        headers = MutableHeaders(scope=start)
+        body = message.get("body", b"")
+        compressible = (
+            self.compress
+            and len(body) >= self.minimum_size
+            and "content-encoding" not in headers
+            and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+        )
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+
+        etag = headers.get("etag")
+        if etag is None and self.etags and headers.get("content-type", "").startswith("application/json"):
+            etag = headers["ETag"] = body_etag(body)
+        if etag is not None and etag_matches(if_none_match, etag):
+            not_modified = {
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(key, value) for key, value in start["headers"] if key not in NOT_MODIFIED_DROP],
+            }
+            return not_modified, {"type": "http.response.body", "body": b""}
+
+        encoding = self._encoding_for(accept_encoding) if compressible else None
+        if encoding is None:
+            return start, message
+        compressed = self._encode(encoding, body)
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+        return start, {"type": "http.response.body", "body": compressed}
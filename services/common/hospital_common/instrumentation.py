@@ -0,0 +1,356 @@
+"""
+Request instrumentation: per-route latency histograms, span breakdown, profiling
+
+RequestMetricsMiddleware times every HTTP request and records it under its
+route template (the path with its {placeholders}, not the concrete URL).
+While a request runs, a RequestSpans object in a context variable collects the time
+spent in:
+
+    mongo     every MongoDB command (MongoCommandTimer, a pymongo command
+              listener; Motor copies the context into its executor threads)
+    http      outbound httpx calls, timed with span("http") at the call site
+    password  bcrypt hashing/verification in the Patient Service, span("password")
+
+The breakdown goes back to the client in a Server-Timing header ("app" is the
+rest: validation, endpoint code, serialization) and is summed per route.
+RequestMetrics.render() returns everything in the Prometheus text format.
+
+Profiling is off unless a ProfileStore is passed to the middleware. Then a
+request sent with "X-Profile: cprofile" or "X-Profile: pyinstrument" plus a
+matching X-Internal-Token (profile_token), or picked at random with sample_rate,
+runs under that profiler; the report is kept in the store and its id returned
+in X-Profile-Id. Without a profile_token X-Profile is ignored. pyinstrument is
+optional.
+"""
+
+import cProfile
+import io
+import itertools
+import pstats
+import random
+import secrets
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional
+
+from pymongo import monitoring
+from starlette.datastructures import MutableHeaders
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:
+    PyinstrumentProfiler = None
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; the last bucket (+Inf) is implicit
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILERS = ("cprofile", "pyinstrument")
+PROFILE_TOP_FUNCTIONS = 60
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self):
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.buckets[bisect_left(DURATION_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+
+class RequestSpans:
+    """Time per span name for the current request: name -> [calls, seconds]"""
+    __slots__ = ("totals",)
+
+    def __init__(self):
+        self.totals: Dict[str, list] = {}
+
+    def add(self, name: str, seconds: float):
+        total = self.totals.get(name)
+        if total is None:
+            self.totals[name] = [1, seconds]
+        else:
+            total[0] += 1
+            total[1] += seconds
+
+    def server_timing(self, elapsed: float) -> str:
+        parts = []
+        spent = 0.0
+        for name, (calls, seconds) in self.totals.items():
+            spent += seconds
+            parts.append(f'{name};dur={seconds * 1000:.1f};desc="{calls} calls"')
+        # Spans can overlap (concurrent Mongo calls), so "app" is clamped at zero
+        parts.append(f"app;dur={max(0.0, elapsed - spent) * 1000:.1f}")
+        parts.append(f"total;dur={elapsed * 1000:.1f}")
+        return ", ".join(parts)
+
+
+current_spans: ContextVar[Optional[RequestSpans]] = ContextVar("current_spans", default=None)
+
+
+@contextmanager
+def span(name: str):
+    """Add the time spent in the block to the current request's span breakdown"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans = current_spans.get()
+        if spans is not None:
+            spans.add(name, time.perf_counter() - started)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class RequestMetrics:
+    """Process-wide request, span and MongoDB command counters"""
+
+    def __init__(self):
+        self.requests: Dict[tuple, Histogram] = {}
+        self.spans: Dict[tuple, list] = {}
+        self.commands: Dict[str, list] = {}
+        self.in_flight = 0
+        # Command listener callbacks run in Motor's executor threads
+        self._commands_lock = threading.Lock()
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, spans: RequestSpans):
+        key = (method, route, status)
+        histogram = self.requests.get(key)
+        if histogram is None:
+            histogram = self.requests[key] = Histogram()
+        histogram.observe(seconds)
+        for name, (calls, span_seconds) in list(spans.totals.items()):
+            total = self.spans.setdefault((route, name), [0, 0.0])
+            total[0] += calls
+            total[1] += span_seconds
+
+    def observe_command(self, command: str, seconds: float, failed: bool):
+        with self._commands_lock:
+            total = self.commands.get(command)
+            if total is None:
+                total = self.commands[command] = [0, 0, 0.0]
+            total[0] += 1
+            total[1] += failed
+            total[2] += seconds
+
+    def render(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus text exposition; gauges are extra name -> value pairs from the service"""
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route template",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), histogram in sorted(self.requests.items()):
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS + ("+Inf",), histogram.buckets):
+                cumulative += count
+                lines.append("http_request_duration_seconds_bucket"
+                             f"{_labels(method=method, route=route, status=status, le=bound)} {cumulative}")
+            labels = _labels(method=method, route=route, status=status)
+            lines.append(f"http_request_duration_seconds_sum{labels} {histogram.sum:.6f}")
+            lines.append(f"http_request_duration_seconds_count{labels} {histogram.count}")
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_request_span_seconds_total Time spent per span (mongo, http, password) by route",
+            "# TYPE http_request_span_seconds_total counter",
+        ]
+        spans = sorted(self.spans.items())
+        lines += [f"http_request_span_seconds_total{_labels(route=route, span=name)} {seconds:.6f}"
+                  for (route, name), (_, seconds) in spans]
+        lines += [
+            "# HELP http_request_span_calls_total Calls per span by route",
+            "# TYPE http_request_span_calls_total counter",
+        ]
+        lines += [f"http_request_span_calls_total{_labels(route=route, span=name)} {calls}"
+                  for (route, name), (calls, _) in spans]
+
+        with self._commands_lock:
+            commands = sorted((name, list(total)) for name, total in self.commands.items())
+        lines += [
+            "# HELP mongodb_commands_total MongoDB commands sent, by command name",
+            "# TYPE mongodb_commands_total counter",
+        ]
+        lines += [f"mongodb_commands_total{_labels(command=name)} {total[0]}" for name, total in commands]
+        lines += [
+            "# HELP mongodb_command_failures_total MongoDB commands that failed",
+            "# TYPE mongodb_command_failures_total counter",
+        ]
+        lines += [f"mongodb_command_failures_total{_labels(command=name)} {total[1]}" for name, total in commands]
+        lines += [
+            "# HELP mongodb_command_seconds_total Server round-trip time of MongoDB commands",
+            "# TYPE mongodb_command_seconds_total counter",
+        ]
+        lines += [f"mongodb_command_seconds_total{_labels(command=name)} {total[2]:.6f}" for name, total in commands]
+
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Pass to the Mongo client as event_listeners=[...]"""
+
+    def __init__(self, metrics: RequestMetrics):
+        self.metrics = metrics
+
+    def _record(self, event, failed: bool):
+        seconds = event.duration_micros / 1_000_000
+        self.metrics.observe_command(event.command_name, seconds, failed)
+        spans = current_spans.get()
+        if spans is not None:
+            spans.add("mongo", seconds)
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, False)
+
+    def failed(self, event):
+        self._record(event, True)
+
+
+class ProfileStore:
+    """The last `keep` profile reports, newest last"""
+
+    def __init__(self, keep: int):
+        self._profiles = deque(maxlen=keep)
+        self._ids = itertools.count(1)
+        self.active = False
+
+    def next_id(self) -> str:
+        return str(next(self._ids))
+
+    def add(self, profile_id: str, profiler: str, method: str, path: str, seconds: float, report: str):
+        self._profiles.append({
+            "id": profile_id,
+            "profiler": profiler,
+            "method": method,
+            "path": path,
+            "duration_ms": round(seconds * 1000, 2),
+            "captured_at": datetime.utcnow().isoformat(),
+            "report": report,
+        })
+
+    def list(self) -> list:
+        return [{key: value for key, value in profile.items() if key != "report"} for profile in self._profiles]
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        return next((profile for profile in self._profiles if profile["id"] == profile_id), None)
+
+
+class _CProfileCapture:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self) -> str:
+        self.profile.disable()
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        return out.getvalue()
+
+
+class _PyinstrumentCapture:
+    def __init__(self):
+        self.profiler = PyinstrumentProfiler(async_mode="enabled")
+        self.profiler.start()
+
+    def stop(self) -> str:
+        self.profiler.stop()
+        return self.profiler.output_text(unicode=True)
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware task/queue per request)"""
+
+    def __init__(self, app, metrics: RequestMetrics, profiles: Optional[ProfileStore] = None,
+                 sample_rate: float = 0.0, default_profiler: str = "cprofile", profile_token: str = ""):
+        self.app = app
+        self.metrics = metrics
+        self.profiles = profiles
+        self.sample_rate = sample_rate
+        self.default_profiler = default_profiler
+        self.profile_token = profile_token.encode()
+
+    def _profiler_for(self, scope) -> Optional[str]:
+        # One capture at a time: cProfile hooks the whole thread, so concurrent captures would clash
+        if self.profiles is None or self.profiles.active:
+            return None
+        headers = dict(scope["headers"])
+        requested = headers.get(b"x-profile")
+        # Profiling on demand costs CPU and the reports expose call stacks: internal callers only
+        if requested is not None and not (
+            self.profile_token and secrets.compare_digest(headers.get(b"x-internal-token", b""), self.profile_token)
+        ):
+            requested = None
+        if requested is not None:
+            requested = requested.decode().lower()
+        if requested is None:
+            if not self.sample_rate or random.random() >= self.sample_rate:
+                return None
+            requested = self.default_profiler
+        if requested not in PROFILERS:
+            requested = self.default_profiler
+        if requested == "pyinstrument" and PyinstrumentProfiler is None:
+            requested = "cprofile"
+        return requested
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans = RequestSpans()
+        token = current_spans.set(spans)
+        started = time.perf_counter()
+        status = 500
+        profiler = self._profiler_for(scope)
+        profile_id = self.profiles.next_id() if profiler else None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", spans.server_timing(time.perf_counter() - started))
+                if profile_id:
+                    headers.append("X-Profile-Id", profile_id)
+            await send(message)
+
+        capture = None
+        if profiler:
+            self.profiles.active = True
+            capture = _PyinstrumentCapture() if profiler == "pyinstrument" else _CProfileCapture()
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.metrics.in_flight -= 1
+            current_spans.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.metrics.observe_request(scope["method"], route, status, elapsed, spans)
+            if capture:
+                self.profiles.active = False
+                self.profiles.add(profile_id, profiler, scope["method"], scope["path"], elapsed, capture.stop())
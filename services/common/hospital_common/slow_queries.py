@@ -0,0 +1,257 @@
+"""
+Slow MongoDB operation log
+
+SlowQueryLog is a pymongo command listener: every find/aggregate/count/
+distinct/update/delete/findAndModify slower than the threshold is recorded in
+a bounded ring buffer with its query shape, duration and documents returned.
+Shapes keep field names and operators but replace every value with "?", so
+{"full_name": {"$regex": "nguyen", "$options": "i"}} is logged as
+{"full_name": {"$regex": "?", "$options": "?"}} and no patient data lands in
+the log.
+
+The first time a read shape is seen slow, the command is explained with
+executionStats on the event loop and the plan summary (winning stages such
+as COLLSCAN or IXSCAN, index used, keys and documents examined) is attached
+to that shape. Later occurrences reuse it.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from pymongo import monitoring
+
+# command name -> where its filter lives
+FILTER_PATHS = {
+    "find": ("filter",),
+    "count": ("query",),
+    "distinct": ("query",),
+    "findAndModify": ("query",),
+    "aggregate": ("pipeline",),
+    "update": ("updates", 0, "q"),
+    "delete": ("deletes", 0, "q"),
+}
+
+# Only reads are explained; these are the fields each one needs
+EXPLAIN_FIELDS = {
+    "find": ("find", "filter", "sort", "projection", "skip", "limit", "hint", "collation"),
+    "count": ("count", "query", "skip", "limit", "hint", "collation"),
+    "distinct": ("distinct", "key", "query", "collation"),
+    "aggregate": ("aggregate", "pipeline", "hint", "collation", "cursor"),
+}
+
+# Distinct shapes kept for the per-shape summary; the oldest is dropped past this
+MAX_SHAPES = 1000
+
+
+def query_shape(value):
+    """The query with every value replaced by "?" (lists of scalars collapse to ["?"])"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [query_shape(item) for item in value]
+        return ["?"]
+    return "?"
+
+
+def _dig(document, path):
+    for key in path:
+        try:
+            document = document[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return document
+
+
+def _plan_stages(plan: dict, stages: list, indexes: list):
+    stage = plan.get("stage")
+    if stage:
+        stages.append(stage)
+    if plan.get("indexName"):
+        indexes.append(plan["indexName"])
+    for child in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(child), dict):
+            _plan_stages(plan[child], stages, indexes)
+    for child in plan.get("inputStages", []):
+        _plan_stages(child, stages, indexes)
+
+
+def summarize_explain(explain: dict) -> dict:
+    """Winning plan stages, index names and examined counts from an executionStats explain"""
+    if "stages" in explain:
+        # aggregate: the query part sits in the first stage's $cursor
+        explain = explain["stages"][0].get("$cursor", {})
+    planner = explain.get("queryPlanner", {})
+    stats = explain.get("executionStats", {})
+    stages, indexes = [], []
+    _plan_stages(planner.get("winningPlan", {}), stages, indexes)
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "collscan": "COLLSCAN" in stages,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis"),
+    }
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Pass to the Mongo client as event_listeners=[...], then attach() it once the client exists"""
+
+    def __init__(self, threshold_ms: float, keep: int, explain: bool = True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self._entries = deque(maxlen=keep)
+        self._shapes = {}
+        self._pending = {}
+        # Listener callbacks run in Motor's executor threads
+        self._lock = threading.Lock()
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._explain_tasks = set()
+        self.recorded = 0
+
+    def attach(self, client, loop: asyncio.AbstractEventLoop):
+        """Give the log the async client and loop it uses to run explain"""
+        self._client = client
+        self._loop = loop
+
+    def started(self, event):
+        if event.command_name in FILTER_PATHS:
+            with self._lock:
+                self._pending[(event.connection_id, event.request_id)] = (event.command, event.database_name)
+
+    def succeeded(self, event):
+        self._finish(event, None)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure.get("errmsg", "")) if isinstance(event.failure, dict) else "failed")
+
+    def _finish(self, event, error: Optional[str]):
+        if event.command_name not in FILTER_PATHS:
+            return
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if pending is None or duration_ms < self.threshold_ms:
+            return
+        command, database_name = pending
+        self.record(event.command_name, database_name, command, duration_ms, error,
+                    reply=getattr(event, "reply", None))
+
+    def record(self, command_name: str, database_name: str, command: dict, duration_ms: float,
+               error: Optional[str] = None, reply: Optional[dict] = None):
+        collection = command.get(command_name)
+        shape = {"filter": query_shape(_dig(command, FILTER_PATHS[command_name]) or {})}
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+        shape_key = json.dumps([command_name, database_name, collection, shape], sort_keys=True, default=str)
+
+        returned = None
+        if reply and isinstance(reply.get("cursor"), dict):
+            returned = len(reply["cursor"].get("firstBatch", []))
+        elif reply and "n" in reply:
+            returned = reply["n"]
+
+        entry = {
+            "at": datetime.utcnow().isoformat(),
+            "command": command_name,
+            "database": database_name,
+            "collection": collection,
+            "shape": shape,
+            "duration_ms": round(duration_ms, 2),
+            "returned": returned,
+            "error": error,
+            "shape_key": shape_key,
+        }
+        with self._lock:
+            self.recorded += 1
+            self._entries.append(entry)
+            known = self._shapes.get(shape_key)
+            if known is None:
+                if len(self._shapes) >= MAX_SHAPES:
+                    self._shapes.pop(next(iter(self._shapes)))
+                known = self._shapes[shape_key] = {
+                    "command": command_name,
+                    "database": database_name,
+                    "collection": collection,
+                    "shape": shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "first_seen": entry["at"],
+                    "plan": None,
+                }
+            known["count"] += 1
+            known["total_ms"] += duration_ms
+            known["max_ms"] = max(known["max_ms"], duration_ms)
+            known["last_seen"] = entry["at"]
+            is_new = known["count"] == 1
+
+        if is_new:
+            print(f"🐢 Slow {command_name} on {collection} ({duration_ms:.0f}ms): {json.dumps(shape, default=str)}")
+            if self.explain and command_name in EXPLAIN_FIELDS and self._loop is not None and self._client is not None:
+                explain_command = {
+                    field: command[field] for field in EXPLAIN_FIELDS[command_name] if field in command
+                }
+                self._loop.call_soon_threadsafe(self._start_explain, shape_key, database_name, explain_command)
+
+    def _start_explain(self, shape_key: str, database_name: str, command: dict):
+        task = asyncio.ensure_future(self._run_explain(shape_key, database_name, command))
+        self._explain_tasks.add(task)
+        task.add_done_callback(self._explain_tasks.discard)
+
+    async def _run_explain(self, shape_key: str, database_name: str, command: dict):
+        started = time.perf_counter()
+        try:
+            explain = await self._client[database_name].command(
+                {"explain": command, "verbosity": "executionStats"}
+            )
+            plan = summarize_explain(explain)
+        except Exception as e:
+            plan = {"error": str(e)}
+        plan["explain_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        with self._lock:
+            if shape_key in self._shapes:
+                self._shapes[shape_key]["plan"] = plan
+
+    def entries(self, limit: Optional[int] = None) -> list:
+        """Recorded slow operations, newest first, with the plan of their shape"""
+        with self._lock:
+            entries = list(self._entries)[::-1][:limit]
+            plans = {key: shape["plan"] for key, shape in self._shapes.items()}
+        return [
+            {**{k: v for k, v in entry.items() if k != "shape_key"}, "plan": plans.get(entry["shape_key"])}
+            for entry in entries
+        ]
+
+    def shapes(self) -> list:
+        """One row per query shape seen slow, slowest total first"""
+        with self._lock:
+            shapes = [dict(shape) for shape in self._shapes.values()]
+        for shape in shapes:
+            shape["avg_ms"] = round(shape["total_ms"] / shape["count"], 2)
+            shape["total_ms"] = round(shape["total_ms"], 2)
+            shape["max_ms"] = round(shape["max_ms"], 2)
+        return sorted(shapes, key=lambda shape: shape["total_ms"], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._shapes.clear()
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "explain": self.explain,
+            "recorded": self.recorded,
+            "buffered": len(self._entries),
+            "capacity": self._entries.maxlen,
+            "distinct_shapes": len(self._shapes),
+        }
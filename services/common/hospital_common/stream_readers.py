@@ -0,0 +1,65 @@
+"""
+Streaming readers for uploaded files (patient import, card registry load)
+
+iter_lines() decodes a chunked byte stream (UTF-8, optional BOM) into lines,
+chunk boundaries included. iter_csv_rows() parses CSV with a single csv.reader
+fed from those lines, so quoted fields may contain newlines and span chunks.
+"""
+
+import codecs
+import csv
+from collections import deque
+from typing import AsyncIterator, List
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], keepends: bool = False) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines (UTF-8, optional BOM), chunk boundaries included"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n" if keepends else line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending.rstrip("\r"):
+        yield pending if keepends else pending.rstrip("\r")
+
+
+class _LineFeed:
+    """Line iterator for csv.reader, topped up as the byte stream arrives"""
+
+    def __init__(self):
+        self.lines = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """
+    Parse a CSV byte stream with one csv.reader, yielding each record's values (blank lines skipped)
+    Lines keep their newlines and are handed to the reader once the quotes seen so far balance,
+    so a quoted field may span lines and chunk boundaries
+    """
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    quotes = buffered = 0
+    async for line in iter_lines(chunks, keepends=True):
+        feed.lines.append(line)
+        quotes += line.count('"')
+        buffered += len(line)
+        # A stray quote would hold back the rest of the file; give up waiting past the field size limit
+        if quotes % 2 == 0 or buffered > csv.field_size_limit():
+            for values in reader:
+                if values:
+                    yield values
+            quotes = buffered = 0
+    for values in reader:
+        if values:
+            yield values
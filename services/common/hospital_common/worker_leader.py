@@ -0,0 +1,58 @@
+"""
+One-per-service startup jobs under several worker processes
+
+With N workers (run-services.py starts the service under gunicorn) every worker
+runs the startup event. Jobs that must run once per service rather than once
+per worker, such as re-queueing pending validations or seeding sample data, are
+started only by the worker holding an exclusive lock on WORKER_LEADER_LOCK.
+
+The lock goes away with the process that holds it. Workers that lose the race
+keep retrying in the background, so when the leader is recycled
+(max-requests) or replaced by a reload, one of the remaining workers takes
+over. Without WORKER_LEADER_LOCK (a single uvicorn process) or on platforms
+without fcntl, this process is always the leader.
+"""
+
+import asyncio
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+
+class WorkerLeader:
+    def __init__(self, lock_path: Optional[str], retry_seconds: float = 5.0):
+        self.lock_path = lock_path
+        self.retry_seconds = retry_seconds
+        self.is_leader = False
+        self._handle = None
+
+    def try_acquire(self) -> bool:
+        if self.is_leader:
+            return True
+        if not self.lock_path or fcntl is None:
+            self.is_leader = True
+            return True
+        handle = open(self.lock_path, "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._handle = handle
+        self.is_leader = True
+        return True
+
+    async def run_when_leader(self, job, *args):
+        """Wait until this worker holds the lock, then run job(*args)"""
+        while not self.try_acquire():
+            await asyncio.sleep(self.retry_seconds)
+        await job(*args)
+
+    def release(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self.is_leader = False
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks: validation hot path, before vs. after validation_fastpath
+
+Each case runs the previous implementation (reproduced below) and the current
+one on the same inputs, without MongoDB or HTTP, and reports ns per call.
+
+Sử dụng:
+    python3 benchmarks/bench_validation.py
+    python3 benchmarks/bench_validation.py --number 200000 --json
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from datetime import date, datetime
+from pathlib import Path
+
+from bson import ObjectId
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import validation_fastpath as fast  # noqa: E402
+from main import InsuranceCard, InsuranceValidationResponse  # noqa: E402
+
+CARD_DOC = {
+    "_id": ObjectId(),
+    "card_number": "HS4020987654321",
+    "full_name": "Khôi Nguyễn Đắc",
+    "date_of_birth": datetime(1985, 5, 20),
+    "address": "456 Lê Lợi, Q1, TP.HCM",
+    "issued_place": "BHXH TP. Hồ Chí Minh",
+    "valid_from": datetime(2024, 1, 1),
+    "valid_to": datetime(2099, 12, 31),
+    "coverage_percentage": 100,
+    "hospital_level": "Hạng I",
+}
+DOB = date(1985, 5, 20)
+
+
+# Previous implementation, as it was in main.py
+def legacy_validate_format(card_number):
+    pattern = r'^[A-Z]{2}\d{13}$'
+    return bool(re.match(pattern, card_number))
+
+
+def legacy_coverage(hospital_level, card_level):
+    coverage_matrix = {
+        ("Hạng I", "Hạng I"): 100,
+        ("Hạng I", "Hạng II"): 80,
+        ("Hạng I", "Hạng III"): 60,
+        ("Hạng II", "Hạng II"): 100,
+        ("Hạng II", "Hạng III"): 80,
+        ("Hạng III", "Hạng III"): 100,
+    }
+    return coverage_matrix.get((card_level, hospital_level), 60)
+
+
+def legacy_to_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def legacy_evaluate(card_doc, card_number, date_of_birth):
+    if not legacy_validate_format(card_number):
+        return InsuranceValidationResponse(is_valid=False, message="format")
+    if not card_doc:
+        return InsuranceValidationResponse(is_valid=False, message="not found")
+    card_dob = legacy_to_date(card_doc["date_of_birth"])
+    if card_dob != date_of_birth:
+        return InsuranceValidationResponse(is_valid=False, message="dob")
+    if card_doc["valid_to"].date() < date.today():
+        return InsuranceValidationResponse(is_valid=False, message="expired")
+    card_info = card_doc.copy()
+    card_info["_id"] = str(card_info["_id"])
+    card_info["date_of_birth"] = card_dob
+    card_info["valid_from"] = legacy_to_date(card_info["valid_from"])
+    card_info["valid_to"] = legacy_to_date(card_info["valid_to"])
+    return InsuranceValidationResponse(
+        is_valid=True,
+        message="Thẻ BHYT hợp lệ",
+        card_info=InsuranceCard(**card_info),
+        coverage_percentage=legacy_coverage(card_doc["hospital_level"], "Hạng I"),
+        hospital_level="Hạng I",
+    )
+
+
+def legacy_response_bytes(card_doc, card_number, date_of_birth):
+    # FastAPI validated the returned model against response_model, then serialized it by alias
+    result = legacy_evaluate(card_doc, card_number, date_of_birth)
+    validated = InsuranceValidationResponse.model_validate(result.model_dump())
+    return validated.model_dump_json(by_alias=True).encode()
+
+
+def fast_response_bytes(card_doc, card_number, date_of_birth):
+    return fast.dumps(fast.evaluate(card_doc, card_number, date_of_birth))
+
+
+CASES = [
+    ("card number format",
+     lambda: legacy_validate_format("HS4020987654321"),
+     lambda: fast.is_valid_card_number("HS4020987654321")),
+    ("coverage lookup",
+     lambda: legacy_coverage("Hạng II", "Hạng I"),
+     lambda: fast.coverage_for("Hạng II")),
+    ("today",
+     date.today,
+     fast.today),
+    ("evaluate (valid card)",
+     lambda: legacy_evaluate(CARD_DOC, "HS4020987654321", DOB),
+     lambda: fast.evaluate(CARD_DOC, "HS4020987654321", DOB)),
+    ("evaluate (not found)",
+     lambda: legacy_evaluate(None, "HS4020987654322", DOB),
+     lambda: fast.evaluate(None, "HS4020987654322", DOB)),
+    ("evaluate + serialize",
+     lambda: legacy_response_bytes(CARD_DOC, "HS4020987654321", DOB),
+     lambda: fast_response_bytes(CARD_DOC, "HS4020987654321", DOB)),
+]
+
+
+def ns_per_call(func, number: int, repeat: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=50000, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per case (best is kept)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for name, legacy, current in CASES:
+        before = ns_per_call(legacy, args.number, args.repeat)
+        after = ns_per_call(current, args.number, args.repeat)
+        results.append({
+            "case": name,
+            "before_ns": round(before, 1),
+            "after_ns": round(after, 1),
+            "speedup": round(before / after, 2) if after else None,
+        })
+
+    if args.json:
+        print(json.dumps({"orjson": fast.orjson is not None, "results": results}, indent=2))
+        return
+
+    print(f"\n{'case':<26}{'before':>12}{'after':>12}{'speedup':>10}")
+    print("-" * 60)
+    for r in results:
+        print(f"{r['case']:<26}{r['before_ns']:>10.0f}ns{r['after_ns']:>10.0f}ns{r['speedup']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Compact in-memory index of insurance cards for validation
+
+Each card is one row across parallel typed arrays instead of one dict per card:
+
+    _rows            card_number -> row number
+    _by_id           12-byte ObjectId -> card_number (delete events only carry the _id)
+    _ids             12-byte ObjectIds, packed
+    _dob, _valid_from, _valid_to
+                     dates as proleptic ordinals (array 'i')
+    _coverage        coverage percentage (array 'h')
+    _level, _place   codes into small interned string tables
+    _text            full_name and address, UTF-8, packed into one bytearray
+                     and addressed by (_text_start, _text_len)
+
+get() rebuilds the same dict shape MongoDB returns, so validation logic is shared
+with the database path. remove() and a card_number change free the old number in
+O(1); the row itself stays allocated until the next full rebuild.
+"""
+
+from array import array
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+
+_SEPARATOR = b"\x1f"
+_EMPTY_ID = bytes(12)
+
+
+class CardIndex:
+    __slots__ = (
+        "_rows", "_by_id", "_ids", "_dob", "_valid_from", "_valid_to", "_coverage",
+        "_level", "_levels", "_level_codes", "_place", "_places", "_place_codes",
+        "_text", "_text_start", "_text_len", "built_at", "hits", "misses",
+    )
+
+    def __init__(self):
+        self._rows = {}
+        self._by_id = {}
+        self._ids = bytearray()
+        self._dob = array("i")
+        self._valid_from = array("i")
+        self._valid_to = array("i")
+        self._coverage = array("h")
+        self._level = array("B")
+        self._levels = []
+        self._level_codes = {}
+        self._place = array("H")
+        self._places = []
+        self._place_codes = {}
+        self._text = bytearray()
+        self._text_start = array("Q")
+        self._text_len = array("I")
+        self.built_at = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    @staticmethod
+    def _intern(value: str, table: list, codes: dict) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(table)
+            table.append(value)
+        return code
+
+    def upsert(self, card: dict):
+        """Add or replace a card from its MongoDB document"""
+        card_number = card["card_number"]
+        text = (card.get("full_name") or "").encode() + _SEPARATOR + (card.get("address") or "").encode()
+        object_id = card.get("_id")
+        id_bytes = object_id.binary if isinstance(object_id, ObjectId) else _EMPTY_ID
+        level = self._intern(card.get("hospital_level") or "", self._levels, self._level_codes)
+        place = self._intern(card.get("issued_place") or "", self._places, self._place_codes)
+
+        if id_bytes != _EMPTY_ID:
+            previous_number = self._by_id.get(id_bytes)
+            if previous_number is not None and previous_number != card_number:
+                # The card's number was changed: the old number must stop validating
+                self._drop(previous_number)
+            self._by_id[id_bytes] = card_number
+
+        row = self._rows.get(card_number)
+        if row is None:
+            self._rows[card_number] = len(self._dob)
+            self._ids += id_bytes
+            self._dob.append(card["date_of_birth"].toordinal())
+            self._valid_from.append(card["valid_from"].toordinal())
+            self._valid_to.append(card["valid_to"].toordinal())
+            self._coverage.append(int(card.get("coverage_percentage") or 0))
+            self._level.append(level)
+            self._place.append(place)
+            self._text_start.append(len(self._text))
+            self._text_len.append(len(text))
+            self._text += text
+            return
+
+        if id_bytes != _EMPTY_ID:
+            previous_id = bytes(self._ids[row * 12:row * 12 + 12])
+            if previous_id != id_bytes:
+                # The number now belongs to another document
+                self._by_id.pop(previous_id, None)
+                self._ids[row * 12:row * 12 + 12] = id_bytes
+        self._dob[row] = card["date_of_birth"].toordinal()
+        self._valid_from[row] = card["valid_from"].toordinal()
+        self._valid_to[row] = card["valid_to"].toordinal()
+        self._coverage[row] = int(card.get("coverage_percentage") or 0)
+        self._level[row] = level
+        self._place[row] = place
+        # Replaced text is appended; the old bytes are reclaimed by the next full rebuild
+        self._text_start[row] = len(self._text)
+        self._text_len[row] = len(text)
+        self._text += text
+
+    def remove(self, object_id: ObjectId) -> bool:
+        """Drop the card with this _id; False when it is not indexed"""
+        card_number = self._by_id.get(object_id.binary)
+        if card_number is None:
+            return False
+        self._drop(card_number)
+        return True
+
+    def _drop(self, card_number: str):
+        row = self._rows.pop(card_number)
+        self._by_id.pop(bytes(self._ids[row * 12:row * 12 + 12]), None)
+        self._ids[row * 12:row * 12 + 12] = _EMPTY_ID
+
+    def get(self, card_number: str) -> Optional[dict]:
+        """The card as MongoDB would return it, or None when it is not indexed"""
+        row = self._rows.get(card_number)
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        start = self._text_start[row]
+        full_name, _, address = bytes(self._text[start:start + self._text_len[row]]).partition(_SEPARATOR)
+        return {
+            "_id": ObjectId(bytes(self._ids[row * 12:row * 12 + 12])),
+            "card_number": card_number,
+            "full_name": full_name.decode(),
+            "date_of_birth": datetime.fromordinal(self._dob[row]),
+            "address": address.decode(),
+            "issued_place": self._places[self._place[row]],
+            "valid_from": datetime.fromordinal(self._valid_from[row]),
+            "valid_to": datetime.fromordinal(self._valid_to[row]),
+            "coverage_percentage": self._coverage[row],
+            "hospital_level": self._levels[self._level[row]],
+        }
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the packed columns (excludes the card_number and _id dicts)"""
+        arrays = (self._dob, self._valid_from, self._valid_to, self._coverage, self._level,
+                  self._place, self._text_start, self._text_len)
+        return len(self._ids) + len(self._text) + sum(a.itemsize * len(a) for a in arrays)
+
+    def stats(self) -> dict:
+        return {
+            "cards": len(self._rows),
+            "packed_bytes": self.memory_bytes(),
+            "text_bytes": len(self._text),
+            "hospital_levels": len(self._levels),
+            "issued_places": len(self._places),
+            "built_at": self.built_at,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
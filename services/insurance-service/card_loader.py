@@ -0,0 +1,147 @@
+"""
+Bulk insurance card loading helpers
+
+Parses a CSV or NDJSON registry export as a stream of chunks and converts each
+chunk column by column into MongoDB documents. Registry exports repeat the same
+few valid_from/valid_to dates across millions of rows, so dates are converted
+once per distinct value per chunk rather than once per row.
+
+Columns / keys (CSV needs a header row):
+    card_number, full_name, date_of_birth, address, issued_place,
+    valid_from, valid_to, coverage_percentage, hospital_level
+"""
+
+import json
+import re
+from datetime import date, datetime
+from typing import AsyncIterator, List, Tuple
+
+from hospital_common.stream_readers import iter_csv_rows, iter_lines
+from validation_fastpath import CARD_NUMBER_PATTERN
+
+LOAD_FORMAT_CSV = "csv"
+LOAD_FORMAT_NDJSON = "ndjson"
+LOAD_FORMATS = (LOAD_FORMAT_CSV, LOAD_FORMAT_NDJSON)
+
+DATE_FIELDS = ("date_of_birth", "valid_from", "valid_to")
+TEXT_FIELDS = ("card_number", "full_name", "address", "issued_place", "hospital_level")
+REQUIRED_FIELDS = TEXT_FIELDS + DATE_FIELDS + ("coverage_percentage",)
+
+# Registry exports use either ISO dates or the Vietnamese dd/mm/yyyy form
+_DMY_DATE = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$")
+
+
+class CardLoadError(ValueError):
+    pass
+
+
+def detect_format(filename: str) -> str:
+    return LOAD_FORMAT_CSV if filename.lower().endswith(".csv") else LOAD_FORMAT_NDJSON
+
+
+def parse_date(value: str) -> datetime:
+    """Date cell -> midnight datetime, as cards are stored"""
+    match = _DMY_DATE.match(value)
+    if match:
+        day, month, year = (int(part) for part in match.groups())
+        return datetime(year, month, day)
+    return datetime.combine(date.fromisoformat(value[:10]), datetime.min.time())
+
+
+def convert_date_column(values: list) -> list:
+    """Convert one date column of a chunk, parsing each distinct value once (None when invalid)"""
+    keys = [None if value is None else str(value).strip() for value in values]
+    converted = {None: None}
+    for key in set(keys) - {None}:
+        try:
+            converted[key] = parse_date(key)
+        except ValueError:
+            converted[key] = None
+    return [converted[key] for key in keys]
+
+
+def build_card_documents(rows: List[Tuple[int, dict]]) -> Tuple[List[Tuple[int, dict]], List[Tuple[int, str]]]:
+    """
+    Convert a chunk of (row_number, raw_row) into card documents
+    Returns (documents, errors) where both carry the source row number
+    """
+    date_columns = {
+        field: convert_date_column([row.get(field) for _, row in rows])
+        for field in DATE_FIELDS
+    }
+    documents, errors = [], []
+    for position, (row_number, row) in enumerate(rows):
+        missing = [field for field in REQUIRED_FIELDS if row.get(field) in (None, "")]
+        if missing:
+            errors.append((row_number, f"missing {', '.join(missing)}"))
+            continue
+        card_number = str(row["card_number"]).strip().upper()
+        if not CARD_NUMBER_PATTERN.match(card_number):
+            errors.append((row_number, f"invalid card_number {card_number!r}"))
+            continue
+        bad_dates = [field for field in DATE_FIELDS if date_columns[field][position] is None]
+        if bad_dates:
+            errors.append((row_number, f"invalid date in {', '.join(bad_dates)}"))
+            continue
+        try:
+            coverage = int(row["coverage_percentage"])
+        except (TypeError, ValueError):
+            errors.append((row_number, "coverage_percentage must be an integer"))
+            continue
+
+        document = {field: str(row[field]).strip() for field in TEXT_FIELDS}
+        document["card_number"] = card_number
+        document["coverage_percentage"] = coverage
+        for field in DATE_FIELDS:
+            document[field] = date_columns[field][position]
+        documents.append((row_number, document))
+    return documents, errors
+
+
+async def iter_row_chunks(
+    chunks: AsyncIterator[bytes],
+    load_format: str,
+    chunk_size: int
+) -> AsyncIterator[List[Tuple[int, object]]]:
+    """
+    Yield chunks of (row_number, raw_row_or_error); row numbers count data rows from 1
+    Unparseable rows are yielded as CardLoadError so the caller can report them
+    """
+    chunk = []
+    header = None
+    row_number = 0
+
+    if load_format == LOAD_FORMAT_CSV:
+        async for values in iter_csv_rows(chunks):
+            if header is None:
+                header = [column.strip().lower() for column in values]
+                missing = [field for field in REQUIRED_FIELDS if field not in header]
+                if missing:
+                    raise CardLoadError(f"CSV header is missing columns: {', '.join(missing)}")
+                continue
+            row_number += 1
+            if len(values) != len(header):
+                chunk.append((row_number, CardLoadError(f"expected {len(header)} columns, got {len(values)}")))
+            else:
+                chunk.append((row_number, dict(zip(header, values))))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    else:
+        async for line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("expected a JSON object")
+                chunk.append((row_number, row))
+            except ValueError as e:
+                chunk.append((row_number, CardLoadError(f"invalid JSON: {e}")))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+    if chunk:
+        yield chunk
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Nạp hàng loạt thẻ BHYT từ file CSV/NDJSON (danh sách BHYT cấp tỉnh)
+Sử dụng: python3 load_cards.py registry.csv [--format csv|ndjson] [--chunk-size 5000]
+                              [--load-id hcm-2026-10] [--restart] [--defer-indexes]
+
+Progress is checkpointed per chunk under --load-id (the file name by default);
+re-running after an interruption resumes after the last committed row.
+--defer-indexes is for maintenance windows only (service stopped,
+CARD_LOAD_MAINTENANCE_MODE=true): card lookups lose their indexes until the load ends.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import main
+from card_loader import LOAD_FORMATS, CardLoadError, detect_format
+
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+async def read_chunks(path: str):
+    with open(path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def run(args):
+    main.mongo_client = AsyncIOMotorClient(main.MONGODB_URL)
+    main.database = main.mongo_client[main.DATABASE_NAME]
+    try:
+        load_id = args.load_id or os.path.basename(args.path)
+        if args.restart:
+            await main.database[main.LOAD_CHECKPOINTS_COLLECTION_NAME].delete_one({"_id": load_id})
+        return await main.load_insurance_cards(
+            read_chunks(args.path),
+            args.format or detect_format(args.path),
+            chunk_size=args.chunk_size,
+            load_id=load_id,
+            source=os.path.abspath(args.path),
+            defer_indexes=args.defer_indexes,
+        )
+    finally:
+        main.mongo_client.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk load insurance cards from a CSV or NDJSON file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=LOAD_FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=main.CARD_LOAD_CHUNK_SIZE)
+    parser.add_argument("--load-id", help="Checkpoint key (defaults to the file name)")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and load from the first row")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="Offline only (needs CARD_LOAD_MAINTENANCE_MODE=true): drop secondary indexes "
+                             "during the load and rebuild them after")
+    parser.add_argument("--errors", help="Write per-row errors to this NDJSON file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"📥 Loading insurance cards from {args.path}...")
+    try:
+        summary = asyncio.run(run(args))
+    except CardLoadError as e:
+        raise SystemExit(f"❌ {e}")
+    if summary["resumed_after_row"]:
+        print(f"⏩ Resumed after row {summary['resumed_after_row']}")
+    print(f"✅ {summary['rows']} rows in {summary['elapsed_seconds']}s ({summary['rows_per_second']} rows/s): "
+          f"{summary['upserted']} new, {summary['modified']} updated, {summary['unchanged']} unchanged, "
+          f"{summary['failed']} failed")
+    if "index_build_seconds" in summary:
+        print(f"🗂️ Indexes rebuilt in {summary['index_build_seconds']}s")
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as f:
+            for error in summary["errors"]:
+                f.write(json.dumps(error, ensure_ascii=False) + "\n")
+        print(f"📝 Row errors written to {args.errors}")
+    else:
+        for error in summary["errors"][:20]:
+            print(f"   ❌ row {error['row']}: {error['error']}")
+    if summary["errors_truncated"]:
+        print(f"⚠️ Only the first {main.CARD_LOAD_MAX_REPORTED_ERRORS} errors were kept")
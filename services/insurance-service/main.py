@@ -1,16 +1,35 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import IndexModel, ASCENDING
+from pymongo import IndexModel, ASCENDING, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime, date
 from bson import ObjectId
 import uvicorn
 import os
+import secrets
 import re
 import random
+import asyncio
+import time
+import base64
+import csv
+import io
+import json
+import httpx
 from dotenv import load_dotenv
+from card_loader import LOAD_FORMATS, CardLoadError, build_card_documents, iter_row_chunks
+from card_index import CardIndex
+from validation_fastpath import FastJSONResponse, card_info_json, dumps, evaluate, is_valid_card_number
+from hospital_common.instrumentation import (
+    PROMETHEUS_CONTENT_TYPE, MongoCommandTimer, ProfileStore, RequestMetrics, RequestMetricsMiddleware, span
+)
+from hospital_common.slow_queries import SlowQueryLog
+from hospital_common.http_caching import ConditionalCompressionMiddleware
+from hospital_common.worker_leader import WorkerLeader
 
 # Load environment variables
 load_dotenv()
@@ -20,10 +39,90 @@ MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017/hospital_manag
 # Extract database name from MONGODB_URL
 DATABASE_NAME = MONGODB_URL.split('/')[-1] if '/' in MONGODB_URL else "insurance_service_db"
 COLLECTION_NAME = "insurance_cards"
+STATS_COLLECTION_NAME = "insurance_stats"
+STATS_SUMMARY_ID = "summary"
+LOAD_CHECKPOINTS_COLLECTION_NAME = "card_load_checkpoints"
+
+CARD_INDEXES = [
+    IndexModel([("card_number", ASCENDING)], unique=True),
+    IndexModel([("full_name", ASCENDING)]),
+    IndexModel([("date_of_birth", ASCENDING)]),
+    IndexModel([("issued_place", ASCENDING), ("card_number", ASCENDING)]),
+    IndexModel([("valid_to", ASCENDING)]),
+    IndexModel([("updated_at", ASCENDING)]),
+]
+
+# Materialized statistics: how often to check for the daily expiry rollover, and how
+# often to fully recompute for reconciliation (0 disables the periodic full recompute)
+STATS_ROLLOVER_CHECK_SECONDS = int(os.getenv("STATS_ROLLOVER_CHECK_SECONDS", "60"))
+STATS_FULL_RECOMPUTE_HOURS = float(os.getenv("STATS_FULL_RECOMPUTE_HOURS", "24"))
+
+# Services caching validation results, notified when a card changes (comma-separated base URLs)
+CACHE_INVALIDATION_URLS = [url.strip().rstrip("/") for url in os.getenv("CACHE_INVALIDATION_URLS", "").split(",") if url.strip()]
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN", "")
+
+# Card listing / export
+CARD_FIELDS = [
+    "card_number", "full_name", "date_of_birth", "address", "issued_place",
+    "valid_from", "valid_to", "coverage_percentage", "hospital_level",
+]
+CARD_EXPORT_BATCH_SIZE = int(os.getenv("CARD_EXPORT_BATCH_SIZE", "1000"))
+
+# Batch validation limits
+BATCH_VALIDATION_MAX_ITEMS = int(os.getenv("BATCH_VALIDATION_MAX_ITEMS", "50000"))
+BATCH_VALIDATION_CHUNK_SIZE = int(os.getenv("BATCH_VALIDATION_CHUNK_SIZE", "5000"))
+
+# Bulk card loading (POST /api/v1/insurance/cards/bulk and load_cards.py)
+CARD_LOAD_CHUNK_SIZE = int(os.getenv("CARD_LOAD_CHUNK_SIZE", "5000"))
+CARD_LOAD_MAX_REPORTED_ERRORS = int(os.getenv("CARD_LOAD_MAX_REPORTED_ERRORS", "1000"))
+# defer_indexes drops the card indexes for the whole load; only allowed while the service is offline
+CARD_LOAD_MAINTENANCE_MODE = os.getenv("CARD_LOAD_MAINTENANCE_MODE", "false").lower() in ("1", "true", "yes")
+
+# In-memory card index for validation (optional): built on startup, then kept current
+# from a change stream, or by polling updated_at when change streams are unavailable
+CARD_INDEX_ENABLED = os.getenv("CARD_INDEX_ENABLED", "false").lower() in ("1", "true", "yes")
+CARD_INDEX_POLL_SECONDS = float(os.getenv("CARD_INDEX_POLL_SECONDS", "5"))
+CARD_INDEX_REBUILD_SECONDS = float(os.getenv("CARD_INDEX_REBUILD_SECONDS", "3600"))
+
+# Request instrumentation: per-route histograms and span breakdown on /metrics (Prometheus)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Profiling: requests with "X-Profile: cprofile|pyinstrument" and X-Internal-Token, plus a random sample, are profiled
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DEFAULT_PROFILER = os.getenv("PROFILE_DEFAULT_PROFILER", "cprofile")  # cprofile | pyinstrument
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+
+# Slow MongoDB operation log (ring buffer behind /api/v1/insurance/admin/slow-queries); each new slow read shape is explained once
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "500"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+
+# Conditional GET (ETag / If-None-Match -> 304) and gzip/brotli compression of large GET responses
+HTTP_ETAGS_ENABLED = os.getenv("HTTP_ETAGS_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_COMPRESSION_ENABLED = os.getenv("HTTP_COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_COMPRESSION_MIN_SIZE = int(os.getenv("HTTP_COMPRESSION_MIN_SIZE", "1024"))
+HTTP_GZIP_LEVEL = int(os.getenv("HTTP_GZIP_LEVEL", "6"))
+HTTP_BROTLI_QUALITY = int(os.getenv("HTTP_BROTLI_QUALITY", "4"))
+
+# Multi-worker deployments (run-services.py): workers race for this lock file and the holder
+# runs the once-per-service startup jobs; unset means a single process that always runs them
+WORKER_LEADER_LOCK = os.getenv("WORKER_LEADER_LOCK")
 
 # Global variables for database
 mongo_client: AsyncIOMotorClient = None
 database = None
+notify_client: httpx.AsyncClient = None
+notify_tasks = set()
+stats_scheduler_task: asyncio.Task = None
+card_index: CardIndex = None
+card_index_task: asyncio.Task = None
+worker_leader = WorkerLeader(WORKER_LEADER_LOCK)
+leader_task: asyncio.Task = None
+card_index_state = {"mode": None, "refreshes": 0, "last_refresh": None, "changes_applied": 0}
+request_metrics = RequestMetrics()
+profile_store = ProfileStore(PROFILE_KEEP) if PROFILING_ENABLED else None
+slow_query_log = SlowQueryLog(SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_EXPLAIN) if SLOW_QUERY_LOG_ENABLED else None
 
 app = FastAPI(
     title="Insurance Service",
@@ -38,28 +137,69 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "X-Profile-Id", "ETag"],
 )
 
+if HTTP_ETAGS_ENABLED or HTTP_COMPRESSION_ENABLED:
+    app.add_middleware(
+        ConditionalCompressionMiddleware,
+        etags=HTTP_ETAGS_ENABLED,
+        compress=HTTP_COMPRESSION_ENABLED,
+        minimum_size=HTTP_COMPRESSION_MIN_SIZE,
+        gzip_level=HTTP_GZIP_LEVEL,
+        brotli_quality=HTTP_BROTLI_QUALITY,
+    )
+
+if METRICS_ENABLED:
+    app.add_middleware(
+        RequestMetricsMiddleware,
+        metrics=request_metrics,
+        profiles=profile_store,
+        sample_rate=PROFILE_SAMPLE_RATE,
+        default_profiler=PROFILE_DEFAULT_PROFILER,
+        profile_token=INTERNAL_API_TOKEN,
+    )
+
 # Database startup and shutdown events
 @app.on_event("startup")
 async def startup_event():
-    global mongo_client, database
-    mongo_client = AsyncIOMotorClient(MONGODB_URL)
+    global mongo_client, database, notify_client, leader_task, card_index_task
+    event_listeners = [MongoCommandTimer(request_metrics)] if METRICS_ENABLED else []
+    if slow_query_log:
+        event_listeners.append(slow_query_log)
+    mongo_client = AsyncIOMotorClient(MONGODB_URL, event_listeners=event_listeners)
+    if slow_query_log:
+        slow_query_log.attach(mongo_client, asyncio.get_running_loop())
     database = mongo_client[DATABASE_NAME]
     
+    if CACHE_INVALIDATION_URLS:
+        notify_client = httpx.AsyncClient(timeout=2.0)
+        if not INTERNAL_API_TOKEN:
+            print("⚠️ CACHE_INVALIDATION_URLS is set but INTERNAL_API_TOKEN is empty: patient-service will reject the invalidations")
+    
     # Create indexes
-    await database[COLLECTION_NAME].create_indexes([
-        IndexModel([("card_number", ASCENDING)], unique=True),
-        IndexModel([("full_name", ASCENDING)]),
-        IndexModel([("date_of_birth", ASCENDING)]),
-    ])
+    await database[COLLECTION_NAME].create_indexes(CARD_INDEXES)
     
-    # Insert sample data if collection is empty
-    if await database[COLLECTION_NAME].count_documents({}) == 0:
-        await insert_sample_data()
+    # Sample data and the statistics scheduler run once per service, not once per worker
+    if worker_leader.try_acquire():
+        await run_leader_jobs()
+    else:
+        leader_task = asyncio.create_task(worker_leader.run_when_leader(run_leader_jobs))
+    
+    if CARD_INDEX_ENABLED:
+        card_index_task = asyncio.create_task(maintain_card_index())
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    if leader_task:
+        leader_task.cancel()
+    worker_leader.release()
+    if stats_scheduler_task:
+        stats_scheduler_task.cancel()
+    if card_index_task:
+        card_index_task.cancel()
+    if notify_client:
+        await notify_client.aclose()
     if mongo_client:
         mongo_client.close()
 
@@ -91,6 +231,9 @@ class InsuranceValidationResponse(BaseModel):
     coverage_percentage: Optional[int] = None
     hospital_level: Optional[str] = None
 
+class BatchValidationRequest(BaseModel):
+    items: List[InsuranceValidationRequest]
+
 class InsuranceStatus(BaseModel):
     patient_id: str
     card_number: str
@@ -209,26 +352,386 @@ async def insert_sample_data():
 MOCK_INSURANCE_CARDS = {}
 
 # Helper Functions
-def validate_card_number_format(card_number: str) -> bool:
-    """Validate BHYT card number format (15 digits)"""
-    pattern = r'^[A-Z]{2}\d{13}$'
-    return bool(re.match(pattern, card_number))
-
-def is_card_expired(valid_to: datetime) -> bool:
-    """Check if card is expired"""
-    return valid_to.date() < date.today()
-
-def calculate_coverage(hospital_level: str, card_level: str) -> int:
-    """Calculate insurance coverage percentage"""
-    coverage_matrix = {
-        ("Hạng I", "Hạng I"): 100,
-        ("Hạng I", "Hạng II"): 80,
-        ("Hạng I", "Hạng III"): 60,
-        ("Hạng II", "Hạng II"): 100,
-        ("Hạng II", "Hạng III"): 80,
-        ("Hạng III", "Hạng III"): 100,
+def verify_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """Guard for operational endpoints; they stay closed until INTERNAL_API_TOKEN is set"""
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Internal endpoints are disabled (INTERNAL_API_TOKEN is not set)")
+    if not secrets.compare_digest(x_internal_token or "", INTERNAL_API_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid internal token")
+
+async def _send_cache_invalidation(card_number: Optional[str]):
+    headers = {"X-Internal-Token": INTERNAL_API_TOKEN} if INTERNAL_API_TOKEN else {}
+    for base_url in CACHE_INVALIDATION_URLS:
+        try:
+            with span("http"):
+                await notify_client.post(
+                    f"{base_url}/api/v1/insurance-cache/invalidate",
+                    json={"card_number": card_number},
+                    headers=headers
+                )
+        except httpx.HTTPError as e:
+            print(f"⚠️ Cache invalidation to {base_url} failed: {e}")
+
+def notify_card_changed(card_number: Optional[str]):
+    """
+    Best-effort, non-blocking cache invalidation for services caching validation results
+    card_number=None drops every cached result (after a bulk load)
+    """
+    if not CACHE_INVALIDATION_URLS or notify_client is None:
+        return
+    task = asyncio.create_task(_send_cache_invalidation(card_number))
+    notify_tasks.add(task)
+    task.add_done_callback(notify_tasks.discard)
+
+# Materialized statistics
+# insurance_stats holds one summary document (totals + the day valid/expired were counted for)
+# and one counter document per issued_place, kept current by add_insurance_card
+def today_start() -> datetime:
+    return datetime.combine(date.today(), datetime.min.time())
+
+async def recompute_insurance_stats() -> dict:
+    """Full recompute from insurance_cards (startup, reconciliation and the forced endpoint)"""
+    cards = database[COLLECTION_NAME]
+    stats = database[STATS_COLLECTION_NAME]
+    as_of = today_start()
+    
+    total_cards = await cards.count_documents({})
+    # Same rule as validation: a card is valid through its valid_to day
+    valid_cards = await cards.count_documents({"valid_to": {"$gte": as_of}})
+    place_counts = [
+        doc async for doc in cards.aggregate([
+            {"$group": {"_id": "$issued_place", "count": {"$sum": 1}}}
+        ])
+    ]
+    
+    # Upsert every place, then drop only the ones that disappeared: concurrent recomputes
+    # cannot collide on _id and readers never see an empty list in between
+    place_ids = [f"issued_place:{doc['_id']}" for doc in place_counts]
+    if place_counts:
+        await stats.bulk_write([
+            ReplaceOne(
+                {"_id": place_id},
+                {"kind": "issued_place", "place": doc["_id"], "count": doc["count"]},
+                upsert=True
+            )
+            for place_id, doc in zip(place_ids, place_counts)
+        ], ordered=False)
+    await stats.delete_many({"kind": "issued_place", "_id": {"$nin": place_ids}})
+    summary = {
+        "total_cards": total_cards,
+        "valid_cards": valid_cards,
+        "expired_cards": total_cards - valid_cards,
+        "as_of": as_of,
+        "recomputed_at": datetime.now(),
     }
-    return coverage_matrix.get((card_level, hospital_level), 60)
+    await stats.replace_one({"_id": STATS_SUMMARY_ID}, summary, upsert=True)
+    return summary
+
+async def roll_over_insurance_stats(summary: dict) -> dict:
+    """
+    Move cards that expired since the summary's as_of day from valid to expired
+    Only counts the valid_to range that crossed over, using the valid_to index
+    """
+    as_of = today_start()
+    previous = summary["as_of"]
+    if previous >= as_of:
+        return summary
+    
+    newly_expired = await database[COLLECTION_NAME].count_documents(
+        {"valid_to": {"$gte": previous, "$lt": as_of}}
+    )
+    # Conditional on as_of so that only one worker applies a given rollover
+    await database[STATS_COLLECTION_NAME].update_one(
+        {"_id": STATS_SUMMARY_ID, "as_of": previous},
+        {"$inc": {"valid_cards": -newly_expired, "expired_cards": newly_expired}, "$set": {"as_of": as_of}}
+    )
+    return await database[STATS_COLLECTION_NAME].find_one({"_id": STATS_SUMMARY_ID})
+
+async def record_card_in_stats(card_data: dict):
+    """Incrementally count a newly added card"""
+    stats = database[STATS_COLLECTION_NAME]
+    summary = await stats.find_one({"_id": STATS_SUMMARY_ID}, {"as_of": 1})
+    if summary is None:
+        # Nothing materialized yet; the first /stats call recomputes everything
+        return
+    
+    is_valid = card_data["valid_to"] >= summary["as_of"]
+    await stats.update_one(
+        {"_id": STATS_SUMMARY_ID},
+        {"$inc": {"total_cards": 1, "valid_cards" if is_valid else "expired_cards": 1}}
+    )
+    await stats.update_one(
+        {"_id": f"issued_place:{card_data['issued_place']}"},
+        {"$inc": {"count": 1}, "$setOnInsert": {"kind": "issued_place", "place": card_data["issued_place"]}},
+        upsert=True
+    )
+
+async def run_stats_scheduler():
+    """Apply the daily expiry rollover and the periodic full recompute"""
+    while True:
+        try:
+            await asyncio.sleep(STATS_ROLLOVER_CHECK_SECONDS)
+            summary = await database[STATS_COLLECTION_NAME].find_one({"_id": STATS_SUMMARY_ID})
+            if summary is None:
+                continue
+            age_hours = (datetime.now() - summary["recomputed_at"]).total_seconds() / 3600
+            if STATS_FULL_RECOMPUTE_HOURS and age_hours >= STATS_FULL_RECOMPUTE_HOURS:
+                await recompute_insurance_stats()
+            else:
+                await roll_over_insurance_stats(summary)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Error refreshing insurance statistics: {e}")
+
+async def run_leader_jobs():
+    """Startup jobs that run in one worker per service (see hospital_common.worker_leader)"""
+    global stats_scheduler_task
+    # Insert sample data if collection is empty
+    if await database[COLLECTION_NAME].count_documents({}) == 0:
+        await insert_sample_data()
+        await recompute_insurance_stats()
+    
+    stats_scheduler_task = asyncio.create_task(run_stats_scheduler())
+
+# In-memory card index
+async def build_card_index() -> CardIndex:
+    """Scan insurance_cards into a fresh CardIndex"""
+    index = CardIndex()
+    async for card_doc in database[COLLECTION_NAME].find({}, {field: 1 for field in CARD_FIELDS}):
+        index.upsert(card_doc)
+    index.built_at = datetime.now()
+    return index
+
+async def apply_card_changes(since: datetime) -> datetime:
+    """Upsert cards written since the given time into the live index; returns the new watermark"""
+    watermark = since
+    async for card_doc in database[COLLECTION_NAME].find({"updated_at": {"$gt": since}}).sort("updated_at", ASCENDING):
+        card_index.upsert(card_doc)
+        card_index_state["changes_applied"] += 1
+        watermark = card_doc["updated_at"]
+    card_index_state["refreshes"] += 1
+    card_index_state["last_refresh"] = datetime.now()
+    return watermark
+
+def apply_card_change(change: dict) -> bool:
+    """Apply one change stream event to the live index; False when the stream was invalidated"""
+    operation = change["operationType"]
+    if operation in ("insert", "update", "replace"):
+        card_doc = change.get("fullDocument")
+        if card_doc:
+            card_index.upsert(card_doc)
+    elif operation == "delete":
+        # Delete events carry only the _id
+        card_index.remove(change["documentKey"]["_id"])
+    elif operation == "invalidate":
+        # Collection dropped or renamed (drop/rename/dropDatabase all end in invalidate)
+        return False
+    else:
+        return True
+    card_index_state["changes_applied"] += 1
+    card_index_state["last_refresh"] = datetime.now()
+    return True
+
+async def follow_card_changes():
+    """Build the index and follow the change stream (needs a replica set or Atlas)"""
+    global card_index
+    while True:
+        # Opening the stream starts it server-side, so writes made during the build are replayed
+        async with database[COLLECTION_NAME].watch(full_document="updateLookup") as stream:
+            card_index = await build_card_index()
+            card_index_state["mode"] = "change_stream"
+            print(f"✅ Card index built: {len(card_index)} cards, {card_index.memory_bytes() / 1e6:.1f} MB packed")
+            print("👀 Card index following the insurance_cards change stream")
+            async for change in stream:
+                if not apply_card_change(change):
+                    break
+        print("🔁 insurance_cards change stream invalidated; rebuilding the card index")
+
+async def maintain_card_index():
+    """Build the card index, then keep it current until shutdown"""
+    global card_index
+    try:
+        try:
+            await follow_card_changes()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Change stream unavailable, polling card changes every {CARD_INDEX_POLL_SECONDS}s: {e}")
+        
+        card_index_state["mode"] = "polling"
+        # Watermark first: cards written during the build are picked up by the next poll
+        watermark = datetime.now()
+        card_index = await build_card_index()
+        print(f"✅ Card index built: {len(card_index)} cards, {card_index.memory_bytes() / 1e6:.1f} MB packed")
+        while True:
+            await asyncio.sleep(CARD_INDEX_POLL_SECONDS)
+            try:
+                if (datetime.now() - card_index.built_at).total_seconds() >= CARD_INDEX_REBUILD_SECONDS:
+                    # Periodic rebuild drops deleted cards and compacts replaced text
+                    watermark = datetime.now()
+                    card_index = await build_card_index()
+                watermark = await apply_card_changes(watermark)
+            except Exception as e:
+                print(f"⚠️ Error refreshing card index: {e}")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"⚠️ Card index unavailable, validating against MongoDB: {e}")
+
+async def find_card(card_number: str) -> Optional[dict]:
+    """Look a card up in the in-memory index, falling back to MongoDB when it is not there"""
+    if card_index is not None:
+        card_doc = card_index.get(card_number)
+        if card_doc is not None:
+            return card_doc
+    return await database[COLLECTION_NAME].find_one({"card_number": card_number})
+
+# Bulk card loading
+def record_load_error(summary: dict, row_number: int, message: str):
+    summary["failed"] += 1
+    if len(summary["errors"]) < CARD_LOAD_MAX_REPORTED_ERRORS:
+        summary["errors"].append({"row": row_number, "error": message})
+    else:
+        summary["errors_truncated"] = True
+
+async def drop_secondary_card_indexes():
+    """Drop every card index except _id and the unique card_number index the upserts rely on"""
+    async for index in database[COLLECTION_NAME].list_indexes():
+        if list(index["key"].keys()) not in (["_id"], ["card_number"]):
+            await database[COLLECTION_NAME].drop_index(index["name"])
+
+async def write_card_chunk(documents: list, last_row: int, load_id: Optional[str], source: Optional[str], summary: dict):
+    """Upsert one chunk with an unordered bulk_write, then advance the checkpoint past it"""
+    # Within a chunk the last row for a card number wins, as it would when loading row by row
+    latest = {}
+    for row_number, document in documents:
+        latest[document["card_number"]] = (row_number, document)
+    rows = list(latest.values())
+    updated_at = datetime.now()
+    
+    if rows:
+        operations = [
+            UpdateOne({"card_number": document["card_number"]}, {"$set": {**document, "updated_at": updated_at}}, upsert=True)
+            for _, document in rows
+        ]
+        try:
+            result = await database[COLLECTION_NAME].bulk_write(operations, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for write_error in details.get("writeErrors", []):
+                record_load_error(summary, rows[write_error["index"]][0], write_error.get("errmsg", "Write error"))
+        summary["upserted"] += details.get("nUpserted", 0)
+        summary["modified"] += details.get("nModified", 0)
+        summary["unchanged"] += details.get("nMatched", 0) - details.get("nModified", 0)
+    
+    if load_id:
+        await database[LOAD_CHECKPOINTS_COLLECTION_NAME].update_one(
+            {"_id": load_id},
+            {"$set": {"rows_committed": last_row, "source": source, "completed": False, "updated_at": datetime.now()}},
+            upsert=True
+        )
+
+async def load_insurance_cards(
+    chunks,
+    load_format: str,
+    chunk_size: int = CARD_LOAD_CHUNK_SIZE,
+    load_id: Optional[str] = None,
+    source: Optional[str] = None,
+    defer_indexes: bool = False
+):
+    """
+    Upsert cards from a CSV/NDJSON byte stream (an async iterator of chunks)
+    
+    With a load_id, progress is checkpointed after every chunk and an interrupted
+    load resumes after the last committed row (upserts make replays harmless).
+    With defer_indexes, secondary indexes are dropped for the load and rebuilt once at the end.
+    That is offline-only: lookups and searches scan the collection until the rebuild finishes,
+    so it is rejected unless CARD_LOAD_MAINTENANCE_MODE is set.
+    The next chunk is parsed while the previous one is being written.
+    """
+    if defer_indexes and not CARD_LOAD_MAINTENANCE_MODE:
+        raise CardLoadError(
+            "defer_indexes is offline-only (secondary indexes are dropped for the whole load); "
+            "set CARD_LOAD_MAINTENANCE_MODE=true during a maintenance window"
+        )
+    
+    started = time.perf_counter()
+    summary = {
+        "format": load_format,
+        "load_id": load_id,
+        "rows": 0,
+        "resumed_after_row": 0,
+        "upserted": 0,
+        "modified": 0,
+        "unchanged": 0,
+        "failed": 0,
+        "errors": [],
+        "errors_truncated": False,
+    }
+    
+    if load_id:
+        checkpoint = await database[LOAD_CHECKPOINTS_COLLECTION_NAME].find_one({"_id": load_id})
+        if checkpoint and not checkpoint.get("completed"):
+            summary["resumed_after_row"] = checkpoint["rows_committed"]
+    skip_rows = summary["resumed_after_row"]
+    
+    if defer_indexes:
+        await drop_secondary_card_indexes()
+    
+    pending_write = None
+    try:
+        async for rows in iter_row_chunks(chunks, load_format, chunk_size):
+            summary["rows"] += len(rows)
+            last_row = rows[-1][0]
+            if last_row <= skip_rows:
+                continue
+            
+            parsed = []
+            for row_number, row in rows:
+                if row_number <= skip_rows:
+                    continue
+                if isinstance(row, CardLoadError):
+                    record_load_error(summary, row_number, str(row))
+                else:
+                    parsed.append((row_number, row))
+            documents, errors = build_card_documents(parsed)
+            for row_number, message in errors:
+                record_load_error(summary, row_number, message)
+            
+            if pending_write:
+                await pending_write
+            pending_write = asyncio.create_task(write_card_chunk(documents, last_row, load_id, source, summary))
+        
+        if pending_write:
+            await pending_write
+            pending_write = None
+    finally:
+        if pending_write:
+            pending_write.cancel()
+        if defer_indexes:
+            index_started = time.perf_counter()
+            await database[COLLECTION_NAME].create_indexes(CARD_INDEXES)
+            summary["index_build_seconds"] = round(time.perf_counter() - index_started, 3)
+    
+    if load_id:
+        await database[LOAD_CHECKPOINTS_COLLECTION_NAME].update_one(
+            {"_id": load_id},
+            {"$set": {"completed": True, "rows_committed": summary["rows"], "updated_at": datetime.now()}},
+            upsert=True
+        )
+    
+    # Counters and downstream caches can't be patched card by card after a bulk load
+    await recompute_insurance_stats()
+    notify_card_changed(None)
+    
+    summary["errors"].sort(key=lambda error: error["row"])
+    elapsed = time.perf_counter() - started
+    loaded_rows = summary["rows"] - skip_rows
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["rows_per_second"] = round(loaded_rows / elapsed, 1) if elapsed else 0.0
+    return summary
 
 # API Routes
 @app.get("/")
@@ -250,6 +753,63 @@ async def health_check():
         "timestamp": datetime.now()
     }
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Request latency histograms, span breakdown and MongoDB command counters (Prometheus text format)"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=false)")
+    return Response(
+        request_metrics.render({
+            "card_index_cards": len(card_index) if card_index is not None else 0,
+            "cache_invalidations_in_flight": len(notify_tasks),
+        }),
+        media_type=PROMETHEUS_CONTENT_TYPE,
+    )
+
+@app.get("/debug/profiles", dependencies=[Depends(verify_internal_token)])
+async def list_profiles():
+    """Recent profile captures (send X-Profile: cprofile|pyinstrument with X-Internal-Token to capture one)"""
+    if profile_store is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (PROFILING_ENABLED=false)")
+    return profile_store.list()
+
+@app.get("/debug/profiles/{profile_id}", dependencies=[Depends(verify_internal_token)])
+async def get_profile(profile_id: str):
+    """One profile report as plain text"""
+    profile = profile_store.get(profile_id) if profile_store else None
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(profile["report"], media_type="text/plain; charset=utf-8")
+
+@app.get("/api/v1/insurance/admin/slow-queries", dependencies=[Depends(verify_internal_token)])
+async def get_slow_queries(
+    view: str = Query("entries", pattern="^(entries|shapes)$", description="entries (newest first) or shapes (per query shape)"),
+    limit: int = Query(100, ge=1, le=10000)
+):
+    """Slow MongoDB operations with their query shape and, for reads, the explained plan"""
+    if slow_query_log is None:
+        raise HTTPException(status_code=404, detail="Slow query log is disabled (SLOW_QUERY_LOG_ENABLED=false)")
+    items = slow_query_log.entries(limit) if view == "entries" else slow_query_log.shapes()[:limit]
+    return {**slow_query_log.stats(), view: items}
+
+@app.delete("/api/v1/insurance/admin/slow-queries", dependencies=[Depends(verify_internal_token)])
+async def clear_slow_queries():
+    """Empty the slow query log and forget explained shapes"""
+    if slow_query_log is None:
+        raise HTTPException(status_code=404, detail="Slow query log is disabled (SLOW_QUERY_LOG_ENABLED=false)")
+    slow_query_log.clear()
+    return {"cleared": True}
+
+@app.get("/metrics/card-index")
+async def card_index_metrics():
+    """In-memory card index size, freshness and hit rate"""
+    return {
+        "enabled": CARD_INDEX_ENABLED,
+        "ready": card_index is not None,
+        **card_index_state,
+        **(card_index.stats() if card_index is not None else {}),
+    }
+
 @app.post("/api/v1/insurance/validate", response_model=InsuranceValidationResponse)
 async def validate_insurance_card(request: InsuranceValidationRequest):
     """
@@ -257,71 +817,180 @@ async def validate_insurance_card(request: InsuranceValidationRequest):
     Kết nối với MongoDB để kiểm tra thông tin thẻ
     """
     
-    # Validate card number format
-    if not validate_card_number_format(request.card_number):
-        return InsuranceValidationResponse(
-            is_valid=False,
-            message="Số thẻ BHYT không đúng định dạng (phải có 15 ký tự: 2 chữ cái + 13 số)"
-        )
-    
-    # Check if card exists in database
-    card_doc = await database[COLLECTION_NAME].find_one({"card_number": request.card_number})
-    
-    if not card_doc:
-        return InsuranceValidationResponse(
-            is_valid=False,
-            message="Thẻ BHYT không tồn tại trong hệ thống"
-        )
-    
-    # Convert datetime back to date for comparison
-    card_dob = card_doc["date_of_birth"].date() if isinstance(card_doc["date_of_birth"], datetime) else card_doc["date_of_birth"]
+    # Skip the database lookup for malformed card numbers
+    card_doc = None
+    if is_valid_card_number(request.card_number):
+        card_doc = await find_card(request.card_number)
     
-    # Validate date of birth only
-    if card_dob != request.date_of_birth:
-        return InsuranceValidationResponse(
-            is_valid=False,
-            message="Ngày sinh không khớp với thẻ BHYT"
+    # The result is already JSON-ready; returning a Response skips response_model re-validation
+    return FastJSONResponse(evaluate(card_doc, request.card_number, request.date_of_birth))
+
+@app.post("/api/v1/insurance/validate/batch")
+async def validate_insurance_cards_batch(request: BatchValidationRequest):
+    """
+    Xác thực nhiều thẻ BHYT trong một lần gọi
+    Tra cứu bằng truy vấn $in và trả kết quả dạng NDJSON (mỗi dòng một thẻ, theo thứ tự đầu vào)
+    """
+    if len(request.items) > BATCH_VALIDATION_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {BATCH_VALIDATION_MAX_ITEMS} items)"
         )
     
-    # Check if card is expired
-    if is_card_expired(card_doc["valid_to"]):
-        return InsuranceValidationResponse(
-            is_valid=False,
-            message="Thẻ BHYT đã hết hạn"
-        )
+    async def generate():
+        for offset in range(0, len(request.items), BATCH_VALIDATION_CHUNK_SIZE):
+            chunk = request.items[offset:offset + BATCH_VALIDATION_CHUNK_SIZE]
+            
+            # One round trip per chunk for every well-formed card number not in the card index
+            card_numbers = {item.card_number for item in chunk if is_valid_card_number(item.card_number)}
+            cards = {}
+            if card_index is not None:
+                for card_number in card_numbers:
+                    card_doc = card_index.get(card_number)
+                    if card_doc is not None:
+                        cards[card_number] = card_doc
+                card_numbers -= cards.keys()
+            if card_numbers:
+                async for card_doc in database[COLLECTION_NAME].find({"card_number": {"$in": list(card_numbers)}}):
+                    cards[card_doc["card_number"]] = card_doc
+            
+            lines = []
+            for index, item in enumerate(chunk, start=offset):
+                result = evaluate(cards.get(item.card_number), item.card_number, item.date_of_birth)
+                lines.append(dumps({
+                    **result,
+                    "index": index,
+                    "card_number": item.card_number,
+                    "date_of_birth": item.date_of_birth.isoformat(),
+                }))
+            yield b"\n".join(lines) + b"\n"
     
-    # Valid card - convert datetime fields back to dates for response
-    card_info = card_doc.copy()
-    card_info["_id"] = str(card_info["_id"])
-    card_info["date_of_birth"] = card_dob
-    card_info["valid_from"] = card_info["valid_from"].date() if isinstance(card_info["valid_from"], datetime) else card_info["valid_from"]
-    card_info["valid_to"] = card_info["valid_to"].date() if isinstance(card_info["valid_to"], datetime) else card_info["valid_to"]
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+def card_to_json(card_doc: dict) -> dict:
+    """Convert a stored card to JSON-ready values without building an InsuranceCard model"""
+    result = {}
+    for key, value in card_doc.items():
+        if key == "_id":
+            result["_id"] = str(value)
+        elif isinstance(value, datetime):
+            result[key] = value.date().isoformat()
+        else:
+            result[key] = value
+    return result
+
+def build_card_filter(
+    issued_place: Optional[str] = None,
+    card_prefix: Optional[str] = None,
+    valid_on: Optional[date] = None,
+    expires_after: Optional[date] = None,
+    expires_before: Optional[date] = None
+) -> dict:
+    """MongoDB filter for the card listing; every condition can use an index"""
+    query = {}
+    if issued_place:
+        query["issued_place"] = issued_place
+    if card_prefix:
+        query["card_number"] = {"$regex": "^" + re.escape(card_prefix.upper())}
     
-    insurance_card = InsuranceCard(**card_info)
-    coverage = calculate_coverage(card_doc["hospital_level"], "Hạng I")  # Assume our hospital is level I
+    valid_to = {}
+    if expires_after:
+        valid_to["$gte"] = datetime.combine(expires_after, datetime.min.time())
+    if expires_before:
+        valid_to["$lte"] = datetime.combine(expires_before, datetime.min.time())
+    if valid_on:
+        day = datetime.combine(valid_on, datetime.min.time())
+        query["valid_from"] = {"$lte": day}
+        valid_to["$gte"] = max(valid_to.get("$gte", day), day)
+    if valid_to:
+        query["valid_to"] = valid_to
+    return query
+
+def encode_card_cursor(card_number: str) -> str:
+    return base64.urlsafe_b64encode(card_number.encode()).decode().rstrip("=")
+
+def decode_card_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode((cursor + "=" * (-len(cursor) % 4)).encode()).decode()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def stream_cards(query: dict, projection: Optional[dict], export_format: str, fields: List[str]):
+    """Yield NDJSON lines or CSV rows batch by batch; the full result set is never held in memory"""
+    cursor = database[COLLECTION_NAME].find(query, projection).sort("card_number", ASCENDING).batch_size(CARD_EXPORT_BATCH_SIZE)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == "csv" else None
+    if writer:
+        writer.writerow(fields)
     
-    return InsuranceValidationResponse(
-        is_valid=True,
-        message="Thẻ BHYT hợp lệ",
-        card_info=insurance_card,
-        coverage_percentage=coverage,
-        hospital_level="Hạng I"
-    )
+    count = 0
+    async for card_doc in cursor:
+        card = card_to_json(card_doc)
+        if writer:
+            writer.writerow([card.get(field, "") for field in fields])
+        else:
+            buffer.write(json.dumps(card, ensure_ascii=False))
+            buffer.write("\n")
+        count += 1
+        if count % CARD_EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
 
-@app.get("/api/v1/insurance/cards", response_model=List[InsuranceCard])
-async def get_all_cards():
-    """Get all insurance cards from database"""
+@app.get("/api/v1/insurance/cards")
+async def get_all_cards(
+    limit: int = Query(100, ge=1, le=1000, description="Số thẻ mỗi trang (chỉ với format=json)"),
+    cursor: Optional[str] = Query(None, description="Con trỏ trang tiếp theo (header X-Next-Cursor)"),
+    issued_place: Optional[str] = Query(None, description="Lọc theo nơi cấp thẻ"),
+    card_prefix: Optional[str] = Query(None, description="Lọc theo tiền tố số thẻ"),
+    valid_on: Optional[date] = Query(None, description="Thẻ còn hiệu lực vào ngày này"),
+    expires_after: Optional[date] = Query(None, description="Hạn thẻ (valid_to) từ ngày"),
+    expires_before: Optional[date] = Query(None, description="Hạn thẻ (valid_to) đến ngày"),
+    fields: Optional[str] = Query(None, description="Các trường cần lấy, phân cách bằng dấu phẩy"),
+    export_format: str = Query("json", alias="format", pattern="^(json|ndjson|csv)$", description="json (phân trang), ndjson hoặc csv (xuất toàn bộ)")
+):
+    """
+    Get insurance cards from database
+    format=json returns one page (next page cursor in X-Next-Cursor);
+    format=ndjson/csv streams every matching card
+    """
     try:
-        cursor = database[COLLECTION_NAME].find({})
-        cards = []
-        async for card_doc in cursor:
-            # Convert datetime fields back to dates
-            card_doc["_id"] = str(card_doc["_id"])
-            card_doc["date_of_birth"] = card_doc["date_of_birth"].date() if isinstance(card_doc["date_of_birth"], datetime) else card_doc["date_of_birth"]
-            card_doc["valid_from"] = card_doc["valid_from"].date() if isinstance(card_doc["valid_from"], datetime) else card_doc["valid_from"]
-            card_doc["valid_to"] = card_doc["valid_to"].date() if isinstance(card_doc["valid_to"], datetime) else card_doc["valid_to"]
-            cards.append(InsuranceCard(**card_doc))
-        return cards
+        query = build_card_filter(issued_place, card_prefix, valid_on, expires_after, expires_before)
+        
+        selected_fields = CARD_FIELDS
+        projection = None
+        if fields:
+            selected_fields = [field.strip() for field in fields.split(",") if field.strip()]
+            unknown = set(selected_fields) - set(CARD_FIELDS)
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+            # card_number is always returned, it is the pagination key
+            projection = {field: 1 for field in selected_fields + ["card_number"]}
+        
+        if export_format != "json":
+            media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+            return StreamingResponse(
+                stream_cards(query, projection, export_format, selected_fields),
+                media_type=media_type,
+                headers={"Content-Disposition": f"attachment; filename=insurance_cards.{export_format}"}
+            )
+        
+        if cursor:
+            after = {"card_number": {"$gt": decode_card_cursor(cursor)}}
+            query = {"$and": [query, after]} if query else after
+        
+        find_cursor = database[COLLECTION_NAME].find(query, projection).sort("card_number", ASCENDING).limit(limit + 1)
+        cards = [card_to_json(card_doc) async for card_doc in find_cursor]
+        headers = {}
+        if len(cards) > limit:
+            cards = cards[:limit]
+            headers["X-Next-Cursor"] = encode_card_cursor(cards[-1]["card_number"])
+        # Already JSON-ready: skip FastAPI's jsonable_encoder pass over every card
+        return FastJSONResponse(cards, headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
@@ -334,8 +1003,13 @@ async def add_insurance_card(card: InsuranceCard):
         card_data["date_of_birth"] = datetime.combine(card_data["date_of_birth"], datetime.min.time())
         card_data["valid_from"] = datetime.combine(card_data["valid_from"], datetime.min.time())
         card_data["valid_to"] = datetime.combine(card_data["valid_to"], datetime.min.time())
+        card_data["updated_at"] = datetime.now()
         
         result = await database[COLLECTION_NAME].insert_one(card_data)
+        if card_index is not None:
+            card_index.upsert(card_data)
+        await record_card_in_stats(card_data)
+        notify_card_changed(card.card_number)
         return {
             "message": "Insurance card added successfully", 
             "card_number": card.card_number,
@@ -346,6 +1020,36 @@ async def add_insurance_card(card: InsuranceCard):
             raise HTTPException(status_code=400, detail="Card number already exists")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@app.post("/api/v1/insurance/cards/bulk", dependencies=[Depends(verify_internal_token)])
+async def bulk_load_cards(
+    request: Request,
+    load_format: str = Query("csv", alias="format", description="csv | ndjson"),
+    chunk_size: int = Query(CARD_LOAD_CHUNK_SIZE, ge=1, le=100000),
+    load_id: Optional[str] = Query(None, description="Checkpoint key; re-sending the same load resumes it"),
+    defer_indexes: bool = Query(False, description="Offline only (needs CARD_LOAD_MAINTENANCE_MODE): drop secondary indexes during the load and rebuild them after")
+):
+    """Bulk upsert insurance cards from a CSV or NDJSON request body, parsed as it streams in"""
+    if load_format not in LOAD_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(LOAD_FORMATS)}")
+    try:
+        return await load_insurance_cards(
+            request.stream(), load_format, chunk_size=chunk_size,
+            load_id=load_id, source="api", defer_indexes=defer_indexes
+        )
+    except CardLoadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/api/v1/insurance/cards/bulk/{load_id}", dependencies=[Depends(verify_internal_token)])
+async def get_bulk_load_checkpoint(load_id: str):
+    """Progress of a checkpointed bulk load"""
+    checkpoint = await database[LOAD_CHECKPOINTS_COLLECTION_NAME].find_one({"_id": load_id})
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail="Load not found")
+    checkpoint["load_id"] = checkpoint.pop("_id")
+    return checkpoint
+
 @app.get("/api/v1/insurance/card/{card_number}")
 async def get_card_info(card_number: str):
     """Get insurance card information by card number"""
@@ -355,46 +1059,46 @@ async def get_card_info(card_number: str):
         if not card_doc:
             raise HTTPException(status_code=404, detail="Card not found")
         
-        # Convert datetime fields back to dates
-        card_doc["_id"] = str(card_doc["_id"])
-        card_doc["date_of_birth"] = card_doc["date_of_birth"].date() if isinstance(card_doc["date_of_birth"], datetime) else card_doc["date_of_birth"]
-        card_doc["valid_from"] = card_doc["valid_from"].date() if isinstance(card_doc["valid_from"], datetime) else card_doc["valid_from"]
-        card_doc["valid_to"] = card_doc["valid_to"].date() if isinstance(card_doc["valid_to"], datetime) else card_doc["valid_to"]
-        
-        return InsuranceCard(**card_doc)
+        return FastJSONResponse(card_info_json(card_doc))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+async def read_insurance_stats() -> dict:
+    summary = await database[STATS_COLLECTION_NAME].find_one({"_id": STATS_SUMMARY_ID})
+    if summary is None:
+        summary = await recompute_insurance_stats()
+    else:
+        summary = await roll_over_insurance_stats(summary)
+    
+    issued_places = [
+        {"place": doc["place"], "count": doc["count"]}
+        async for doc in database[STATS_COLLECTION_NAME].find({"kind": "issued_place", "count": {"$gt": 0}}).sort("count", -1)
+    ]
+    return {
+        "total_cards": summary["total_cards"],
+        "valid_cards": summary["valid_cards"],
+        "expired_cards": summary["expired_cards"],
+        "issued_places": issued_places,
+        "as_of": summary["as_of"].date(),
+        "recomputed_at": summary["recomputed_at"],
+    }
+
 @app.get("/api/v1/insurance/stats")
 async def get_insurance_stats():
-    """Get insurance database statistics"""
+    """Get insurance database statistics (served from the materialized counters)"""
     try:
-        total_cards = await database[COLLECTION_NAME].count_documents({})
-        
-        # Count valid vs expired cards
-        current_date = datetime.now()
-        valid_cards = await database[COLLECTION_NAME].count_documents({
-            "valid_to": {"$gte": current_date}
-        })
-        expired_cards = total_cards - valid_cards
-        
-        # Group by issued place
-        pipeline = [
-            {"$group": {"_id": "$issued_place", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        issued_places = []
-        async for doc in database[COLLECTION_NAME].aggregate(pipeline):
-            issued_places.append({"place": doc["_id"], "count": doc["count"]})
-        
-        return {
-            "total_cards": total_cards,
-            "valid_cards": valid_cards,
-            "expired_cards": expired_cards,
-            "issued_places": issued_places
-        }
+        return await read_insurance_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.post("/api/v1/insurance/stats/recompute", dependencies=[Depends(verify_internal_token)])
+async def recompute_insurance_stats_endpoint():
+    """Force a full recompute of the statistics from insurance_cards (reconciliation)"""
+    try:
+        await recompute_insurance_stats()
+        return await read_insurance_stats()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
@@ -0,0 +1,124 @@
+"""
+Hot-path card validation
+
+Everything a validate call needs is prepared once at import time: the compiled
+card number pattern, the coverage table, the pre-built negative results, and a
+"today" that only changes at midnight. Results are plain JSON-ready dicts in the
+InsuranceValidationResponse shape, serialized with orjson when it is installed,
+so no Pydantic models are built per call.
+"""
+
+import json
+import re
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+    FastJSONResponse = JSONResponse
+
+CARD_NUMBER_PATTERN = re.compile(r"^[A-Z]{2}\d{13}$")
+
+# Assume our hospital is level I
+OUR_HOSPITAL_LEVEL = "Hạng I"
+
+# (card level, hospital level) -> coverage percentage
+COVERAGE_TABLE = {
+    ("Hạng I", "Hạng I"): 100,
+    ("Hạng I", "Hạng II"): 80,
+    ("Hạng I", "Hạng III"): 60,
+    ("Hạng II", "Hạng II"): 100,
+    ("Hạng II", "Hạng III"): 80,
+    ("Hạng III", "Hạng III"): 100,
+}
+DEFAULT_COVERAGE = 60
+
+CARD_INFO_FIELDS = (
+    "card_number", "full_name", "date_of_birth", "address", "issued_place",
+    "valid_from", "valid_to", "coverage_percentage", "hospital_level",
+)
+
+
+def _invalid(message: str) -> dict:
+    return {
+        "is_valid": False,
+        "message": message,
+        "card_info": None,
+        "coverage_percentage": None,
+        "hospital_level": None,
+    }
+
+
+# Shared, never mutated: callers copy before adding fields
+RESULT_BAD_FORMAT = _invalid("Số thẻ BHYT không đúng định dạng (phải có 15 ký tự: 2 chữ cái + 13 số)")
+RESULT_NOT_FOUND = _invalid("Thẻ BHYT không tồn tại trong hệ thống")
+RESULT_DOB_MISMATCH = _invalid("Ngày sinh không khớp với thẻ BHYT")
+RESULT_EXPIRED = _invalid("Thẻ BHYT đã hết hạn")
+MESSAGE_VALID = "Thẻ BHYT hợp lệ"
+
+_today: Optional[date] = None
+_today_expires_at = 0.0
+
+
+def today() -> date:
+    """date.today(), recomputed only once the local day has changed"""
+    global _today, _today_expires_at
+    now = time.time()
+    if now >= _today_expires_at:
+        _today = date.today()
+        _today_expires_at = datetime.combine(_today + timedelta(days=1), datetime.min.time()).timestamp()
+    return _today
+
+
+def is_valid_card_number(card_number: str) -> bool:
+    """BHYT card number format: 2 letters + 13 digits"""
+    return CARD_NUMBER_PATTERN.match(card_number) is not None
+
+
+def coverage_for(card_level: str, hospital_level: str = OUR_HOSPITAL_LEVEL) -> int:
+    return COVERAGE_TABLE.get((card_level, hospital_level), DEFAULT_COVERAGE)
+
+
+def _as_date(value):
+    """MongoDB stores dates as datetime; convert back to date"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def card_info_json(card_doc: dict) -> dict:
+    """A stored card in the InsuranceCard JSON shape, without building the model"""
+    info = {"_id": str(card_doc["_id"])}
+    for field in CARD_INFO_FIELDS:
+        value = card_doc.get(field)
+        info[field] = value.date().isoformat() if isinstance(value, datetime) else value
+    return info
+
+
+def evaluate(card_doc: Optional[dict], card_number: str, date_of_birth: date) -> dict:
+    """Run format, existence, date of birth and expiry checks against an already-fetched card"""
+    if CARD_NUMBER_PATTERN.match(card_number) is None:
+        return RESULT_BAD_FORMAT
+    if not card_doc:
+        return RESULT_NOT_FOUND
+    if _as_date(card_doc["date_of_birth"]) != date_of_birth:
+        return RESULT_DOB_MISMATCH
+    if _as_date(card_doc["valid_to"]) < today():
+        return RESULT_EXPIRED
+    return {
+        "is_valid": True,
+        "message": MESSAGE_VALID,
+        "card_info": card_info_json(card_doc),
+        "coverage_percentage": coverage_for(card_doc["hospital_level"]),
+        "hospital_level": OUR_HOSPITAL_LEVEL,
+    }
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
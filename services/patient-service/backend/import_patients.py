@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Nhập hàng loạt bệnh nhân từ file CSV/NDJSON (tiếp nhận phòng khám đối tác)
+Sử dụng: python3 import_patients.py patients.csv [--format csv|ndjson] [--batch-size 1000]
+                                 [--insurance-concurrency 20] [--errors errors.ndjson]
+
+The file is read in chunks; see patient_import.py for the expected columns.
+"""
+
+import argparse
+import asyncio
+import json
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import main
+from patient_import import IMPORT_FORMATS, detect_format
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+async def read_chunks(path: str):
+    with open(path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def run(args):
+    mongo_client = AsyncIOMotorClient(main.MONGODB_URL)
+    try:
+        db = mongo_client[main.DATABASE_NAME]
+        summary = await main.import_patients(
+            db,
+            read_chunks(args.path),
+            args.format or detect_format(args.path),
+            batch_size=args.batch_size,
+            insurance_concurrency=args.insurance_concurrency,
+        )
+    finally:
+        await main.get_insurance_client().aclose()
+        mongo_client.close()
+    return summary
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk import patients from a CSV or NDJSON file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=main.IMPORT_BATCH_SIZE)
+    parser.add_argument("--insurance-concurrency", type=int, default=main.IMPORT_INSURANCE_CONCURRENCY,
+                        help="Insurance validations in flight at once")
+    parser.add_argument("--errors", help="Write per-row errors to this NDJSON file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"📥 Importing patients from {args.path}...")
+    summary = asyncio.run(run(args))
+    print(f"✅ {summary['rows']} rows in {summary['elapsed_seconds']}s ({summary['rows_per_second']} rows/s): "
+          f"{summary['inserted']} inserted, {summary['failed']} failed "
+          f"({summary['duplicates']} duplicates), insurance {summary['insurance_validated']} valid / "
+          f"{summary['insurance_invalid']} invalid")
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as f:
+            for error in summary["errors"]:
+                f.write(json.dumps(error, ensure_ascii=False) + "\n")
+        print(f"📝 Row errors written to {args.errors}")
+    else:
+        for error in summary["errors"][:20]:
+            print(f"   ❌ row {error['row']}: {error['error']}")
+    if summary["errors_truncated"]:
+        print(f"⚠️ Only the first {main.IMPORT_MAX_REPORTED_ERRORS} errors were kept")
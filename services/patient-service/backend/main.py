@@ -1,19 +1,40 @@
-from fastapi import FastAPI, HTTPException, Depends, Query, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Header, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import IndexModel, ASCENDING
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from pymongo import IndexModel, ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pydantic import BaseModel, EmailStr, Field, ValidationError
+from typing import Optional, List, Literal, Tuple, Union
+from collections import OrderedDict
 from datetime import datetime, date, timedelta
-from bson import ObjectId
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
 import uvicorn
 import os
 import httpx
 from dotenv import load_dotenv
+from patient_search import (
+    SEARCH_FIELDS_VERSION, SEARCH_INDEXES, SEARCH_MODES, SEARCH_MODE_PREFIX,
+    build_search_fields, build_search_updates, build_patient_filter
+)
+from patient_import import IMPORT_FORMATS, ImportRowError, iter_record_batches
+from hospital_common.instrumentation import (
+    PROMETHEUS_CONTENT_TYPE, MongoCommandTimer, ProfileStore, RequestMetrics, RequestMetricsMiddleware, span
+)
+from hospital_common.slow_queries import SlowQueryLog
+from response_json import FastJSONResponse, patient_json, user_json
+from hospital_common.http_caching import ConditionalCompressionMiddleware, etag_matches, weak_etag
+from hospital_common.worker_leader import WorkerLeader
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 import secrets
+import random
+import asyncio
+import time
+import json
+import base64
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 
 # Load environment variables
 load_dotenv()
@@ -24,26 +45,593 @@ DATABASE_NAME = "hospital_management"
 COLLECTION_NAME = "patients"
 USERS_COLLECTION_NAME = "users"
 
+# Patient search: backfill `search` keys for older documents in the background on startup
+SEARCH_BACKFILL_ON_STARTUP = os.getenv("SEARCH_BACKFILL_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+SEARCH_BACKFILL_BATCH_SIZE = int(os.getenv("SEARCH_BACKFILL_BATCH_SIZE", "1000"))
+
+# Serialize patient/user documents straight to JSON with orjson, skipping response_model
+# re-validation of data read from our own collections
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+# Patient list sort orders (keyset pagination continues from the last (sort key, _id))
+PATIENT_SORT_FIELDS = {
+    "name": "full_name_normalized",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+# Insurance validation on create/update: "sync" waits for the Insurance Service,
+# "deferred" stores the patient as pending and validates in a background worker queue
+INSURANCE_VALIDATION_MODE = os.getenv("INSURANCE_VALIDATION_MODE", "sync")
+INSURANCE_VALIDATION_WORKERS = int(os.getenv("INSURANCE_VALIDATION_WORKERS", "4"))
+INSURANCE_VALIDATION_MAX_ATTEMPTS = int(os.getenv("INSURANCE_VALIDATION_MAX_ATTEMPTS", "6"))
+INSURANCE_VALIDATION_RETRY_BASE_DELAY = float(os.getenv("INSURANCE_VALIDATION_RETRY_BASE_DELAY", "1"))
+INSURANCE_VALIDATION_RETRY_MAX_DELAY = float(os.getenv("INSURANCE_VALIDATION_RETRY_MAX_DELAY", "60"))
+# A worker claims a pending patient with a lease in MongoDB; one worker per service re-queues
+# pending patients whose lease ran out (worker recycled, retry due) every sweep interval
+INSURANCE_VALIDATION_LEASE_SECONDS = float(os.getenv("INSURANCE_VALIDATION_LEASE_SECONDS", "120"))
+INSURANCE_VALIDATION_SWEEP_SECONDS = float(os.getenv("INSURANCE_VALIDATION_SWEEP_SECONDS", "30"))
+INSURANCE_VALIDATION_SWEEP_BATCH = int(os.getenv("INSURANCE_VALIDATION_SWEEP_BATCH", "1000"))
+VALIDATION_PENDING = "pending"
+
+# Bulk patient import (POST /api/v1/patients/import and import_patients.py)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_INSURANCE_CONCURRENCY = int(os.getenv("IMPORT_INSURANCE_CONCURRENCY", "20"))
+IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000"))
+
 # Insurance Service Configuration
 INSURANCE_SERVICE_URL = os.getenv("INSURANCE_SERVICE_URL", "http://127.0.0.1:8002")
 
+# Insurance Service HTTP client pool configuration
+INSURANCE_HTTP_MAX_CONNECTIONS = int(os.getenv("INSURANCE_HTTP_MAX_CONNECTIONS", "100"))
+INSURANCE_HTTP_MAX_KEEPALIVE = int(os.getenv("INSURANCE_HTTP_MAX_KEEPALIVE", "20"))
+INSURANCE_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("INSURANCE_HTTP_KEEPALIVE_EXPIRY", "30"))
+INSURANCE_HTTP_TIMEOUT = float(os.getenv("INSURANCE_HTTP_TIMEOUT", "10"))
+INSURANCE_HTTP_CONNECT_TIMEOUT = float(os.getenv("INSURANCE_HTTP_CONNECT_TIMEOUT", "3"))
+INSURANCE_HTTP2 = os.getenv("INSURANCE_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# Insurance validation cache configuration
+INSURANCE_CACHE_ENABLED = os.getenv("INSURANCE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+INSURANCE_CACHE_MAX_SIZE = int(os.getenv("INSURANCE_CACHE_MAX_SIZE", "10000"))
+INSURANCE_CACHE_TTL = float(os.getenv("INSURANCE_CACHE_TTL", "3600"))
+INSURANCE_CACHE_NEGATIVE_TTL = float(os.getenv("INSURANCE_CACHE_NEGATIVE_TTL", "60"))
+# How long past expiry a cached result may still be served while the Insurance Service is unavailable
+INSURANCE_CACHE_STALE_TTL = float(os.getenv("INSURANCE_CACHE_STALE_TTL", "86400"))
+
+# Circuit breaker: open after N consecutive failures, probe again (half-open) after the recovery timeout
+INSURANCE_BREAKER_ENABLED = os.getenv("INSURANCE_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+INSURANCE_BREAKER_FAILURE_THRESHOLD = int(os.getenv("INSURANCE_BREAKER_FAILURE_THRESHOLD", "5"))
+INSURANCE_BREAKER_RECOVERY_TIMEOUT = float(os.getenv("INSURANCE_BREAKER_RECOVERY_TIMEOUT", "30"))
+INSURANCE_BREAKER_HALF_OPEN_MAX_CALLS = int(os.getenv("INSURANCE_BREAKER_HALF_OPEN_MAX_CALLS", "1"))
+
+# Bulkhead: at most N concurrent Insurance Service calls; callers wait up to MAX_WAIT seconds for a slot
+INSURANCE_BULKHEAD_MAX_CONCURRENT = int(os.getenv("INSURANCE_BULKHEAD_MAX_CONCURRENT", "50"))
+INSURANCE_BULKHEAD_MAX_WAIT = float(os.getenv("INSURANCE_BULKHEAD_MAX_WAIT", "0.5"))
+
+# Nightly insurance re-validation (batch endpoint)
+INSURANCE_REVALIDATION_BATCH_SIZE = int(os.getenv("INSURANCE_REVALIDATION_BATCH_SIZE", "5000"))
+INSURANCE_REVALIDATION_TIMEOUT = float(os.getenv("INSURANCE_REVALIDATION_TIMEOUT", "120"))
+
+# Shared secret for service-to-service and admin calls; internal endpoints return 403 while it is empty
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN", "")
+
+# Cache invalidations are published to a collection that every worker follows (change stream, or
+# polling on standalone MongoDB), so a request reaching one worker clears the cache in all of them
+CACHE_INVALIDATIONS_COLLECTION_NAME = "cache_invalidations"
+CACHE_INVALIDATION_POLL_SECONDS = float(os.getenv("CACHE_INVALIDATION_POLL_SECONDS", "1"))
+CACHE_INVALIDATION_POLL_OVERLAP_SECONDS = 5
+CACHE_INVALIDATION_RETENTION_SECONDS = 3600
+
+# Principal cache for get_current_user (decoded JWT + user lookup)
+AUTH_CACHE_ENABLED = os.getenv("AUTH_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000"))
+# Invalidate cached principals from a change stream on the users collection (needs a replica set)
+AUTH_CACHE_WATCH_USERS = os.getenv("AUTH_CACHE_WATCH_USERS", "true").lower() in ("1", "true", "yes")
+
 # Authentication Configuration
-SECRET_KEY = os.getenv("SECRET_KEY", secrets.token_urlsafe(32))
+SECRET_KEY = os.getenv("SECRET_KEY", "")
+if not SECRET_KEY:
+    # Workers do not share memory: a random key per worker rejects tokens issued by the others
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        raise RuntimeError("SECRET_KEY must be set when running more than one worker")
+    SECRET_KEY = secrets.token_urlsafe(32)
+    print("⚠️ SECRET_KEY is not set; using a random key (tokens stop working after a restart)")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: bcrypt cost factor and the pool that runs it off the event loop
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # thread | process
+
+# Request instrumentation: per-route histograms and span breakdown on /metrics (Prometheus)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Profiling: requests with "X-Profile: cprofile|pyinstrument" and X-Internal-Token, plus a random sample, are profiled
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DEFAULT_PROFILER = os.getenv("PROFILE_DEFAULT_PROFILER", "cprofile")  # cprofile | pyinstrument
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+
+# Slow MongoDB operation log (ring buffer behind /api/v1/admin/slow-queries); each new slow read shape is explained once
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "500"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+
+# Conditional GET (ETag / If-None-Match -> 304) and gzip/brotli compression of large GET responses
+HTTP_ETAGS_ENABLED = os.getenv("HTTP_ETAGS_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_COMPRESSION_ENABLED = os.getenv("HTTP_COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_COMPRESSION_MIN_SIZE = int(os.getenv("HTTP_COMPRESSION_MIN_SIZE", "1024"))
+HTTP_GZIP_LEVEL = int(os.getenv("HTTP_GZIP_LEVEL", "6"))
+HTTP_BROTLI_QUALITY = int(os.getenv("HTTP_BROTLI_QUALITY", "4"))
+
+# Multi-worker deployments (run-services.py): workers race for this lock file and the holder
+# runs the once-per-service startup jobs; unset means a single process that always runs them
+WORKER_LEADER_LOCK = os.getenv("WORKER_LEADER_LOCK")
+
+# Hashes with any other cost are flagged by needs_update and rehashed on the next login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 security = HTTPBearer()
 
 # Global variables for database
 mongo_client: AsyncIOMotorClient = None
 database = None
 
+# Bounded pool for bcrypt work (created on first use)
+password_executor: Executor = None
+
+# Deferred insurance validation queue and its workers (started on startup)
+validation_queue: asyncio.Queue = None
+validation_queued = set()
+validation_workers: List[asyncio.Task] = []
+validation_sweeper_task: asyncio.Task = None
+worker_leader = WorkerLeader(WORKER_LEADER_LOCK)
+leader_task: asyncio.Task = None
+validation_queue_stats = {"enqueued": 0, "completed": 0, "retried": 0, "failed": 0, "in_flight": 0, "swept": 0, "claim_misses": 0}
+
+# Shared HTTP client for Insurance Service calls (created on startup)
+insurance_client: httpx.AsyncClient = None
+insurance_client_http2 = False
+insurance_client_stats = {
+    "requests_total": 0,
+    "requests_failed": 0,
+    "in_flight": 0,
+    "max_in_flight": 0,
+}
+
+request_metrics = RequestMetrics()
+profile_store = ProfileStore(PROFILE_KEEP) if PROFILING_ENABLED else None
+slow_query_log = SlowQueryLog(SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_EXPLAIN) if SLOW_QUERY_LOG_ENABLED else None
+
 # Helper function to convert ObjectId to string
 def str_object_id(v):
     return str(v) if isinstance(v, ObjectId) else v
 
+# Insurance Service HTTP client
+def create_insurance_client() -> httpx.AsyncClient:
+    """Create the pooled, keep-alive HTTP client used for Insurance Service calls"""
+    global insurance_client_http2
+    limits = httpx.Limits(
+        max_connections=INSURANCE_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=INSURANCE_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=INSURANCE_HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(INSURANCE_HTTP_TIMEOUT, connect=INSURANCE_HTTP_CONNECT_TIMEOUT)
+    http2 = INSURANCE_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("⚠️ INSURANCE_HTTP2 is enabled but 'h2' is not installed, falling back to HTTP/1.1")
+            http2 = False
+    insurance_client_http2 = http2
+    return httpx.AsyncClient(
+        base_url=INSURANCE_SERVICE_URL,
+        limits=limits,
+        timeout=timeout,
+        http2=http2,
+    )
+
+def get_insurance_client() -> httpx.AsyncClient:
+    """Return the shared Insurance Service client, creating it if the app has not started it"""
+    global insurance_client
+    if insurance_client is None or insurance_client.is_closed:
+        insurance_client = create_insurance_client()
+    return insurance_client
+
+# Circuit breaker and bulkhead around Insurance Service calls
+class InsuranceServiceUnavailable(httpx.RequestError):
+    """Raised without calling the Insurance Service (circuit open or bulkhead full)"""
+
+class CircuitBreaker:
+    """
+    closed: calls go through; consecutive failures past the threshold open the circuit
+    open: calls fail fast until the recovery timeout has passed
+    half_open: a limited number of probe calls decide between closing and re-opening
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.times_opened = 0
+        self.rejected = 0
+    
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.half_open_calls = 0
+        if self.state == self.HALF_OPEN:
+            if self.half_open_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self.half_open_calls += 1
+        return True
+    
+    def record_success(self):
+        if self.state == self.HALF_OPEN:
+            print(f"✅ {self.name} circuit closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+    
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                print(f"⚠️ {self.name} circuit opened after {self.consecutive_failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    def release(self):
+        """Give back a half-open probe slot for a call that ended without an outcome (e.g. cancelled)"""
+        if self.state == self.HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+    
+    def retry_after(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+    
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+class Bulkhead:
+    """Caps concurrent calls so a slow dependency cannot take every request slot"""
+    
+    def __init__(self, max_concurrent: int, max_wait: float):
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.rejected = 0
+    
+    async def acquire(self) -> bool:
+        if self._semaphore.locked():
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.max_wait)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                return False
+        else:
+            await self._semaphore.acquire()
+        self.active += 1
+        return True
+    
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+    
+    def snapshot(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "rejected": self.rejected,
+        }
+
+insurance_breaker = CircuitBreaker(
+    "Insurance Service",
+    INSURANCE_BREAKER_FAILURE_THRESHOLD,
+    INSURANCE_BREAKER_RECOVERY_TIMEOUT,
+    INSURANCE_BREAKER_HALF_OPEN_MAX_CALLS,
+)
+insurance_bulkhead = Bulkhead(INSURANCE_BULKHEAD_MAX_CONCURRENT, INSURANCE_BULKHEAD_MAX_WAIT)
+
+class InsuranceCallGuard:
+    """
+    async with InsuranceCallGuard() as guard: ... guard.observe(response.status_code)
+    Connection errors and 5xx responses count as breaker failures
+    """
+    
+    def __init__(self):
+        self.server_error = False
+    
+    def observe(self, status_code: int):
+        self.server_error = status_code >= 500
+    
+    async def __aenter__(self):
+        if INSURANCE_BREAKER_ENABLED and not insurance_breaker.allow():
+            raise InsuranceServiceUnavailable(
+                f"Insurance service circuit open, retry in {insurance_breaker.retry_after():.1f}s"
+            )
+        if not await insurance_bulkhead.acquire():
+            insurance_breaker.release()
+            raise InsuranceServiceUnavailable("Insurance service bulkhead full")
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        insurance_bulkhead.release()
+        if not INSURANCE_BREAKER_ENABLED:
+            return False
+        if exc_type is None:
+            if self.server_error:
+                insurance_breaker.record_failure()
+            else:
+                insurance_breaker.record_success()
+        elif issubclass(exc_type, httpx.RequestError) or (
+            isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code >= 500
+        ):
+            insurance_breaker.record_failure()
+        else:
+            insurance_breaker.release()
+        return False
+
+async def post_to_insurance_service(path: str, payload: dict, timeout: Optional[float] = None) -> httpx.Response:
+    """
+    POST to the Insurance Service through the shared connection pool, the circuit breaker and the bulkhead
+    Raises httpx.RequestError on connection problems (InsuranceServiceUnavailable when failing fast)
+    """
+    client = get_insurance_client()
+    async with InsuranceCallGuard() as guard:
+        stats = insurance_client_stats
+        stats["requests_total"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            kwargs = {"json": payload}
+            if timeout is not None:
+                kwargs["timeout"] = timeout
+            with span("http"):
+                response = await client.post(path, **kwargs)
+            guard.observe(response.status_code)
+            return response
+        except Exception:
+            stats["requests_failed"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+
+def get_insurance_client_metrics() -> dict:
+    """Snapshot of Insurance Service client usage and connection pool state"""
+    metrics = {
+        "base_url": INSURANCE_SERVICE_URL,
+        "http2": insurance_client_http2,
+        "limits": {
+            "max_connections": INSURANCE_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": INSURANCE_HTTP_MAX_KEEPALIVE,
+            "keepalive_expiry": INSURANCE_HTTP_KEEPALIVE_EXPIRY,
+        },
+        "timeout": {
+            "default": INSURANCE_HTTP_TIMEOUT,
+            "connect": INSURANCE_HTTP_CONNECT_TIMEOUT,
+        },
+        **insurance_client_stats,
+        "pool": None,
+    }
+    
+    # httpx does not expose pool state publicly, so read it defensively from httpcore
+    pool = getattr(getattr(insurance_client, "_transport", None), "_pool", None)
+    if pool is not None and insurance_client and not insurance_client.is_closed:
+        connections = list(getattr(pool, "connections", []))
+        metrics["pool"] = {
+            "connections": len(connections),
+            "idle": sum(1 for conn in connections if conn.is_idle()),
+            "active": sum(1 for conn in connections if not conn.is_idle() and not conn.is_closed()),
+            "queued_requests": len(getattr(pool, "_requests", [])),
+        }
+    return metrics
+
+# Insurance validation cache
+class InsuranceValidationCache:
+    """
+    Bounded LRU + TTL cache for Insurance Service validation results
+    Keyed by (card_number, date_of_birth); concurrent misses for the same key
+    share a single in-flight request to the Insurance Service
+    """
+    
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float, stale_ttl: float = 0.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        # key -> (fresh until, usable as a fallback until, result)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, float, dict]]" = OrderedDict()
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_hits = 0
+    
+    def _entry_ttl(self, data: dict) -> Tuple[float, float]:
+        """
+        (fresh TTL, fallback TTL); positive results never outlive the card's valid_to
+        date, not even as a fallback
+        """
+        if not data.get("is_valid"):
+            return self.negative_ttl, self.negative_ttl + self.stale_ttl
+        
+        ttl = self.ttl
+        stale_ttl = self.ttl + self.stale_ttl
+        valid_to = (data.get("card_info") or {}).get("valid_to")
+        if valid_to:
+            try:
+                # Card stays valid through valid_to, so it expires at the following midnight
+                expires_at = datetime.combine(date.fromisoformat(str(valid_to)[:10]) + timedelta(days=1), datetime.min.time())
+                remaining = (expires_at - datetime.now()).total_seconds()
+                ttl = min(ttl, remaining)
+                stale_ttl = min(stale_ttl, remaining)
+            except ValueError:
+                pass
+        return ttl, stale_ttl
+    
+    def get(self, key: Tuple[str, str]) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, stale_until, data = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            # Kept past expiry only as a fallback for when the Insurance Service is unavailable
+            if stale_until <= now:
+                del self._entries[key]
+                self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return data
+    
+    def get_stale(self, key: Tuple[str, str]) -> Optional[dict]:
+        """Expired-but-retained result, served when the Insurance Service cannot be reached"""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        self.stale_hits += 1
+        return entry[2]
+    
+    def put(self, key: Tuple[str, str], data: dict):
+        ttl, stale_ttl = self._entry_ttl(data)
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        self._entries[key] = (now + ttl, now + max(ttl, stale_ttl), data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    async def get_or_load(self, key: Tuple[str, str], loader):
+        """
+        Return the cached result for key or run loader() once for all concurrent callers
+        loader returns (status_code, data); only 200 responses are cached
+        """
+        data = self.get(key)
+        if data is not None:
+            self.hits += 1
+            return 200, data
+        
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(loader())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._on_loaded(key, t))
+        
+        # Shield so one cancelled caller does not cancel the shared request
+        return await asyncio.shield(task)
+    
+    def _on_loaded(self, key: Tuple[str, str], task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        status_code, data = task.result()
+        if status_code == 200 and data is not None:
+            self.put(key, data)
+    
+    def invalidate(self, card_number: Optional[str] = None) -> int:
+        """Drop cached results for one card (any date of birth), or everything"""
+        if card_number is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            keys = [key for key in self._entries if key[0] == card_number]
+            for key in keys:
+                del self._entries[key]
+            removed = len(keys)
+        self.invalidations += removed
+        return removed
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": INSURANCE_CACHE_ENABLED,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "negative_ttl": self.negative_ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_hits": self.stale_hits,
+            "in_flight": len(self._in_flight),
+        }
+
+insurance_validation_cache = InsuranceValidationCache(
+    INSURANCE_CACHE_MAX_SIZE, INSURANCE_CACHE_TTL, INSURANCE_CACHE_NEGATIVE_TTL, INSURANCE_CACHE_STALE_TTL
+)
+
+async def fetch_insurance_validation(card_number: str, date_of_birth: str):
+    """
+    Validate a card with the Insurance Service, going through the validation cache
+    Returns: (status_code, response_data); raises httpx.RequestError on connection problems
+    """
+    async def load():
+        response = await post_to_insurance_service(
+            "/api/v1/insurance/validate",
+            {
+                "card_number": card_number,
+                "date_of_birth": date_of_birth
+            }
+        )
+        if response.status_code == 200:
+            return 200, response.json()
+        return response.status_code, None
+    
+    if not INSURANCE_CACHE_ENABLED:
+        return await load()
+    key = (card_number, str(date_of_birth))
+    try:
+        return await insurance_validation_cache.get_or_load(key, load)
+    except httpx.RequestError:
+        # Circuit open, bulkhead full or connection failure: fall back to the last known result
+        stale = insurance_validation_cache.get_stale(key)
+        if stale is None:
+            raise
+        return 200, {**stale, "stale": True}
+
 # Insurance validation function
 async def validate_insurance_card(card_number: str, date_of_birth: str):
     """
@@ -51,22 +639,13 @@ async def validate_insurance_card(card_number: str, date_of_birth: str):
     Returns: (is_valid, card_info, error_message)
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{INSURANCE_SERVICE_URL}/api/v1/insurance/validate",
-                json={
-                    "card_number": card_number,
-                    "date_of_birth": date_of_birth
-                },
-                timeout=10.0
-            )
+        status_code, data = await fetch_insurance_validation(card_number, date_of_birth)
+        
+        if status_code == 200:
+            return data.get("is_valid", False), data.get("card_info"), data.get("message", "")
+        else:
+            return False, None, f"Insurance service error: {status_code}"
             
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("is_valid", False), data.get("card_info"), data.get("message", "")
-            else:
-                return False, None, f"Insurance service error: {response.status_code}"
-                
     except httpx.RequestError as e:
         return False, None, f"Failed to connect to insurance service: {str(e)}"
     except Exception as e:
@@ -103,6 +682,400 @@ async def process_insurance_info(patient_data: dict, date_of_birth: str):
     
     return True, error_msg if not is_valid else None
 
+# Bulk insurance re-validation
+async def stream_batch_validation(items: List[dict]):
+    """POST items to the Insurance Service batch endpoint and yield each NDJSON result"""
+    client = get_insurance_client()
+    async with InsuranceCallGuard(), client.stream(
+        "POST",
+        "/api/v1/insurance/validate/batch",
+        json={"items": items},
+        timeout=INSURANCE_REVALIDATION_TIMEOUT
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            raise httpx.HTTPStatusError(
+                f"Insurance service error: {response.status_code}",
+                request=response.request,
+                response=response
+            )
+        async for line in response.aiter_lines():
+            if line.strip():
+                yield json.loads(line)
+
+async def revalidate_insurance_batch(db, patients: List[dict], summary: dict):
+    """Validate one batch of patients' cards and write the results with a single bulk_write"""
+    items = [
+        {"card_number": p["insurance_info"]["card_number"], "date_of_birth": p["date_of_birth"]}
+        for p in patients
+    ]
+    validation_date = datetime.utcnow()
+    operations = []
+    async for result in stream_batch_validation(items):
+        patient = patients[result["index"]]
+        card_info = result.get("card_info") or {}
+        if result["is_valid"]:
+            update = {
+                "insurance_info.is_validated": True,
+                "insurance_info.validation_date": validation_date,
+                "insurance_info.coverage_percentage": card_info.get("coverage_percentage"),
+                "insurance_info.notes": f"Validated successfully. Hospital level: {card_info.get('hospital_level', 'N/A')}",
+            }
+            summary["valid"] += 1
+        else:
+            update = {
+                "insurance_info.is_validated": False,
+                "insurance_info.validation_date": validation_date,
+                "insurance_info.notes": f"Validation failed: {result['message']}",
+            }
+            summary["invalid"] += 1
+        # updated_at changes with insurance_info so the patient's ETag changes too
+        update["updated_at"] = validation_date
+        operations.append(UpdateOne({"_id": patient["_id"]}, {"$set": update}))
+        
+        if INSURANCE_CACHE_ENABLED:
+            insurance_validation_cache.put((result["card_number"], result["date_of_birth"]), result)
+    
+    if operations:
+        write_result = await db[COLLECTION_NAME].bulk_write(operations, ordered=False)
+        summary["updated"] += write_result.modified_count
+
+async def revalidate_all_patients_insurance(db, batch_size: int = INSURANCE_REVALIDATION_BATCH_SIZE):
+    """
+    Re-check every patient's insurance card against the Insurance Service
+    Uses the batch validation endpoint and bulk_write instead of one call + update per patient
+    """
+    started = time.perf_counter()
+    summary = {"patients": 0, "valid": 0, "invalid": 0, "skipped": 0, "updated": 0}
+    
+    cursor = db[COLLECTION_NAME].find(
+        {"insurance_info.card_number": {"$nin": [None, ""]}},
+        {"insurance_info.card_number": 1, "date_of_birth": 1}
+    )
+    batch = []
+    async for patient in cursor:
+        summary["patients"] += 1
+        try:
+            date.fromisoformat(patient.get("date_of_birth") or "")
+        except (TypeError, ValueError):
+            # Same rule as create/update: no usable date of birth, no validation
+            summary["skipped"] += 1
+            continue
+        batch.append(patient)
+        if len(batch) >= batch_size:
+            await revalidate_insurance_batch(db, batch, summary)
+            batch = []
+    if batch:
+        await revalidate_insurance_batch(db, batch, summary)
+    
+    summary["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+# Deferred insurance validation
+def use_deferred_validation(defer: Optional[bool]) -> bool:
+    return INSURANCE_VALIDATION_MODE == "deferred" if defer is None else defer
+
+def mark_insurance_pending(insurance_info: dict):
+    insurance_info["is_validated"] = VALIDATION_PENDING
+    insurance_info["validation_date"] = None
+    insurance_info["validation_attempts"] = 0
+    insurance_info["validation_lease_until"] = None
+    insurance_info["notes"] = "Validation pending"
+
+def enqueue_insurance_validation(patient_id: str):
+    """Queue a pending patient in this worker; the MongoDB claim decides who actually validates it"""
+    if patient_id in validation_queued:
+        return
+    validation_queued.add(patient_id)
+    validation_queue.put_nowait(patient_id)
+    validation_queue_stats["enqueued"] += 1
+
+def lease_expired_filter(now: datetime) -> dict:
+    return {"$or": [
+        {"insurance_info.validation_lease_until": None},
+        {"insurance_info.validation_lease_until": {"$lte": now}},
+    ]}
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(INSURANCE_VALIDATION_RETRY_MAX_DELAY, INSURANCE_VALIDATION_RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+
+async def run_deferred_validation(db, patient_id: str):
+    """Validate one pending patient's card and write the result back, scheduling a retry on transient errors"""
+    # Claim the patient: only one worker holds an unexpired lease, and a worker that dies
+    # mid-validation leaves a lease that runs out and gets swept up again
+    now = datetime.utcnow()
+    patient = await db[COLLECTION_NAME].find_one_and_update(
+        {"_id": ObjectId(patient_id), "insurance_info.is_validated": VALIDATION_PENDING, **lease_expired_filter(now)},
+        {"$set": {"insurance_info.validation_lease_until": now + timedelta(seconds=INSURANCE_VALIDATION_LEASE_SECONDS)}},
+        projection={"insurance_info.card_number": 1, "insurance_info.validation_attempts": 1, "date_of_birth": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not patient:
+        validation_queue_stats["claim_misses"] += 1
+        return  # Already validated, edited, deleted or claimed by another worker
+    card_number = patient["insurance_info"]["card_number"]
+    attempt = (patient["insurance_info"].get("validation_attempts") or 0) + 1
+    
+    error = None
+    try:
+        status_code, data = await fetch_insurance_validation(card_number, patient["date_of_birth"])
+        if status_code >= 500:
+            error = f"Insurance service error: {status_code}"
+        elif data and data.get("stale"):
+            # A cached result served during an outage is not a verdict; retry against the live service
+            error = "Insurance service unavailable (only a stale cached result)"
+    except httpx.RequestError as e:
+        error = f"Failed to connect to insurance service: {str(e)}"
+    
+    if error and attempt < INSURANCE_VALIDATION_MAX_ATTEMPTS:
+        validation_queue_stats["retried"] += 1
+        # The lease doubles as the backoff: nobody claims the patient before the retry is due
+        delay = retry_delay(attempt)
+        now = datetime.utcnow()
+        await db[COLLECTION_NAME].update_one(
+            {"_id": patient["_id"], "insurance_info.card_number": card_number, "insurance_info.is_validated": VALIDATION_PENDING},
+            {"$set": {
+                "insurance_info.validation_attempts": attempt,
+                "insurance_info.validation_lease_until": now + timedelta(seconds=delay),
+                "insurance_info.notes": f"Validation pending (retrying: {error})",
+                "updated_at": now,
+            }}
+        )
+        asyncio.get_running_loop().call_later(delay, enqueue_insurance_validation, patient_id)
+        return
+    
+    validation_date = datetime.utcnow()
+    update = {
+        "insurance_info.validation_date": validation_date,
+        "insurance_info.validation_attempts": attempt,
+        "insurance_info.validation_lease_until": None,
+        "updated_at": validation_date,
+    }
+    if error:
+        update["insurance_info.is_validated"] = False
+        update["insurance_info.notes"] = f"Validation failed after {attempt} attempts: {error}"
+        validation_queue_stats["failed"] += 1
+    elif status_code == 200 and data.get("is_valid"):
+        card_info = data.get("card_info") or {}
+        update["insurance_info.is_validated"] = True
+        update["insurance_info.coverage_percentage"] = card_info.get("coverage_percentage")
+        update["insurance_info.notes"] = f"Validated successfully. Hospital level: {card_info.get('hospital_level', 'N/A')}"
+    else:
+        message = data.get("message", "") if data else f"Insurance service error: {status_code}"
+        update["insurance_info.is_validated"] = False
+        update["insurance_info.notes"] = f"Validation failed: {message}"
+    
+    # Only resolve the card that was validated; an edit in the meantime re-queues its own job
+    await db[COLLECTION_NAME].update_one(
+        {"_id": patient["_id"], "insurance_info.card_number": card_number, "insurance_info.is_validated": VALIDATION_PENDING},
+        {"$set": update}
+    )
+    validation_queue_stats["completed"] += 1
+
+async def insurance_validation_worker(db):
+    while True:
+        patient_id = await validation_queue.get()
+        validation_queued.discard(patient_id)
+        validation_queue_stats["in_flight"] += 1
+        try:
+            await run_deferred_validation(db, patient_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Deferred insurance validation failed for {patient_id}: {e}")
+        finally:
+            validation_queue_stats["in_flight"] -= 1
+            validation_queue.task_done()
+
+async def requeue_pending_validations(db) -> int:
+    """
+    Queue pending patients nobody holds a lease on: jobs lost with a restarted or recycled
+    worker (each worker's queue lives in its memory) and retries whose backoff is over
+    """
+    count = 0
+    cursor = db[COLLECTION_NAME].find(
+        {"insurance_info.is_validated": VALIDATION_PENDING, **lease_expired_filter(datetime.utcnow())},
+        {"_id": 1}
+    ).limit(INSURANCE_VALIDATION_SWEEP_BATCH)
+    async for patient in cursor:
+        patient_id = str(patient["_id"])
+        if patient_id not in validation_queued:
+            enqueue_insurance_validation(patient_id)
+            count += 1
+    validation_queue_stats["swept"] += count
+    return count
+
+async def sweep_pending_validations(db):
+    """Leader-only loop: re-queue pending patients every INSURANCE_VALIDATION_SWEEP_SECONDS"""
+    while True:
+        try:
+            count = await requeue_pending_validations(db)
+            if count:
+                print(f"🔁 Re-queued {count} pending insurance validations")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Error re-queueing pending insurance validations: {e}")
+        await asyncio.sleep(INSURANCE_VALIDATION_SWEEP_SECONDS)
+
+async def run_leader_jobs(db):
+    """Startup jobs that run in one worker per service (see hospital_common.worker_leader)"""
+    global validation_sweeper_task
+    if SEARCH_BACKFILL_ON_STARTUP:
+        asyncio.create_task(backfill_search_fields(db))
+    validation_sweeper_task = asyncio.create_task(sweep_pending_validations(db))
+
+# Principal cache
+class PrincipalCache:
+    """
+    Bounded LRU cache of authenticated users keyed by access token
+    Entries never outlive the token's exp claim, so a hit skips both the JWT
+    decode and the users collection lookup
+    """
+    
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._entries[token]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return dict(user)
+    
+    def put(self, token: str, user: dict, token_exp: Optional[float] = None):
+        ttl = self.ttl
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        self._entries[token] = (time.monotonic() + ttl, dict(user))
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate_user(self, user_id: Optional[str] = None, email: Optional[str] = None) -> int:
+        """Drop every cached token of a user (after deactivation or a role change)"""
+        tokens = [
+            token for token, (_, user) in self._entries.items()
+            if (user_id is not None and user.get("_id") == user_id)
+            or (email is not None and user.get("email") == email)
+        ]
+        for token in tokens:
+            del self._entries[token]
+        self.invalidations += len(tokens)
+        return len(tokens)
+    
+    def clear(self) -> int:
+        removed = len(self._entries)
+        self._entries.clear()
+        self.invalidations += removed
+        return removed
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": AUTH_CACHE_ENABLED,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "watching_users": users_watch_task is not None and not users_watch_task.done(),
+        }
+
+principal_cache = PrincipalCache(AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL)
+users_watch_task: asyncio.Task = None
+
+async def watch_users_for_principal_cache(db):
+    """Invalidate cached principals whenever a user document changes"""
+    try:
+        async with db[USERS_COLLECTION_NAME].watch(
+            [{"$match": {"operationType": {"$in": ["update", "replace", "delete"]}}}]
+        ) as stream:
+            async for change in stream:
+                principal_cache.invalidate_user(user_id=str(change["documentKey"]["_id"]))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # Standalone MongoDB has no change streams; fall back to TTL-only expiry
+        print(f"⚠️ Users change stream unavailable, principal cache relies on TTL ({AUTH_CACHE_TTL}s): {e}")
+
+# Cache invalidation fan-out across workers
+WORKER_ID = secrets.token_hex(8)
+cache_invalidation_task: asyncio.Task = None
+
+def apply_cache_invalidation(event: dict) -> int:
+    """Drop the entries an invalidation names from this worker's caches; returns how many"""
+    if event["cache"] == "insurance":
+        return insurance_validation_cache.invalidate(event.get("card_number"))
+    if event.get("user_id") is None and event.get("email") is None:
+        return principal_cache.clear()
+    return principal_cache.invalidate_user(event.get("user_id"), event.get("email"))
+
+async def publish_cache_invalidation(db, event: dict) -> int:
+    """Apply an invalidation here, then record it for the other workers"""
+    removed = apply_cache_invalidation(event)
+    await db[CACHE_INVALIDATIONS_COLLECTION_NAME].insert_one(
+        {**event, "origin": WORKER_ID, "created_at": datetime.utcnow()}
+    )
+    return removed
+
+async def follow_cache_invalidations(db):
+    """Apply invalidations published by the other workers"""
+    collection = db[CACHE_INVALIDATIONS_COLLECTION_NAME]
+    try:
+        async with collection.watch([{"$match": {"operationType": "insert"}}]) as stream:
+            async for change in stream:
+                if change["fullDocument"].get("origin") != WORKER_ID:
+                    apply_cache_invalidation(change["fullDocument"])
+        return
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"⚠️ Cache invalidation change stream unavailable, polling every {CACHE_INVALIDATION_POLL_SECONDS}s: {e}")
+    
+    # Each poll re-reads a short overlap so an event stamped just before the previous poll (a late
+    # insert, another host's clock) is still seen; ids already applied are skipped
+    overlap = timedelta(seconds=CACHE_INVALIDATION_POLL_OVERLAP_SECONDS)
+    since = datetime.utcnow()
+    applied = {}
+    while True:
+        await asyncio.sleep(CACHE_INVALIDATION_POLL_SECONDS)
+        try:
+            polled_at = datetime.utcnow()
+            async for event in collection.find({"created_at": {"$gte": since - overlap}}):
+                if event["_id"] in applied:
+                    continue
+                applied[event["_id"]] = event["created_at"]
+                if event.get("origin") != WORKER_ID:
+                    apply_cache_invalidation(event)
+            since = polled_at
+            applied = {event_id: created_at for event_id, created_at in applied.items() if created_at >= since - overlap}
+        except Exception as e:
+            print(f"⚠️ Error polling cache invalidations: {e}")
+
 # Authentication Functions
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
@@ -112,6 +1085,39 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """Verify a password and return a new hash if the stored one uses an outdated cost"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def get_password_executor() -> Executor:
+    global password_executor
+    if password_executor is None:
+        if PASSWORD_HASH_EXECUTOR == "process":
+            password_executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        else:
+            # bcrypt releases the GIL, so threads hash in parallel
+            password_executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+            )
+    return password_executor
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the bcrypt pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    with span("password"):
+        return await loop.run_in_executor(get_password_executor(), get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    """
+    Verify a password in the bcrypt pool without blocking the event loop
+    Returns: (is_valid, new_hash or None)
+    """
+    loop = asyncio.get_running_loop()
+    with span("password"):
+        return await loop.run_in_executor(
+            get_password_executor(), verify_and_update_password, plain_password, hashed_password
+        )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -139,8 +1145,16 @@ async def authenticate_user(db, email: str, password: str):
     user = await get_user_by_email(db, email)
     if not user:
         return False
-    if not verify_password(password, user["hashed_password"]):
+    is_valid, new_hash = await verify_password_async(password, user["hashed_password"])
+    if not is_valid:
         return False
+    if new_hash:
+        # Transparent rehash when BCRYPT_ROUNDS changed since the password was stored
+        await db[USERS_COLLECTION_NAME].update_one(
+            {"_id": ObjectId(user["_id"])},
+            {"$set": {"hashed_password": new_hash, "updated_at": datetime.utcnow()}}
+        )
+        user["hashed_password"] = new_hash
     return user
 
 async def get_current_user(
@@ -154,8 +1168,14 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    token = credentials.credentials
+    if AUTH_CACHE_ENABLED:
+        user = principal_cache.get(token)
+        if user is not None:
+            return user
+    
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
@@ -166,6 +1186,8 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
     
+    if AUTH_CACHE_ENABLED:
+        principal_cache.put(token, user, payload.get("exp"))
     return user
 
 async def get_current_active_user(current_user: dict = Depends(get_current_user)):
@@ -174,6 +1196,13 @@ async def get_current_active_user(current_user: dict = Depends(get_current_user)
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+def verify_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """Guard for service-to-service and admin endpoints; they stay closed until INTERNAL_API_TOKEN is set"""
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Internal endpoints are disabled (INTERNAL_API_TOKEN is not set)")
+    if not secrets.compare_digest(x_internal_token or "", INTERNAL_API_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid internal token")
+
 def require_role(allowed_roles: List[str]):
     """Role-based access control decorator"""
     def role_checker(current_user: dict = Depends(get_current_active_user)):
@@ -188,7 +1217,8 @@ def require_role(allowed_roles: List[str]):
 # Pydantic Models
 class InsuranceInfo(BaseModel):
     card_number: Optional[str] = None
-    is_validated: bool = False
+    is_validated: Union[bool, Literal["pending"]] = False
+    validation_attempts: Optional[int] = None
     validation_date: Optional[datetime] = None
     coverage_percentage: Optional[int] = None
     notes: Optional[str] = None
@@ -220,6 +1250,13 @@ class InsuranceValidationRequest(BaseModel):
     full_name: str
     date_of_birth: str
 
+class CacheInvalidationRequest(BaseModel):
+    card_number: Optional[str] = None
+
+class PrincipalInvalidationRequest(BaseModel):
+    user_id: Optional[str] = None
+    email: Optional[str] = None
+
 class PatientResponse(PatientBase):
     id: str = Field(alias="_id")
     created_at: datetime
@@ -227,6 +1264,13 @@ class PatientResponse(PatientBase):
     
     model_config = {"populate_by_name": True}
 
+class PatientPage(BaseModel):
+    items: List[PatientResponse]
+    total: int
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
 # Authentication Models
 class UserRole:
     PATIENT = "patient"
@@ -274,23 +1318,84 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "Server-Timing", "X-Profile-Id", "ETag"],
 )
 
+if HTTP_ETAGS_ENABLED or HTTP_COMPRESSION_ENABLED:
+    app.add_middleware(
+        ConditionalCompressionMiddleware,
+        etags=HTTP_ETAGS_ENABLED,
+        compress=HTTP_COMPRESSION_ENABLED,
+        minimum_size=HTTP_COMPRESSION_MIN_SIZE,
+        gzip_level=HTTP_GZIP_LEVEL,
+        brotli_quality=HTTP_BROTLI_QUALITY,
+    )
+
+if METRICS_ENABLED:
+    app.add_middleware(
+        RequestMetricsMiddleware,
+        metrics=request_metrics,
+        profiles=profile_store,
+        sample_rate=PROFILE_SAMPLE_RATE,
+        default_profiler=PROFILE_DEFAULT_PROFILER,
+        profile_token=INTERNAL_API_TOKEN,
+    )
+
 # Database startup and shutdown events
 @app.on_event("startup")
 async def startup_event():
-    global mongo_client, database
-    mongo_client = AsyncIOMotorClient(MONGODB_URL)
+    global mongo_client, database, insurance_client, users_watch_task, validation_queue, validation_workers, leader_task
+    global cache_invalidation_task
+    event_listeners = [MongoCommandTimer(request_metrics)] if METRICS_ENABLED else []
+    if slow_query_log:
+        event_listeners.append(slow_query_log)
+    mongo_client = AsyncIOMotorClient(MONGODB_URL, event_listeners=event_listeners)
+    if slow_query_log:
+        slow_query_log.attach(mongo_client, asyncio.get_running_loop())
     database = mongo_client[DATABASE_NAME]
     
+    # One long-lived, pooled client for all Insurance Service calls
+    insurance_client = create_insurance_client()
+    
     # Create indexes for better performance
     # Patients collection indexes
     await database[COLLECTION_NAME].create_indexes([
         IndexModel([("email", ASCENDING)], unique=True),
         IndexModel([("phone", ASCENDING)], unique=True),
         IndexModel([("full_name", ASCENDING)]),
+        *SEARCH_INDEXES,
+        IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)]),
+        # Only pending patients are indexed; the validation sweep reads nothing else
+        IndexModel(
+            [("insurance_info.is_validated", ASCENDING), ("insurance_info.validation_lease_until", ASCENDING)],
+            name="pending_validation_lease",
+            partialFilterExpression={"insurance_info.is_validated": VALIDATION_PENDING},
+        ),
     ])
     
+    if AUTH_CACHE_ENABLED and AUTH_CACHE_WATCH_USERS:
+        users_watch_task = asyncio.create_task(watch_users_for_principal_cache(database))
+    
+    # Invalidations are kept just long enough for every worker to have read them
+    await database[CACHE_INVALIDATIONS_COLLECTION_NAME].create_indexes([
+        IndexModel([("created_at", ASCENDING)], expireAfterSeconds=CACHE_INVALIDATION_RETENTION_SECONDS),
+    ])
+    cache_invalidation_task = asyncio.create_task(follow_cache_invalidations(database))
+    
+    # Deferred insurance validation workers
+    validation_queue = asyncio.Queue()
+    validation_workers = [
+        asyncio.create_task(insurance_validation_worker(database))
+        for _ in range(INSURANCE_VALIDATION_WORKERS)
+    ]
+    
+    # Search backfill and pending re-queue run once per service, not once per worker
+    if worker_leader.try_acquire():
+        await run_leader_jobs(database)
+    else:
+        leader_task = asyncio.create_task(worker_leader.run_when_leader(run_leader_jobs, database))
+    
     # Users collection indexes
     await database[USERS_COLLECTION_NAME].create_indexes([
         IndexModel([("email", ASCENDING)], unique=True),
@@ -299,6 +1404,21 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    if leader_task:
+        leader_task.cancel()
+    if validation_sweeper_task:
+        validation_sweeper_task.cancel()
+    worker_leader.release()
+    if users_watch_task:
+        users_watch_task.cancel()
+    if cache_invalidation_task:
+        cache_invalidation_task.cancel()
+    for worker in validation_workers:
+        worker.cancel()
+    if password_executor:
+        password_executor.shutdown(wait=False)
+    if insurance_client:
+        await insurance_client.aclose()
     if mongo_client:
         mongo_client.close()
 
@@ -307,6 +1427,33 @@ async def get_db():
     return database
 
 # Helper Functions
+async def backfill_search_fields(db, batch_size: int = SEARCH_BACKFILL_BATCH_SIZE):
+    """Compute full_name_normalized and `search` keys for documents written before they existed (or with an older version)"""
+    updated = 0
+    try:
+        cursor = db[COLLECTION_NAME].find(
+            {"search.v": {"$ne": SEARCH_FIELDS_VERSION}},
+            {"full_name": 1, "phone": 1, "email": 1}
+        )
+        operations = []
+        async for patient in cursor:
+            operations.append(UpdateOne(
+                {"_id": patient["_id"]},
+                {"$set": build_search_fields(patient)}
+            ))
+            if len(operations) >= batch_size:
+                result = await db[COLLECTION_NAME].bulk_write(operations, ordered=False)
+                updated += result.modified_count
+                operations = []
+        if operations:
+            result = await db[COLLECTION_NAME].bulk_write(operations, ordered=False)
+            updated += result.modified_count
+        if updated:
+            print(f"✅ Backfilled search fields for {updated} patients")
+    except Exception as e:
+        print(f"⚠️ Error backfilling search fields: {e}")
+    return updated
+
 async def get_patient_by_id(db, patient_id: str):
     """Get patient by MongoDB ObjectId"""
     try:
@@ -317,51 +1464,182 @@ async def get_patient_by_id(db, patient_id: str):
     except Exception:
         return None
 
+def patient_etag(patient: dict) -> str:
+    """Weak ETag of a stored patient: its id and updated_at"""
+    return weak_etag(f"{patient['_id']}-{patient['updated_at']:%Y%m%d%H%M%S%f}")
+
+def encode_cursor(sort: str, order: str, direction: str, patient: dict) -> str:
+    """Opaque pagination cursor pointing at a patient's (sort key, _id)"""
+    payload = {
+        "s": sort,
+        "o": order,
+        "d": direction,
+        "k": patient.get(PATIENT_SORT_FIELDS[sort]),
+        "id": ObjectId(patient["_id"]),
+    }
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] not in PATIENT_SORT_FIELDS or payload["d"] not in ("next", "prev"):
+            raise ValueError
+        if not isinstance(payload["id"], ObjectId):
+            raise ValueError
+        return payload
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def build_page_query(
+    sort: str,
+    order: str,
+    cursor: Optional[str],
+    skip: int
+):
+    """
+    Keyset pagination condition for a cursor, to be combined with the patient filter
+    Returns: (keyset_condition or None, sort_spec, skip, direction)
+    """
+    sort_field = PATIENT_SORT_FIELDS[sort]
+    order_dir = ASCENDING if order == "asc" else DESCENDING
+    
+    if not cursor:
+        return None, [(sort_field, order_dir), ("_id", order_dir)], skip, "next"
+    
+    position = decode_cursor(cursor)
+    if position["s"] != sort or position["o"] != order:
+        raise ValueError("Cursor does not match the requested sort order")
+    direction = position["d"]
+    
+    # Walk backwards from the cursor for "prev" pages, then restore display order
+    scan_dir = order_dir if direction == "next" else -order_dir
+    op = "$gt" if scan_dir == ASCENDING else "$lt"
+    keyset = {"$or": [
+        {sort_field: {op: position["k"]}},
+        {sort_field: position["k"], "_id": {op: position["id"]}},
+    ]}
+    return keyset, [(sort_field, scan_dir), ("_id", scan_dir)], 0, direction
+
+def finish_page(
+    patients: List[dict],
+    limit: int,
+    direction: str,
+    cursor: Optional[str],
+    skip: int,
+    sort: str,
+    order: str
+):
+    """
+    Trim the look-ahead document, restore display order and build neighbouring cursors
+    Returns: (patients, next_cursor, prev_cursor)
+    """
+    for patient in patients:
+        patient["_id"] = str(patient["_id"])
+    
+    has_more = len(patients) > limit
+    patients = patients[:limit]
+    if direction == "prev":
+        patients.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, bool(cursor) or skip > 0
+    
+    next_cursor = encode_cursor(sort, order, "next", patients[-1]) if patients and has_next else None
+    prev_cursor = encode_cursor(sort, order, "prev", patients[0]) if patients and has_prev else None
+    return patients, next_cursor, prev_cursor
+
 async def get_patients(
     db, 
     skip: int = 0, 
     limit: int = 100,
     name: Optional[str] = None,
     phone: Optional[str] = None,
-    email: Optional[str] = None
+    email: Optional[str] = None,
+    search_mode: str = SEARCH_MODE_PREFIX,
+    sort: str = "created_at",
+    order: str = "asc",
+    cursor: Optional[str] = None
 ):
-    """Get patients with optional filters"""
-    query = {}
-    
-    # Apply filters
-    if name:
-        query["full_name"] = {"$regex": name, "$options": "i"}
-    if phone:
-        query["phone"] = {"$regex": phone, "$options": "i"}
-    if email:
-        query["email"] = {"$regex": email, "$options": "i"}
-    
-    cursor = db[COLLECTION_NAME].find(query).skip(skip).limit(limit)
-    patients = []
-    async for patient in cursor:
-        patient["_id"] = str(patient["_id"])
-        patients.append(patient)
+    """
+    Get patients with optional filters
+    With a cursor, continues after/before the cursor's (sort key, _id) instead of skipping;
+    skip is only honoured without a cursor (backward compatibility)
+    Returns: (patients, next_cursor, prev_cursor)
+    """
+    query = build_patient_filter(name, phone, email, search_mode)
+    keyset, sort_spec, skip, direction = build_page_query(sort, order, cursor, skip)
+    if keyset:
+        query = {"$and": [query, keyset]} if query else keyset
+    
+    # Fetch one extra document to know whether another page exists
+    find_cursor = db[COLLECTION_NAME].find(query).sort(sort_spec).skip(skip).limit(limit + 1)
+    patients = [patient async for patient in find_cursor]
     
-    return patients
+    return finish_page(patients, limit, direction, cursor, skip, sort, order)
 
-async def create_patient(db, patient: PatientCreate):
-    """Create a new patient"""
-    # Check if email or phone already exists
-    existing = await db[COLLECTION_NAME].find_one({
-        "$or": [
-            {"email": patient.email},
-            {"phone": patient.phone}
-        ]
-    })
+async def get_patients_page(
+    db,
+    skip: int = 0,
+    limit: int = 100,
+    name: Optional[str] = None,
+    phone: Optional[str] = None,
+    email: Optional[str] = None,
+    search_mode: str = SEARCH_MODE_PREFIX,
+    sort: str = "created_at",
+    order: str = "asc",
+    cursor: Optional[str] = None
+):
+    """
+    Get one page of patients together with the total matching count
+    Filtered listings compute both in a single $facet aggregation; unfiltered listings
+    use the collection's estimated_document_count instead of counting
+    """
+    query = build_patient_filter(name, phone, email, search_mode)
+    keyset, sort_spec, page_skip, direction = build_page_query(sort, order, cursor, skip)
     
-    if existing:
-        raise HTTPException(
-            status_code=400, 
-            detail="Email or phone number already registered"
+    if query:
+        page_stages = [{"$match": keyset}] if keyset else []
+        page_stages += [
+            {"$sort": dict(sort_spec)},
+            {"$skip": page_skip},
+            {"$limit": limit + 1},
+        ]
+        pipeline = [
+            {"$match": query},
+            {"$facet": {
+                "items": page_stages,
+                "total": [{"$count": "count"}],
+            }},
+        ]
+        result = await db[COLLECTION_NAME].aggregate(pipeline).to_list(length=1)
+        facet = result[0] if result else {"items": [], "total": []}
+        patients = facet["items"]
+        total = facet["total"][0]["count"] if facet["total"] else 0
+        total_is_estimate = False
+    else:
+        find_cursor = db[COLLECTION_NAME].find(keyset or {}).sort(sort_spec).skip(page_skip).limit(limit + 1)
+        patients, total = await asyncio.gather(
+            find_cursor.to_list(length=limit + 1),
+            db[COLLECTION_NAME].estimated_document_count()
         )
+        total_is_estimate = True
     
+    patients, next_cursor, prev_cursor = finish_page(patients, limit, direction, cursor, page_skip, sort, order)
+    return {
+        "items": patients,
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }
+
+async def create_patient(db, patient: PatientCreate, defer_validation: Optional[bool] = None):
+    """Create a new patient"""
     # Create patient document
     patient_dict = patient.model_dump()
+    deferred = False
     
     # Process insurance information if provided
     if patient_dict.get("insurance_info") and patient_dict["insurance_info"].get("card_number"):
@@ -371,65 +1649,63 @@ async def create_patient(db, patient: PatientCreate):
                 detail="Date of birth is required for insurance validation"
             )
         
-        # Validate insurance card
-        success, error_msg = await process_insurance_info(
-            patient_dict, 
-            patient_dict["date_of_birth"]
-        )
+        if use_deferred_validation(defer_validation):
+            # Store now, validate in the background worker queue
+            mark_insurance_pending(patient_dict["insurance_info"])
+            deferred = True
+        else:
+            # Validate insurance card
+            success, error_msg = await process_insurance_info(
+                patient_dict, 
+                patient_dict["date_of_birth"]
+            )
         
         # If insurance validation fails, we still create the patient but with failed validation status
         # since insurance is optional
     
-    patient_dict["created_at"] = datetime.utcnow()
-    patient_dict["updated_at"] = datetime.utcnow()
+    patient_dict.update(build_search_fields(patient_dict))
+    # BSON dates keep milliseconds; truncate so the response matches what a later read returns
+    now = datetime.utcnow()
+    patient_dict["created_at"] = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    patient_dict["updated_at"] = patient_dict["created_at"]
     
-    result = await db[COLLECTION_NAME].insert_one(patient_dict)
+    # The unique email/phone indexes reject duplicates, no pre-check query needed
+    try:
+        result = await db[COLLECTION_NAME].insert_one(patient_dict)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=400, 
+            detail="Email or phone number already registered"
+        )
     
-    # Return the created patient
-    created_patient = await db[COLLECTION_NAME].find_one({"_id": result.inserted_id})
-    created_patient["_id"] = str(created_patient["_id"])
-    return created_patient
+    # The inserted document is exactly what was sent, no need to read it back
+    patient_dict["_id"] = str(result.inserted_id)
+    if deferred:
+        enqueue_insurance_validation(patient_dict["_id"])
+    return patient_dict
 
-async def update_patient(db, patient_id: str, patient_update: PatientUpdate):
-    """Update a patient"""
-    # Check if patient exists
-    existing_patient = await get_patient_by_id(db, patient_id)
-    if not existing_patient:
+async def update_patient(db, patient_id: str, patient_update: PatientUpdate, defer_validation: Optional[bool] = None):
+    """Update a patient with a single find_one_and_update returning the new document"""
+    try:
+        object_id = ObjectId(patient_id)
+    except (InvalidId, TypeError):
         return None
     
     # Prepare update data
     update_data = patient_update.model_dump(exclude_unset=True)
     if not update_data:
-        return existing_patient
-    
-    # Check for duplicate email/phone if being updated
-    if 'email' in update_data or 'phone' in update_data:
-        conflict_query = {"_id": {"$ne": ObjectId(patient_id)}}
-        if 'email' in update_data:
-            conflict_query["email"] = update_data['email']
-        if 'phone' in update_data:
-            conflict_query["phone"] = update_data['phone']
-        
-        conflict = await db[COLLECTION_NAME].find_one({
-            "$and": [
-                {"_id": {"$ne": ObjectId(patient_id)}},
-                {"$or": [
-                    {"email": update_data.get('email')} if 'email' in update_data else {},
-                    {"phone": update_data.get('phone')} if 'phone' in update_data else {}
-                ]}
-            ]
-        })
-        
-        if conflict:
-            raise HTTPException(
-                status_code=400,
-                detail="Email or phone number already exists"
-            )
+        return await get_patient_by_id(db, patient_id)
     
     # Process insurance information if provided
+    deferred = False
     if 'insurance_info' in update_data and update_data['insurance_info'] and update_data['insurance_info'].get('card_number'):
-        # Get date of birth for validation
-        date_of_birth = update_data.get('date_of_birth', existing_patient.get('date_of_birth'))
+        # Get date of birth for validation (only read the stored one when the update doesn't carry it)
+        date_of_birth = update_data.get('date_of_birth')
+        if not date_of_birth and 'date_of_birth' not in update_data:
+            existing_patient = await db[COLLECTION_NAME].find_one({"_id": object_id}, {"date_of_birth": 1})
+            if not existing_patient:
+                return None
+            date_of_birth = existing_patient.get('date_of_birth')
         
         if not date_of_birth:
             raise HTTPException(
@@ -437,29 +1713,47 @@ async def update_patient(db, patient_id: str, patient_update: PatientUpdate):
                 detail="Date of birth is required for insurance validation"
             )
         
-        # Create a copy for insurance processing
-        temp_data = {"insurance_info": update_data['insurance_info']}
-        
-        # Validate insurance card
-        success, error_msg = await process_insurance_info(
-            temp_data,
-            date_of_birth
-        )
-        
-        # Update the insurance info in update_data
-        update_data['insurance_info'] = temp_data['insurance_info']
+        if use_deferred_validation(defer_validation):
+            # Store now, validate in the background worker queue
+            mark_insurance_pending(update_data['insurance_info'])
+            deferred = True
+        else:
+            # Create a copy for insurance processing
+            temp_data = {"insurance_info": update_data['insurance_info']}
+            
+            # Validate insurance card
+            success, error_msg = await process_insurance_info(
+                temp_data,
+                date_of_birth
+            )
+            
+            # Update the insurance info in update_data
+            update_data['insurance_info'] = temp_data['insurance_info']
+    
+    # Keep search keys in sync with the searchable fields
+    update_data.update(build_search_updates(update_data))
     
     # Add updated timestamp
     update_data["updated_at"] = datetime.utcnow()
     
-    # Update the patient
-    await db[COLLECTION_NAME].update_one(
-        {"_id": ObjectId(patient_id)},
-        {"$set": update_data}
-    )
+    # Update and return the patient in one round trip; the unique indexes catch email/phone conflicts
+    try:
+        updated_patient = await db[COLLECTION_NAME].find_one_and_update(
+            {"_id": object_id},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=400,
+            detail="Email or phone number already exists"
+        )
     
-    # Return the updated patient
-    return await get_patient_by_id(db, patient_id)
+    if updated_patient:
+        updated_patient["_id"] = str(updated_patient["_id"])
+        if deferred:
+            enqueue_insurance_validation(updated_patient["_id"])
+    return updated_patient
 
 async def delete_patient(db, patient_id: str):
     """Delete a patient"""
@@ -473,27 +1767,243 @@ async def get_patients_count(
     db,
     name: Optional[str] = None,
     phone: Optional[str] = None,
-    email: Optional[str] = None
+    email: Optional[str] = None,
+    search_mode: str = SEARCH_MODE_PREFIX
 ):
     """Get total count of patients matching filters"""
-    query = {}
-    
-    if name:
-        query["full_name"] = {"$regex": name, "$options": "i"}
-    if phone:
-        query["phone"] = {"$regex": phone, "$options": "i"}
-    if email:
-        query["email"] = {"$regex": email, "$options": "i"}
+    query = build_patient_filter(name, phone, email, search_mode)
     
     count = await db[COLLECTION_NAME].count_documents(query)
     return count
 
+# Bulk patient import
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+def record_import_error(summary: dict, row_number: int, message: str):
+    summary["failed"] += 1
+    if len(summary["errors"]) < IMPORT_MAX_REPORTED_ERRORS:
+        summary["errors"].append({"row": row_number, "error": message})
+    else:
+        summary["errors_truncated"] = True
+
+async def import_patient_batch(db, rows: list, summary: dict, seen_keys: set, semaphore: asyncio.Semaphore):
+    """
+    Validate, de-duplicate and insert one batch of parsed rows
+    One $in query checks the whole batch against the database, cards are validated
+    concurrently (bounded by the semaphore) and the batch is written with one insert_many
+    """
+    candidates = []
+    for row_number, record in rows:
+        if isinstance(record, ImportRowError):
+            record_import_error(summary, row_number, str(record))
+            continue
+        try:
+            patient_dict = PatientCreate(**record).model_dump()
+        except ValidationError as e:
+            record_import_error(summary, row_number, format_validation_error(e))
+            continue
+        if patient_dict.get("insurance_info") and patient_dict["insurance_info"].get("card_number") \
+                and not patient_dict.get("date_of_birth"):
+            record_import_error(summary, row_number, "Date of birth is required for insurance validation")
+            continue
+        # Duplicates within the file itself
+        keys = {("email", patient_dict["email"]), ("phone", patient_dict["phone"])}
+        if keys & seen_keys:
+            summary["duplicates"] += 1
+            record_import_error(summary, row_number, "Email or phone number duplicated earlier in the file")
+            continue
+        seen_keys.update(keys)
+        candidates.append((row_number, patient_dict))
+    
+    if not candidates:
+        return
+    
+    # Duplicates already in the database, for the whole batch at once
+    existing_emails, existing_phones = set(), set()
+    async for doc in db[COLLECTION_NAME].find(
+        {"$or": [
+            {"email": {"$in": [p["email"] for _, p in candidates]}},
+            {"phone": {"$in": [p["phone"] for _, p in candidates]}},
+        ]},
+        {"email": 1, "phone": 1}
+    ):
+        existing_emails.add(doc.get("email"))
+        existing_phones.add(doc.get("phone"))
+    
+    to_insert = []
+    for row_number, patient_dict in candidates:
+        if patient_dict["email"] in existing_emails or patient_dict["phone"] in existing_phones:
+            summary["duplicates"] += 1
+            record_import_error(summary, row_number, "Email or phone number already registered")
+        else:
+            to_insert.append((row_number, patient_dict))
+    
+    async def validate(patient_dict: dict):
+        async with semaphore:
+            _, error_msg = await process_insurance_info(patient_dict, patient_dict["date_of_birth"])
+        summary["insurance_invalid" if error_msg else "insurance_validated"] += 1
+    
+    await asyncio.gather(*[
+        validate(patient_dict) for _, patient_dict in to_insert
+        if patient_dict.get("insurance_info") and patient_dict["insurance_info"].get("card_number")
+    ])
+    
+    if not to_insert:
+        return
+    
+    now = datetime.utcnow()
+    documents = []
+    for _, patient_dict in to_insert:
+        patient_dict.update(build_search_fields(patient_dict))
+        patient_dict["created_at"] = now
+        patient_dict["updated_at"] = now
+        documents.append(patient_dict)
+    
+    try:
+        result = await db[COLLECTION_NAME].insert_many(documents, ordered=False)
+        summary["inserted"] += len(result.inserted_ids)
+    except BulkWriteError as e:
+        # Unordered: everything except the failed documents was written
+        summary["inserted"] += e.details.get("nInserted", 0)
+        for write_error in e.details.get("writeErrors", []):
+            row_number = to_insert[write_error["index"]][0]
+            if write_error.get("code") == 11000:
+                summary["duplicates"] += 1
+                record_import_error(summary, row_number, "Email or phone number already registered")
+            else:
+                record_import_error(summary, row_number, write_error.get("errmsg", "Write error"))
+
+async def import_patients(
+    db,
+    chunks,
+    import_format: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    insurance_concurrency: int = IMPORT_INSURANCE_CONCURRENCY
+):
+    """
+    Import patients from a CSV/NDJSON byte stream (an async iterator of chunks)
+    Returns a summary with per-row errors and the overall rows per second
+    """
+    started = time.perf_counter()
+    summary = {
+        "format": import_format,
+        "rows": 0,
+        "inserted": 0,
+        "failed": 0,
+        "duplicates": 0,
+        "insurance_validated": 0,
+        "insurance_invalid": 0,
+        "errors": [],
+        "errors_truncated": False,
+    }
+    seen_keys = set()
+    semaphore = asyncio.Semaphore(insurance_concurrency)
+    
+    async for rows in iter_record_batches(chunks, import_format, batch_size):
+        summary["rows"] += len(rows)
+        await import_patient_batch(db, rows, summary, seen_keys, semaphore)
+    
+    summary["errors"].sort(key=lambda error: error["row"])
+    elapsed = time.perf_counter() - started
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["rows_per_second"] = round(summary["rows"] / elapsed, 1) if elapsed else 0.0
+    return summary
+
 # API Endpoints
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "patient-service"}
+    return {
+        "status": "healthy",
+        "service": "patient-service",
+        "insurance_service": {
+            "circuit_breaker": insurance_breaker.snapshot() if INSURANCE_BREAKER_ENABLED else {"state": "disabled"},
+            "bulkhead": insurance_bulkhead.snapshot(),
+        },
+    }
+
+def prometheus_gauges() -> dict:
+    """Point-in-time service state exported next to the request metrics"""
+    return {
+        "insurance_client_in_flight": insurance_client_stats["in_flight"],
+        "insurance_cache_entries": insurance_validation_cache.stats()["size"],
+        "insurance_breaker_open": int(insurance_breaker.state == CircuitBreaker.OPEN),
+        "insurance_bulkhead_active": insurance_bulkhead.active,
+        "insurance_validation_queue_depth": validation_queue.qsize() if validation_queue else 0,
+        "auth_cache_entries": principal_cache.stats()["size"],
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Request latency histograms, span breakdown and MongoDB command counters (Prometheus text format)"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=false)")
+    return Response(request_metrics.render(prometheus_gauges()), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.get("/debug/profiles", dependencies=[Depends(verify_internal_token)])
+async def list_profiles():
+    """Recent profile captures (send X-Profile: cprofile|pyinstrument with X-Internal-Token to capture one)"""
+    if profile_store is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (PROFILING_ENABLED=false)")
+    return profile_store.list()
+
+@app.get("/debug/profiles/{profile_id}", dependencies=[Depends(verify_internal_token)])
+async def get_profile(profile_id: str):
+    """One profile report as plain text"""
+    profile = profile_store.get(profile_id) if profile_store else None
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(profile["report"], media_type="text/plain; charset=utf-8")
+
+@app.get("/api/v1/admin/slow-queries", dependencies=[Depends(verify_internal_token)])
+async def get_slow_queries(
+    view: str = Query("entries", pattern="^(entries|shapes)$", description="entries (newest first) or shapes (per query shape)"),
+    limit: int = Query(100, ge=1, le=10000)
+):
+    """Slow MongoDB operations with their query shape and, for reads, the explained plan"""
+    if slow_query_log is None:
+        raise HTTPException(status_code=404, detail="Slow query log is disabled (SLOW_QUERY_LOG_ENABLED=false)")
+    items = slow_query_log.entries(limit) if view == "entries" else slow_query_log.shapes()[:limit]
+    return {**slow_query_log.stats(), view: items}
+
+@app.delete("/api/v1/admin/slow-queries", dependencies=[Depends(verify_internal_token)])
+async def clear_slow_queries():
+    """Empty the slow query log and forget explained shapes"""
+    if slow_query_log is None:
+        raise HTTPException(status_code=404, detail="Slow query log is disabled (SLOW_QUERY_LOG_ENABLED=false)")
+    slow_query_log.clear()
+    return {"cleared": True}
+
+@app.get("/metrics/insurance-client")
+async def insurance_client_metrics():
+    """Insurance Service HTTP client pool usage"""
+    return get_insurance_client_metrics()
+
+@app.get("/metrics/insurance-cache")
+async def insurance_cache_metrics():
+    """Insurance validation cache hit/miss counters"""
+    return insurance_validation_cache.stats()
+
+@app.post("/api/v1/insurance-cache/invalidate", dependencies=[Depends(verify_internal_token)])
+async def invalidate_insurance_cache(request: CacheInvalidationRequest, db = Depends(get_db)):
+    """Drop cached validation results for a card in every worker (called by Insurance Service when a card changes)"""
+    removed = await publish_cache_invalidation(db, {"cache": "insurance", "card_number": request.card_number})
+    return {"invalidated": removed}
+
+@app.get("/metrics/auth-cache")
+async def auth_cache_metrics():
+    """Principal cache hit/miss counters"""
+    return principal_cache.stats()
+
+@app.post("/api/v1/auth-cache/invalidate", dependencies=[Depends(verify_internal_token)])
+async def invalidate_auth_cache(request: PrincipalInvalidationRequest, db = Depends(get_db)):
+    """Drop cached principals for a user in every worker (e.g. after changing role or is_active directly in the database)"""
+    removed = await publish_cache_invalidation(db, {"cache": "auth", "user_id": request.user_id, "email": request.email})
+    return {"invalidated": removed}
 
 # Authentication Endpoints
 
@@ -521,7 +2031,7 @@ async def register(user: UserCreate, db = Depends(get_db)):
         "full_name": user.full_name,
         "role": user.role,
         "is_active": user.is_active,
-        "hashed_password": get_password_hash(user.password),
+        "hashed_password": await get_password_hash_async(user.password),
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow()
     }
@@ -529,6 +2039,8 @@ async def register(user: UserCreate, db = Depends(get_db)):
     try:
         result = await db[USERS_COLLECTION_NAME].insert_one(user_data)
         user_data["_id"] = str(result.inserted_id)
+        if FAST_JSON_RESPONSES:
+            return FastJSONResponse(user_json(user_data))
         return UserResponse(**user_data)
     except Exception as e:
         raise HTTPException(
@@ -556,6 +2068,8 @@ async def login(user_credentials: UserLogin, db = Depends(get_db)):
 @app.get("/api/v1/auth/me", response_model=UserResponse)
 async def read_users_me(current_user: dict = Depends(get_current_active_user)):
     """Get current user information"""
+    if FAST_JSON_RESPONSES:
+        return FastJSONResponse(user_json(current_user))
     return UserResponse(**current_user)
 
 # Patient Endpoints (Protected)
@@ -563,12 +2077,16 @@ async def read_users_me(current_user: dict = Depends(get_current_active_user)):
 @app.post("/api/v1/patients", response_model=PatientResponse)
 async def create_patient_endpoint(
     patient: PatientCreate, 
+    defer_validation: Optional[bool] = Query(None, description="Validate insurance in the background (default: INSURANCE_VALIDATION_MODE)"),
     db = Depends(get_db),
     current_user: dict = Depends(require_role([UserRole.RECEPTIONIST, UserRole.DOCTOR]))
 ):
     """Create a new patient (Receptionist and Doctor only)"""
     try:
-        return await create_patient(db, patient)
+        created = await create_patient(db, patient, defer_validation)
+        if FAST_JSON_RESPONSES:
+            return FastJSONResponse(patient_json(created))
+        return created
     except HTTPException:
         raise
     except Exception as e:
@@ -576,23 +2094,46 @@ async def create_patient_endpoint(
 
 @app.get("/api/v1/patients", response_model=List[PatientResponse])
 async def get_patients_endpoint(
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     name: Optional[str] = Query(None, description="Filter by patient name"),
     phone: Optional[str] = Query(None, description="Filter by phone number"),
     email: Optional[str] = Query(None, description="Filter by email"),
+    search_mode: str = Query(SEARCH_MODE_PREFIX, pattern=f"^({'|'.join(SEARCH_MODES)})$", description="prefix (indexed) or regex (legacy substring match)"),
+    sort: str = Query("created_at", pattern=f"^({'|'.join(PATIENT_SORT_FIELDS)})$", description="Sort by name, created_at or updated_at"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Sort direction"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor / X-Prev-Cursor"),
     db = Depends(get_db),
     current_user: dict = Depends(require_role([UserRole.RECEPTIONIST, UserRole.DOCTOR]))
 ):
-    """Get patients with optional filters (Receptionist and Doctor only)"""
+    """
+    Get patients with optional filters (Receptionist and Doctor only)
+    Cursors for the neighbouring pages are returned in the X-Next-Cursor / X-Prev-Cursor headers
+    """
     try:
-        return await get_patients(db, skip, limit, name, phone, email)
+        patients, next_cursor, prev_cursor = await get_patients(
+            db, skip, limit, name, phone, email, search_mode, sort, order, cursor
+        )
+        headers = {}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        if prev_cursor:
+            headers["X-Prev-Cursor"] = prev_cursor
+        if FAST_JSON_RESPONSES:
+            return FastJSONResponse([patient_json(patient) for patient in patients], headers=headers)
+        response.headers.update(headers)
+        return patients
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/patients/{patient_id}", response_model=PatientResponse)
 async def get_patient_endpoint(
     patient_id: str, 
+    request: Request,
+    response: Response,
     db = Depends(get_db),
     current_user: dict = Depends(get_current_active_user)
 ):
@@ -600,20 +2141,33 @@ async def get_patient_endpoint(
     patient = await get_patient_by_id(db, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
+    headers = {}
+    if HTTP_ETAGS_ENABLED:
+        # Every write to a patient bumps updated_at, so it versions the document
+        etag = patient_etag(patient)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        headers["ETag"] = etag
+    if FAST_JSON_RESPONSES:
+        return FastJSONResponse(patient_json(patient), headers=headers)
+    response.headers.update(headers)
     return patient
 
 @app.put("/api/v1/patients/{patient_id}", response_model=PatientResponse)
 async def update_patient_endpoint(
     patient_id: str,
     patient_update: PatientUpdate,
+    defer_validation: Optional[bool] = Query(None, description="Validate insurance in the background (default: INSURANCE_VALIDATION_MODE)"),
     db = Depends(get_db),
     current_user: dict = Depends(require_role([UserRole.RECEPTIONIST, UserRole.DOCTOR]))
 ):
     """Update a patient (Receptionist and Doctor only)"""
     try:
-        updated_patient = await update_patient(db, patient_id, patient_update)
+        updated_patient = await update_patient(db, patient_id, patient_update, defer_validation)
         if not updated_patient:
             raise HTTPException(status_code=404, detail="Patient not found")
+        if FAST_JSON_RESPONSES:
+            return FastJSONResponse(patient_json(updated_patient))
         return updated_patient
     except HTTPException:
         raise
@@ -642,16 +2196,131 @@ async def get_patients_count_endpoint(
     name: Optional[str] = Query(None),
     phone: Optional[str] = Query(None),
     email: Optional[str] = Query(None),
+    search_mode: str = Query(SEARCH_MODE_PREFIX, pattern=f"^({'|'.join(SEARCH_MODES)})$"),
     db = Depends(get_db),
     current_user: dict = Depends(require_role([UserRole.RECEPTIONIST, UserRole.DOCTOR]))
 ):
     """Get total count of patients matching filters (Receptionist and Doctor only)"""
     try:
-        count = await get_patients_count(db, name, phone, email)
+        count = await get_patients_count(db, name, phone, email, search_mode)
         return {"total": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/v1/patients/search/page", response_model=PatientPage)
+async def get_patients_page_endpoint(
+    skip: int = Query(0, ge=0, description="Number of records to skip (ignored with a cursor)"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    name: Optional[str] = Query(None, description="Filter by patient name"),
+    phone: Optional[str] = Query(None, description="Filter by phone number"),
+    email: Optional[str] = Query(None, description="Filter by email"),
+    search_mode: str = Query(SEARCH_MODE_PREFIX, pattern=f"^({'|'.join(SEARCH_MODES)})$"),
+    sort: str = Query("created_at", pattern=f"^({'|'.join(PATIENT_SORT_FIELDS)})$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor / prev_cursor"),
+    db = Depends(get_db),
+    current_user: dict = Depends(require_role([UserRole.RECEPTIONIST, UserRole.DOCTOR]))
+):
+    """Get a page of patients and the total count in one call (Receptionist and Doctor only)"""
+    try:
+        page = await get_patients_page(
+            db, skip, limit, name, phone, email, search_mode, sort, order, cursor
+        )
+        if FAST_JSON_RESPONSES:
+            page["items"] = [patient_json(patient) for patient in page["items"]]
+            return FastJSONResponse(page)
+        return page
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/v1/patients/import")
+async def import_patients_endpoint(
+    request: Request,
+    import_format: str = Query("csv", alias="format", description="csv | ndjson"),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=10000),
+    db = Depends(get_db),
+    current_user: dict = Depends(require_role([UserRole.RECEPTIONIST]))
+):
+    """
+    Bulk import patients from a CSV or NDJSON request body (Receptionist only)
+    The body is parsed as it streams in; returns per-row errors and rows/sec
+    """
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+    try:
+        return await import_patients(db, request.stream(), import_format, batch_size=batch_size)
+    except ImportRowError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/v1/patients/insurance/revalidate")
+async def revalidate_patients_insurance_endpoint(
+    db = Depends(get_db),
+    current_user: dict = Depends(require_role([UserRole.RECEPTIONIST]))
+):
+    """Re-validate all patients' insurance cards in bulk (Receptionist only)"""
+    try:
+        return await revalidate_all_patients_insurance(db)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=503, detail=f"Insurance service unavailable: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/v1/patients/{patient_id}/insurance/status")
+async def get_insurance_validation_status(
+    patient_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for a pending validation to finish"),
+    db = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Insurance validation status for a patient; with wait, long-polls until it is no longer pending"""
+    try:
+        object_id = ObjectId(patient_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=404, detail="Patient not found")
+    
+    deadline = time.monotonic() + wait
+    while True:
+        patient = await db[COLLECTION_NAME].find_one({"_id": object_id}, {"insurance_info": 1})
+        if not patient:
+            raise HTTPException(status_code=404, detail="Patient not found")
+        insurance_info = patient.get("insurance_info") or {}
+        is_validated = insurance_info.get("is_validated", False)
+        if is_validated != VALIDATION_PENDING or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(0.5)
+    
+    if not insurance_info.get("card_number"):
+        validation_status = "none"
+    elif is_validated == VALIDATION_PENDING:
+        validation_status = VALIDATION_PENDING
+    else:
+        validation_status = "valid" if is_validated else "invalid"
+    return {
+        "patient_id": patient_id,
+        "status": validation_status,
+        "card_number": insurance_info.get("card_number"),
+        "is_validated": is_validated,
+        "validation_date": insurance_info.get("validation_date"),
+        "validation_attempts": insurance_info.get("validation_attempts"),
+        "coverage_percentage": insurance_info.get("coverage_percentage"),
+        "notes": insurance_info.get("notes"),
+    }
+
+@app.get("/metrics/insurance-validation-queue")
+async def insurance_validation_queue_metrics():
+    """Deferred insurance validation queue depth and outcomes"""
+    return {
+        "mode": INSURANCE_VALIDATION_MODE,
+        "workers": len(validation_workers),
+        "queued": validation_queue.qsize() if validation_queue else 0,
+        "sweeping": worker_leader.is_leader,
+        **validation_queue_stats,
+    }
+
 @app.post("/api/v1/patients/{patient_id}/validate-insurance")
 async def validate_patient_insurance(
     patient_id: str,
@@ -666,54 +2335,45 @@ async def validate_patient_insurance(
         if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
         
-        # Call Insurance Service
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{INSURANCE_SERVICE_URL}/api/v1/insurance/validate",
-                    json={
-                        "card_number": request.card_number,
-                        "full_name": request.full_name,
-                        "date_of_birth": request.date_of_birth
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    validation_result = response.json()
-                    
-                    # Update patient's insurance info
-                    insurance_info = {
-                        "card_number": request.card_number,
-                        "is_validated": validation_result["is_valid"],
-                        "validation_date": datetime.now(),
-                        "coverage_percentage": validation_result.get("coverage_percentage"),
-                        "notes": validation_result["message"]
-                    }
-                    
-                    # Update patient record
-                    await db[COLLECTION_NAME].update_one(
-                        {"_id": ObjectId(patient_id)},
-                        {"$set": {"insurance_info": insurance_info}}
-                    )
-                    
-                    return {
-                        "message": "Insurance validation completed",
-                        "validation_result": validation_result,
-                        "patient_updated": True
-                    }
-                else:
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail="Insurance service error"
-                    )
-                    
-            except httpx.RequestError:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Insurance service unavailable"
-                )
-                
+        # Call Insurance Service (through the validation cache)
+        try:
+            status_code, validation_result = await fetch_insurance_validation(
+                request.card_number, request.date_of_birth
+            )
+        except httpx.RequestError:
+            raise HTTPException(
+                status_code=503,
+                detail="Insurance service unavailable"
+            )
+        
+        if status_code == 200:
+            
+            # Update patient's insurance info
+            insurance_info = {
+                "card_number": request.card_number,
+                "is_validated": validation_result["is_valid"],
+                "validation_date": datetime.now(),
+                "coverage_percentage": validation_result.get("coverage_percentage"),
+                "notes": validation_result["message"]
+            }
+            
+            # Update patient record
+            await db[COLLECTION_NAME].update_one(
+                {"_id": ObjectId(patient_id)},
+                {"$set": {"insurance_info": insurance_info, "updated_at": datetime.utcnow()}}
+            )
+            
+            return {
+                "message": "Insurance validation completed",
+                "validation_result": validation_result,
+                "patient_updated": True
+            }
+        else:
+            raise HTTPException(
+                status_code=status_code,
+                detail="Insurance service error"
+            )
+            
     except HTTPException:
         raise
     except Exception as e:
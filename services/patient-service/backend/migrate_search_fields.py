@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Migration: tính lại full_name_normalized và các khóa tìm kiếm cho bệnh nhân cũ
+Sử dụng: python3 migrate_search_fields.py [--batch-size 1000] [--dry-run]
+
+The backend also runs this in the background on startup (SEARCH_BACKFILL_ON_STARTUP);
+use this script to migrate large collections ahead of a deploy.
+"""
+
+import argparse
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, ASCENDING
+
+import main
+from patient_search import SEARCH_FIELDS_VERSION, SEARCH_INDEXES
+
+
+async def run(batch_size: int, dry_run: bool):
+    mongo_client = AsyncIOMotorClient(main.MONGODB_URL)
+    try:
+        db = mongo_client[main.DATABASE_NAME]
+        pending = await db[main.COLLECTION_NAME].count_documents({"search.v": {"$ne": SEARCH_FIELDS_VERSION}})
+        print(f"🔎 {pending} patients need search fields (version {SEARCH_FIELDS_VERSION})")
+        if dry_run or not pending:
+            return
+
+        await db[main.COLLECTION_NAME].create_indexes([
+            IndexModel([("full_name", ASCENDING)]),
+            *SEARCH_INDEXES,
+        ])
+        updated = await main.backfill_search_fields(db, batch_size=batch_size)
+        print(f"✅ Updated {updated} patients")
+    finally:
+        mongo_client.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill normalized name and search keys for patients")
+    parser.add_argument("--batch-size", type=int, default=main.SEARCH_BACKFILL_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Only count documents that need migrating")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(run(args.batch_size, args.dry_run))
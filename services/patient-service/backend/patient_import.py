@@ -0,0 +1,95 @@
+"""
+Bulk patient import helpers
+
+Parses a CSV or NDJSON upload as a stream of chunks, yielding batches of
+(row_number, record) so the import never holds the whole file in memory.
+
+CSV columns (header row required):
+    full_name, phone, email, address, date_of_birth, gender, insurance_card_number
+
+NDJSON lines use the POST /api/v1/patients body, or the same flat keys as the CSV.
+"""
+
+import json
+from typing import AsyncIterator, List, Tuple
+
+from hospital_common.stream_readers import iter_csv_rows, iter_lines
+
+IMPORT_FORMAT_CSV = "csv"
+IMPORT_FORMAT_NDJSON = "ndjson"
+IMPORT_FORMATS = (IMPORT_FORMAT_CSV, IMPORT_FORMAT_NDJSON)
+
+PATIENT_FIELDS = ("full_name", "phone", "email", "address", "date_of_birth", "gender")
+REQUIRED_COLUMNS = ("full_name", "phone", "email")
+CARD_NUMBER_COLUMNS = ("insurance_card_number", "card_number")
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def detect_format(filename: str) -> str:
+    return IMPORT_FORMAT_CSV if filename.lower().endswith(".csv") else IMPORT_FORMAT_NDJSON
+
+
+def to_patient_record(row: dict) -> dict:
+    """Map a flat CSV/NDJSON row onto the PatientCreate shape (blank cells become None)"""
+    record = {
+        key: (value.strip() or None) if isinstance(value, str) else value
+        for key, value in row.items()
+        if key in PATIENT_FIELDS or key == "insurance_info"
+    }
+    for column in CARD_NUMBER_COLUMNS:
+        card_number = (row.get(column) or "").strip()
+        if card_number:
+            record["insurance_info"] = {"card_number": card_number}
+            break
+    return record
+
+
+async def iter_record_batches(
+    chunks: AsyncIterator[bytes],
+    import_format: str,
+    batch_size: int
+) -> AsyncIterator[List[Tuple[int, object]]]:
+    """
+    Yield batches of (row_number, record_or_error); row numbers count data rows from 1
+    Unparseable rows are yielded as ImportRowError so the caller can report them in order
+    """
+    batch = []
+    header = None
+    row_number = 0
+
+    if import_format == IMPORT_FORMAT_CSV:
+        async for values in iter_csv_rows(chunks):
+            if header is None:
+                header = [column.strip().lower() for column in values]
+                if not set(REQUIRED_COLUMNS) <= set(header):
+                    raise ImportRowError("CSV header must include full_name, phone and email columns")
+                continue
+            row_number += 1
+            if len(values) != len(header):
+                batch.append((row_number, ImportRowError(f"expected {len(header)} columns, got {len(values)}")))
+            else:
+                batch.append((row_number, to_patient_record(dict(zip(header, values)))))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    else:
+        async for line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("expected a JSON object")
+                batch.append((row_number, to_patient_record(row)))
+            except ValueError as e:
+                batch.append((row_number, ImportRowError(f"invalid JSON: {e}")))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
@@ -0,0 +1,147 @@
+"""
+Patient search helpers
+
+Search keys are computed once at write time so that lookups are anchored
+prefix scans on indexed fields instead of unanchored, case-insensitive
+regexes over the whole collection:
+
+    full_name_normalized  full_name folded to lowercase, accent-free ASCII
+                          ("Nguyễn Văn An" -> "nguyen van an")
+    search.name_tokens    words of full_name_normalized
+    search.phone        phone number digits
+    search.email        lowercased email and its domain
+"""
+
+import re
+import unicodedata
+from typing import Optional
+
+from pymongo import IndexModel, ASCENDING
+
+# Bump when the way search keys are computed changes, so the backfill recomputes them
+SEARCH_FIELDS_VERSION = 2
+
+SEARCH_MODE_PREFIX = "prefix"
+SEARCH_MODE_REGEX = "regex"
+SEARCH_MODES = (SEARCH_MODE_PREFIX, SEARCH_MODE_REGEX)
+
+SEARCH_INDEXES = [
+    # Compound with _id so it also serves keyset pagination sorted by name
+    IndexModel([("full_name_normalized", ASCENDING), ("_id", ASCENDING)]),
+    IndexModel([("search.name_tokens", ASCENDING)]),
+    IndexModel([("search.phone", ASCENDING)]),
+    IndexModel([("search.email", ASCENDING)]),
+]
+
+_NON_DIGITS = re.compile(r"\D")
+_WHITESPACE = re.compile(r"\s+")
+
+# Letters that carry no combining mark, so NFD decomposition leaves them untouched
+_VIETNAMESE_BASE_LETTERS = str.maketrans({"đ": "d", "Đ": "D"})
+
+
+def fold_text(value: str) -> str:
+    """Lowercase and strip diacritics, including Vietnamese đ/Đ"""
+    decomposed = unicodedata.normalize("NFKD", value.translate(_VIETNAMESE_BASE_LETTERS))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def normalize_name(full_name: str) -> str:
+    """Folded name with whitespace collapsed, as stored in full_name_normalized"""
+    return _WHITESPACE.sub(" ", fold_text(full_name)).strip()
+
+
+def name_tokens(full_name: str) -> list:
+    return normalize_name(full_name).split()
+
+
+def phone_key(phone: str) -> str:
+    digits = _NON_DIGITS.sub("", phone)
+    return digits or phone.strip().lower()
+
+
+def email_keys(email: str) -> list:
+    email = email.strip().lower()
+    keys = [email]
+    if "@" in email:
+        keys.append(email.split("@", 1)[1])
+    return keys
+
+
+def build_search_fields(patient: dict) -> dict:
+    """Compute the derived search fields (full_name_normalized and `search`) for a patient document"""
+    full_name_normalized = normalize_name(patient.get("full_name") or "")
+    return {
+        "full_name_normalized": full_name_normalized,
+        "search": {
+            "v": SEARCH_FIELDS_VERSION,
+            "name_tokens": full_name_normalized.split(),
+            "phone": phone_key(patient.get("phone") or ""),
+            "email": email_keys(patient.get("email") or ""),
+        },
+    }
+
+
+def build_search_updates(changes: dict) -> dict:
+    """
+    $set paths for the search keys affected by a partial update, so the update
+    needs no read of the stored document (search.v is left to the backfill)
+    """
+    updates = {}
+    if "full_name" in changes:
+        full_name_normalized = normalize_name(changes["full_name"] or "")
+        updates["full_name_normalized"] = full_name_normalized
+        updates["search.name_tokens"] = full_name_normalized.split()
+    if "phone" in changes:
+        updates["search.phone"] = phone_key(changes["phone"] or "")
+    if "email" in changes:
+        updates["search.email"] = email_keys(changes["email"] or "")
+    return updates
+
+
+def _prefix(value: str):
+    return re.compile("^" + re.escape(value))
+
+
+def build_patient_filter(
+    name: Optional[str] = None,
+    phone: Optional[str] = None,
+    email: Optional[str] = None,
+    mode: str = SEARCH_MODE_PREFIX
+) -> dict:
+    """
+    Build the MongoDB filter for a patient search
+
+    prefix: every name word matches a stored token (the last one as a prefix,
+            so results narrow while typing); this also covers a name typed from
+            the start, so no second scan on full_name_normalized is needed;
+            phone and email match from the start
+    regex:  the legacy unanchored, case-insensitive substring match (full scan)
+    """
+    query = {}
+
+    if mode == SEARCH_MODE_REGEX:
+        if name:
+            query["full_name"] = {"$regex": name, "$options": "i"}
+        if phone:
+            query["phone"] = {"$regex": phone, "$options": "i"}
+        if email:
+            query["email"] = {"$regex": email, "$options": "i"}
+        return query
+
+    if name:
+        tokens = name_tokens(name)
+        if tokens:
+            # One condition per word lets the planner pick the most selective token for index bounds
+            conditions = [{"search.name_tokens": token} for token in tokens[:-1]]
+            conditions.append({"search.name_tokens": _prefix(tokens[-1])})
+            if len(conditions) == 1:
+                query.update(conditions[0])
+            else:
+                query["$and"] = conditions
+    if phone:
+        query["search.phone"] = _prefix(phone_key(phone))
+    if email:
+        query["search.email"] = _prefix(email.strip().lower().lstrip("@"))
+
+    return query
@@ -0,0 +1,82 @@
+"""
+Fast JSON responses for patient and user documents
+
+Documents read from our own collections were validated when they were written,
+so list and detail endpoints can skip building PatientResponse/UserResponse
+models. patient_json()/user_json() project a stored document onto the
+response model's fields (dropping internal ones such as the search keys and
+hashed_password), and dumps() turns ObjectId and datetime into JSON in one pass
+with orjson, falling back to the json module when orjson is not installed.
+The output matches what FastAPI produced through the response models.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Optional
+
+from bson import ObjectId
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+PATIENT_FIELDS = ("full_name", "phone", "email", "address", "date_of_birth", "gender")
+INSURANCE_INFO_DEFAULTS = (
+    ("card_number", None),
+    ("is_validated", False),
+    ("validation_attempts", None),
+    ("validation_date", None),
+    ("coverage_percentage", None),
+    ("notes", None),
+)
+USER_FIELDS = ("email", "full_name", "role", "is_active")
+
+
+def _insurance_info_json(info: Optional[dict]) -> Optional[dict]:
+    if info is None:
+        return None
+    return {field: info.get(field, default) for field, default in INSURANCE_INFO_DEFAULTS}
+
+
+def patient_json(patient: dict) -> dict:
+    """A stored patient in the PatientResponse shape"""
+    result = {field: patient.get(field) for field in PATIENT_FIELDS}
+    result["insurance_info"] = _insurance_info_json(patient.get("insurance_info"))
+    result["_id"] = patient["_id"]
+    result["created_at"] = patient["created_at"]
+    result["updated_at"] = patient["updated_at"]
+    return result
+
+
+def user_json(user: dict) -> dict:
+    """A stored user in the UserResponse shape"""
+    result = {field: user.get(field) for field in USER_FIELDS}
+    if result["is_active"] is None:
+        result["is_active"] = True
+    result["_id"] = user["_id"]
+    result["created_at"] = user["created_at"]
+    result["updated_at"] = user["updated_at"]
+    return result
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
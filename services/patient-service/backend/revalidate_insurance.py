@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Kiểm tra lại thẻ BHYT của toàn bộ bệnh nhân (chạy định kỳ hằng đêm)
+Sử dụng: python3 revalidate_insurance.py [--batch-size 5000]
+"""
+
+import argparse
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import main
+
+
+async def run(batch_size: int):
+    mongo_client = AsyncIOMotorClient(main.MONGODB_URL)
+    try:
+        db = mongo_client[main.DATABASE_NAME]
+        summary = await main.revalidate_all_patients_insurance(db, batch_size=batch_size)
+    finally:
+        await main.get_insurance_client().aclose()
+        mongo_client.close()
+    return summary
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk re-validate patients' insurance cards")
+    parser.add_argument("--batch-size", type=int, default=main.INSURANCE_REVALIDATION_BATCH_SIZE,
+                        help="Cards sent per batch validation request")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print("🔄 Re-validating patient insurance cards...")
+    summary = asyncio.run(run(args.batch_size))
+    print(f"✅ {summary['patients']} patients checked in {summary['elapsed_seconds']}s: "
+          f"{summary['valid']} valid, {summary['invalid']} invalid, "
+          f"{summary['skipped']} skipped, {summary['updated']} updated")
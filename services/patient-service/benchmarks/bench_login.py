@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: login throughput under concurrency (shift-change login storm)
+
+Fires concurrent POST /api/v1/auth/login requests at a running backend while
+probing GET /health in parallel. With bcrypt on the event loop the health
+probe stalls behind every hash; with the bcrypt pool it stays flat.
+
+Sử dụng:
+    python3 benchmarks/bench_login.py                          # http://127.0.0.1:8001
+    python3 benchmarks/bench_login.py --logins 500 --concurrency 50
+    BCRYPT_ROUNDS=10 python3 run-be.py  # then re-run to compare cost factors
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+BENCH_USER = {
+    "email": "bench-login@hospital.com",
+    "full_name": "Login Benchmark",
+    "role": "receptionist",
+    "password": "bench-password",
+    "is_active": True,
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies_ms):
+    return {
+        "count": len(latencies_ms),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms), 2) if latencies_ms else 0.0,
+        "mean_ms": round(statistics.fmean(latencies_ms), 2) if latencies_ms else 0.0,
+    }
+
+
+async def ensure_user(client: httpx.AsyncClient):
+    # 400 means the user already exists from a previous run
+    response = await client.post("/api/v1/auth/register", json=BENCH_USER)
+    if response.status_code not in (200, 400):
+        raise SystemExit(f"Cannot register benchmark user: {response.status_code} {response.text}")
+
+
+async def login_worker(client, queue, latencies, failures):
+    credentials = {"email": BENCH_USER["email"], "password": BENCH_USER["password"]}
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        response = await client.post("/api/v1/auth/login", json=credentials)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            failures.append(response.status_code)
+
+
+async def health_probe(client, stop: asyncio.Event, latencies, interval: float):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 2)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60.0) as client:
+        await ensure_user(client)
+
+        queue = asyncio.Queue()
+        for _ in range(args.logins):
+            queue.put_nowait(None)
+
+        login_latencies, health_latencies, failures = [], [], []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(health_probe(client, stop, health_latencies, args.probe_interval))
+
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            login_worker(client, queue, login_latencies, failures)
+            for _ in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await probe
+
+    return {
+        "url": args.url,
+        "logins": args.logins,
+        "concurrency": args.concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "logins_per_second": round(args.logins / elapsed, 2),
+        "failures": len(failures),
+        "login_latency": summarize(login_latencies),
+        "health_latency_during_storm": summarize(health_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8001")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--probe-interval", type=float, default=0.02, help="Seconds between /health probes")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark: indexed prefix/token patient search vs. legacy regex search
+
+Seeds a throwaway database with N synthetic patients (1,000,000 by default),
+then runs the same searches in both modes and reports latency and the number
+of documents/keys MongoDB examined.
+
+Sử dụng:
+    python3 benchmarks/bench_search.py                      # 1M patients
+    python3 benchmarks/bench_search.py --patients 200000 --repeat 20
+    python3 benchmarks/bench_search.py --reuse              # keep the seeded data
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from pymongo import MongoClient, IndexModel, ASCENDING
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+from patient_search import (  # noqa: E402
+    SEARCH_INDEXES, SEARCH_MODE_PREFIX, SEARCH_MODE_REGEX,
+    build_search_fields, build_patient_filter
+)
+
+SURNAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng",
+            "Bùi", "Đỗ", "Hồ", "Ngô", "Dương", "Lý"]
+MIDDLE_NAMES = ["Văn", "Thị", "Hữu", "Đức", "Minh", "Ngọc", "Thanh", "Quốc", "Gia", "Bảo"]
+GIVEN_NAMES = ["An", "Bình", "Cường", "Dũng", "Giang", "Hà", "Hải", "Hạnh", "Hiếu", "Hùng",
+               "Khánh", "Lan", "Linh", "Long", "Mai", "Nam", "Phương", "Quân", "Sơn", "Tâm",
+               "Thảo", "Trang", "Tuấn", "Vy", "Yến"]
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "hospital.vn"]
+
+QUERIES = [
+    {"name": "Nguyen Van"},
+    {"name": "Trần Thị Lan"},
+    {"name": "dang duc"},
+    {"name": "tuan"},
+    {"phone": "0912"},
+    {"phone": "09123456"},
+    {"email": "patient12345"},
+]
+
+
+def make_patient(i: int) -> dict:
+    full_name = f"{random.choice(SURNAMES)} {random.choice(MIDDLE_NAMES)} {random.choice(GIVEN_NAMES)}"
+    patient = {
+        "full_name": full_name,
+        "phone": f"09{i:08d}",
+        "email": f"patient{i}@{random.choice(DOMAINS)}",
+        "date_of_birth": f"{random.randint(1940, 2020)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+    }
+    patient.update(build_search_fields(patient))
+    return patient
+
+
+def seed(collection, count: int, batch_size: int = 10000):
+    print(f"🌱 Seeding {count:,} patients...")
+    collection.drop()
+    started = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        collection.insert_many(
+            [make_patient(i) for i in range(offset, min(offset + batch_size, count))],
+            ordered=False
+        )
+    collection.create_indexes([
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("phone", ASCENDING)], unique=True),
+        IndexModel([("full_name", ASCENDING)]),
+        *SEARCH_INDEXES,
+    ])
+    print(f"   done in {time.perf_counter() - started:.1f}s")
+
+
+def run_query(collection, query: dict, mode: str, repeat: int, limit: int) -> dict:
+    mongo_filter = build_patient_filter(mode=mode, **query)
+
+    find_times = []
+    count_times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        list(collection.find(mongo_filter).limit(limit))
+        find_times.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        total = collection.count_documents(mongo_filter)
+        count_times.append((time.perf_counter() - started) * 1000)
+
+    stats = collection.find(mongo_filter).limit(limit).explain()["executionStats"]
+    return {
+        "query": query,
+        "mode": mode,
+        "matches": total,
+        "find_ms_p50": round(statistics.median(find_times), 2),
+        "find_ms_max": round(max(find_times), 2),
+        "count_ms_p50": round(statistics.median(count_times), 2),
+        "docs_examined": stats["totalDocsExamined"],
+        "keys_examined": stats["totalKeysExamined"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongodb-url", default=os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="patient_search_bench")
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--reuse", action="store_true", help="Reuse previously seeded data")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    random.seed(42)
+    client = MongoClient(args.mongodb_url)
+    collection = client[args.database]["patients"]
+    if not args.reuse or collection.estimated_document_count() == 0:
+        seed(collection, args.patients)
+
+    results = []
+    for query in QUERIES:
+        for mode in (SEARCH_MODE_REGEX, SEARCH_MODE_PREFIX):
+            results.append(run_query(collection, query, mode, args.repeat, args.limit))
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"\n{'query':<28}{'mode':<8}{'matches':>10}{'find p50':>11}{'count p50':>12}{'docs exam.':>12}{'keys exam.':>12}")
+    print("-" * 93)
+    for r in results:
+        label = ", ".join(f"{k}={v}" for k, v in r["query"].items())
+        print(f"{label:<28}{r['mode']:<8}{r['matches']:>10,}{r['find_ms_p50']:>9.1f}ms"
+              f"{r['count_ms_p50']:>10.1f}ms{r['docs_examined']:>12,}{r['keys_examined']:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-item cost of serializing patient and user responses
+
+Takes N stored-shape documents (ObjectId, datetime, search keys, insurance
+info) and turns them into a JSON response body both ways:
+
+    response_model  what FastAPI does for response_model=List[PatientResponse]:
+                    validate every item into the model, dump it, json.dumps
+    fast            response_json: project onto the response fields, orjson
+                    converts ObjectId/datetime directly
+
+Reports microseconds per item. No MongoDB needed.
+
+Sử dụng:
+    python3 benchmarks/bench_serialization.py                  # 1000 items (limit=1000 page)
+    python3 benchmarks/bench_serialization.py --items 100 --json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+from main import PatientResponse, UserResponse  # noqa: E402
+from patient_search import build_search_fields  # noqa: E402
+import response_json  # noqa: E402
+
+
+def make_patient(i: int) -> dict:
+    created = datetime(2025, 1, 1) + timedelta(minutes=i)
+    patient = {
+        "_id": ObjectId(),
+        "full_name": f"Nguyễn Văn Bệnh Nhân {i}",
+        "phone": f"09{i:08d}",
+        "email": f"patient{i}@hospital.vn",
+        "address": f"{i} Nguyễn Trãi, Phường 7, Quận 5, TP.HCM",
+        "date_of_birth": "1985-05-20",
+        "gender": "male" if i % 2 else "female",
+        "insurance_info": {
+            "card_number": f"HS40{i:011d}",
+            "is_validated": True,
+            "validation_date": created,
+            "coverage_percentage": 80,
+            "notes": "Validated successfully. Hospital level: Hạng I",
+        } if i % 3 else None,
+        "created_at": created,
+        "updated_at": created,
+    }
+    patient.update(build_search_fields(patient))
+    return patient
+
+
+def make_user(i: int) -> dict:
+    created = datetime(2025, 1, 1) + timedelta(minutes=i)
+    return {
+        "_id": ObjectId(),
+        "email": f"user{i}@hospital.vn",
+        "full_name": f"Trần Thị Nhân Viên {i}",
+        "role": "receptionist",
+        "is_active": True,
+        "hashed_password": "$2b$12$" + "x" * 53,
+        "created_at": created,
+        "updated_at": created,
+    }
+
+
+def response_model_body(field, documents: List[dict]) -> bytes:
+    # The list endpoints hand back documents with _id already converted to str
+    content = [dict(document, _id=str(document["_id"])) for document in documents]
+    serialized = asyncio.run(serialize_response(field=field, response_content=content))
+    return JSONResponse(serialized).body
+
+
+def fast_body(to_json, documents: List[dict]) -> bytes:
+    return response_json.dumps([to_json(document) for document in documents])
+
+
+def per_item_us(func, items: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best / items * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000, help="Documents per response")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing runs per case (best is kept)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    cases = (
+        ("PatientResponse", List[PatientResponse], response_json.patient_json, make_patient),
+        ("UserResponse", List[UserResponse], response_json.user_json, make_user),
+    )
+    results = []
+    for name, response_type, to_json, make in cases:
+        documents = [make(i) for i in range(args.items)]
+        field = create_model_field(name=f"Response_{name}", type_=response_type, mode="serialization")
+        legacy, fast = response_model_body(field, documents), fast_body(to_json, documents)
+        if json.loads(legacy) != json.loads(fast):
+            raise SystemExit(f"❌ {name}: fast output differs from the response_model output")
+        before = per_item_us(lambda: response_model_body(field, documents), args.items, args.repeat)
+        after = per_item_us(lambda: fast_body(to_json, documents), args.items, args.repeat)
+        results.append({
+            "model": name,
+            "items": args.items,
+            "response_model_us_per_item": round(before, 2),
+            "fast_us_per_item": round(after, 2),
+            "speedup": round(before / after, 2) if after else None,
+            "bytes_per_item": round(len(fast) / args.items, 1),
+        })
+
+    if args.json:
+        print(json.dumps({"orjson": response_json.orjson is not None, "results": results}, indent=2))
+        return
+
+    print(f"\n{'model':<18}{'response_model':>16}{'fast':>12}{'speedup':>10}{'bytes/item':>12}")
+    print("-" * 68)
+    for r in results:
+        print(f"{r['model']:<18}{r['response_model_us_per_item']:>14.1f}us{r['fast_us_per_item']:>10.1f}us"
+              f"{r['speedup']:>9.1f}x{r['bytes_per_item']:>12}")
+
+
+if __name__ == "__main__":
+    main()
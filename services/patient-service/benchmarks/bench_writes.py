@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark: patient create/update latency, read-after-write vs. single round trip
+
+Replays the MongoDB calls the backend makes per write, both ways:
+
+    legacy   create: find_one (duplicate check) + insert_one + find_one (read back)
+             update: find_one + find_one (conflict check) + update_one + find_one
+    current  create: insert_one (duplicates rejected by the unique indexes)
+             update: find_one_and_update(return_document=AFTER)
+
+and reports per-write latency and the number of commands sent to the server.
+Insurance validation is left out, it is the same in both paths.
+
+Sử dụng:
+    python3 benchmarks/bench_writes.py                     # 2000 creates + 2000 updates
+    python3 benchmarks/bench_writes.py --writes 10000 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from pymongo import MongoClient, IndexModel, ASCENDING, ReturnDocument, monitoring
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+from patient_search import SEARCH_INDEXES, build_search_fields, build_search_updates  # noqa: E402
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def make_patient(prefix: str, i: int) -> dict:
+    patient = {
+        "full_name": f"Bench Patient {i}",
+        "phone": f"{prefix}{i:08d}",
+        "email": f"{prefix}{i}@bench.local",
+        "date_of_birth": "1985-05-20",
+        "insurance_info": None,
+    }
+    patient.update(build_search_fields(patient))
+    patient["created_at"] = patient["updated_at"] = datetime.utcnow()
+    return patient
+
+
+def legacy_create(collection, patient: dict):
+    if collection.find_one({"$or": [{"email": patient["email"]}, {"phone": patient["phone"]}]}):
+        raise ValueError("duplicate")
+    result = collection.insert_one(patient)
+    return collection.find_one({"_id": result.inserted_id})
+
+
+def current_create(collection, patient: dict):
+    collection.insert_one(patient)
+    return patient
+
+
+def legacy_update(collection, patient_id, changes: dict):
+    existing = collection.find_one({"_id": patient_id})
+    conflict = collection.find_one({"$and": [{"_id": {"$ne": patient_id}}, {"$or": [{"phone": changes["phone"]}]}]})
+    if conflict:
+        raise ValueError("duplicate")
+    update = dict(changes, **build_search_fields({**existing, **changes}), updated_at=datetime.utcnow())
+    collection.update_one({"_id": patient_id}, {"$set": update})
+    return collection.find_one({"_id": patient_id})
+
+
+def current_update(collection, patient_id, changes: dict):
+    update = dict(changes, **build_search_updates(changes), updated_at=datetime.utcnow())
+    return collection.find_one_and_update({"_id": patient_id}, {"$set": update}, return_document=ReturnDocument.AFTER)
+
+
+def measure(counter: CommandCounter, calls) -> dict:
+    latencies = []
+    commands_before = counter.count
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    ordered = sorted(latencies)
+    return {
+        "writes": len(latencies),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+        "p99_ms": round(ordered[int(0.99 * (len(ordered) - 1))], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "commands_per_write": round((counter.count - commands_before) / len(latencies), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongodb-url", default=os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="patient_write_bench")
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    counter = CommandCounter()
+    client = MongoClient(args.mongodb_url, event_listeners=[counter])
+    collection = client[args.database]["patients"]
+    collection.drop()
+    collection.create_indexes([
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("phone", ASCENDING)], unique=True),
+        *SEARCH_INDEXES,
+    ])
+
+    results = {}
+    for mode, create, update, prefix in (
+        ("legacy", legacy_create, legacy_update, "08"),
+        ("current", current_create, current_update, "07"),
+    ):
+        patients = [make_patient(prefix, i) for i in range(args.writes)]
+        results[f"{mode}_create"] = measure(counter, [
+            (lambda p=p: create(collection, p)) for p in patients
+        ])
+        results[f"{mode}_update"] = measure(counter, [
+            (lambda p=p, i=i: update(collection, p["_id"], {"full_name": f"Updated Patient {i}", "phone": f"{prefix}9{i:07d}"}))
+            for i, p in enumerate(patients)
+        ])
+    client.drop_database(args.database)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"\n{'operation':<18}{'p50':>10}{'p95':>10}{'p99':>10}{'mean':>10}{'cmds/write':>12}")
+    print("-" * 70)
+    for name, r in results.items():
+        print(f"{name:<18}{r['p50_ms']:>8.2f}ms{r['p95_ms']:>8.2f}ms{r['p99_ms']:>8.2f}ms"
+              f"{r['mean_ms']:>8.2f}ms{r['commands_per_write']:>12}")
+
+
+if __name__ == "__main__":
+    main()
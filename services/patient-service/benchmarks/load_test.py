@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Load test: mixed workload against the Patient and Insurance APIs
+
+Both FastAPI apps run in this process behind httpx's ASGI transport (the
+Patient Service reaches the Insurance Service the same way), backed either by
+a local MongoDB or by an in-memory mongomock stand-in. The script seeds N
+patients and N insurance cards, drives a concurrent weighted mix of
+
+    list      GET  /api/v1/patients?limit=...
+    search    GET  /api/v1/patients?name=<prefix>
+    create    POST /api/v1/patients (half of them with an insurance card)
+    update    PUT  /api/v1/patients/{id}
+    validate  POST /api/v1/insurance/validate (Insurance Service)
+    login     POST /api/v1/auth/login
+
+and reports p50/p95/p99 latency and requests/sec per operation as JSON.
+Save a run with --output and pass it back with --baseline to see the change
+per operation between two versions.
+
+Sử dụng:
+    python3 benchmarks/load_test.py                                  # mongomock, 2000 requests
+    python3 benchmarks/load_test.py --mongodb-url mongodb://localhost:27017 \\
+        --patients 100000 --cards 100000 --requests 20000 --concurrency 50
+    python3 benchmarks/load_test.py --mix list=5,search=5,validate=10 --output before.json
+    python3 benchmarks/load_test.py --baseline before.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent.parent
+PATIENT_BACKEND_DIR = SERVICES_DIR / "patient-service" / "backend"
+INSURANCE_SERVICE_DIR = SERVICES_DIR / "insurance-service"
+
+OPERATIONS = ("list", "search", "create", "update", "validate", "login")
+DEFAULT_MIX = "list=20,search=25,create=10,update=10,validate=25,login=10"
+
+BENCH_USER = {
+    "email": "load-test@hospital.com",
+    "full_name": "Load Test",
+    "role": "receptionist",
+    "password": "load-test-password",
+    "is_active": True,
+}
+
+SURNAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng"]
+MIDDLE_NAMES = ["Văn", "Thị", "Hữu", "Đức", "Minh", "Ngọc", "Thanh", "Quốc"]
+GIVEN_NAMES = ["An", "Bình", "Cường", "Dũng", "Giang", "Hà", "Hải", "Hạnh", "Hiếu", "Hùng",
+               "Khánh", "Lan", "Linh", "Long", "Mai", "Nam", "Phương", "Quân", "Sơn", "Tâm"]
+HOSPITAL_LEVELS = ["Hạng I", "Hạng II", "Hạng III"]
+ISSUED_PLACES = ["BHXH TP. Hồ Chí Minh", "BHXH Hà Nội", "BHXH Đà Nẵng", "BHXH Cần Thơ"]
+
+
+def load_module(name: str, path: Path):
+    """Import a service's main.py under its own name (both services call it main.py)"""
+    sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_services(args):
+    os.environ["MONGODB_URL"] = args.mongodb_url if args.mongodb_url != "mongomock" else "mongodb://localhost:27017"
+    os.environ.setdefault("SEARCH_BACKFILL_ON_STARTUP", "false")
+    os.environ.setdefault("AUTH_CACHE_WATCH_USERS", "false")
+    if args.bcrypt_rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+
+    insurance = load_module("insurance_main", INSURANCE_SERVICE_DIR / "main.py")
+    patient = load_module("patient_main", PATIENT_BACKEND_DIR / "main.py")
+    insurance.DATABASE_NAME = f"{args.database}_insurance"
+    patient.DATABASE_NAME = args.database
+
+    if args.mongodb_url == "mongomock":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("❌ --mongodb-url mongomock needs 'mongomock-motor' (pip install mongomock-motor)")
+        insurance.AsyncIOMotorClient = AsyncMongoMockClient
+        patient.AsyncIOMotorClient = AsyncMongoMockClient
+
+    # Patient -> Insurance calls go through the in-process Insurance app
+    patient.INSURANCE_SERVICE_URL = "http://insurance-service"
+    create_client = patient.create_insurance_client
+
+    def create_in_process_client() -> httpx.AsyncClient:
+        client = create_client()
+        return httpx.AsyncClient(
+            base_url=patient.INSURANCE_SERVICE_URL,
+            transport=httpx.ASGITransport(app=insurance.app),
+            timeout=client.timeout,
+        )
+
+    patient.create_insurance_client = create_in_process_client
+    return patient, insurance
+
+
+# Seed data
+def make_name(rng: random.Random) -> str:
+    return f"{rng.choice(SURNAMES)} {rng.choice(MIDDLE_NAMES)} {rng.choice(GIVEN_NAMES)}"
+
+
+def make_card(i: int, rng: random.Random, text_size: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "card_number": f"LT{i:013d}",
+        "full_name": make_name(rng),
+        "date_of_birth": datetime(1950 + i % 50, 1 + i % 12, 1 + i % 28),
+        "address": f"{i} Lê Lợi, Q1, TP.HCM ".ljust(text_size, "x"),
+        "issued_place": rng.choice(ISSUED_PLACES),
+        "valid_from": datetime(2024, 1, 1),
+        "valid_to": datetime(2030 if i % 10 else 2020, 12, 31),
+        "coverage_percentage": 80,
+        "hospital_level": rng.choice(HOSPITAL_LEVELS),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def make_patient(patient_module, i: int, card: dict, rng: random.Random, text_size: int) -> dict:
+    patient = {
+        "full_name": card["full_name"] if card else make_name(rng),
+        "phone": f"09{i:08d}",
+        "email": f"patient{i}@loadtest.hospital.vn",
+        "address": f"{i} Nguyễn Trãi, Q5, TP.HCM ".ljust(text_size, "x"),
+        "date_of_birth": card["date_of_birth"].date().isoformat() if card else "1985-05-20",
+        "gender": rng.choice(["male", "female"]),
+        "insurance_info": None,
+    }
+    if card:
+        patient["insurance_info"] = {
+            "card_number": card["card_number"],
+            "is_validated": True,
+            "coverage_percentage": card["coverage_percentage"],
+        }
+    patient.update(patient_module.build_search_fields(patient))
+    patient["created_at"] = patient["updated_at"] = datetime.utcnow()
+    return patient
+
+
+async def insert_batched(collection, documents, batch_size: int = 5000):
+    for start in range(0, len(documents), batch_size):
+        await collection.insert_many(documents[start:start + batch_size], ordered=False)
+
+
+async def seed(patient_module, insurance_module, args, rng: random.Random) -> dict:
+    started = time.perf_counter()
+    cards = [make_card(i, rng, args.text_size) for i in range(args.cards)]
+    await insurance_module.database[insurance_module.COLLECTION_NAME].delete_many({"card_number": {"$regex": "^LT"}})
+    await insert_batched(insurance_module.database[insurance_module.COLLECTION_NAME], cards)
+    await insurance_module.recompute_insurance_stats()
+
+    patients = [
+        make_patient(patient_module, i, cards[i] if i < len(cards) and i % 2 == 0 else None, rng, args.text_size)
+        for i in range(args.patients)
+    ]
+    await patient_module.database[patient_module.COLLECTION_NAME].delete_many({})
+    await insert_batched(patient_module.database[patient_module.COLLECTION_NAME], patients)
+    return {
+        "cards": len(cards),
+        "patients": len(patients),
+        "seconds": round(time.perf_counter() - started, 2),
+        "card_numbers": [c["card_number"] for c in cards],
+        "card_dobs": [c["date_of_birth"].date().isoformat() for c in cards],
+        "patient_ids": [str(p["_id"]) for p in patients],
+    }
+
+
+# Workload
+class Workload:
+    def __init__(self, patient_client, insurance_client, seeded: dict, args, rng: random.Random):
+        self.patient = patient_client
+        self.insurance = insurance_client
+        self.seeded = seeded
+        self.args = args
+        self.rng = rng
+        self.headers = {}
+        self.created = 0
+
+    async def login(self):
+        return await self.patient.post("/api/v1/auth/login", json={
+            "email": BENCH_USER["email"], "password": BENCH_USER["password"],
+        })
+
+    async def prepare(self):
+        response = await self.patient.post("/api/v1/auth/register", json=BENCH_USER)
+        if response.status_code not in (200, 400):
+            raise SystemExit(f"❌ Cannot register load test user: {response.status_code} {response.text}")
+        response = await self.login()
+        if response.status_code != 200:
+            raise SystemExit(f"❌ Cannot log in load test user: {response.status_code} {response.text}")
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def list(self):
+        return await self.patient.get("/api/v1/patients", params={"limit": self.args.page_size}, headers=self.headers)
+
+    async def search(self):
+        prefix = self.rng.choice(SURNAMES) + " " + self.rng.choice(MIDDLE_NAMES)[:2]
+        return await self.patient.get("/api/v1/patients", params={"name": prefix, "limit": 20}, headers=self.headers)
+
+    async def create(self):
+        self.created += 1
+        i = self.created
+        body = {
+            "full_name": make_name(self.rng),
+            "phone": f"08{i:08d}",
+            "email": f"created{i}@loadtest.hospital.vn",
+            "address": "1 Hai Bà Trưng, Q1, TP.HCM".ljust(self.args.text_size, "x"),
+            "date_of_birth": "1985-05-20",
+            "gender": "female",
+        }
+        if i % 2 and self.seeded["card_numbers"]:
+            card = self.rng.randrange(len(self.seeded["card_numbers"]))
+            body["date_of_birth"] = self.seeded["card_dobs"][card]
+            body["insurance_info"] = {"card_number": self.seeded["card_numbers"][card]}
+        return await self.patient.post("/api/v1/patients", json=body, headers=self.headers)
+
+    async def update(self):
+        patient_id = self.rng.choice(self.seeded["patient_ids"])
+        return await self.patient.put(f"/api/v1/patients/{patient_id}", headers=self.headers, json={
+            "address": f"{self.rng.randrange(1000)} Lý Thường Kiệt, Q10, TP.HCM",
+        })
+
+    async def validate(self):
+        card = self.rng.randrange(len(self.seeded["card_numbers"]))
+        return await self.insurance.post("/api/v1/insurance/validate", json={
+            "card_number": self.seeded["card_numbers"][card],
+            "date_of_birth": self.seeded["card_dobs"][card],
+        })
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"❌ Unknown operation '{name}' in --mix (choose from {', '.join(OPERATIONS)})")
+        weights[name] = float(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies_ms, errors: int, elapsed: float) -> dict:
+    return {
+        "count": len(latencies_ms),
+        "errors": errors,
+        "requests_per_second": round(len(latencies_ms) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms), 2) if latencies_ms else 0.0,
+        "mean_ms": round(statistics.fmean(latencies_ms), 2) if latencies_ms else 0.0,
+    }
+
+
+async def drive(workload: Workload, weights: dict, args) -> dict:
+    names = list(weights)
+    schedule = workload.rng.choices(names, weights=[weights[n] for n in names], k=args.requests)
+    queue = asyncio.Queue()
+    for name in schedule:
+        queue.put_nowait(name)
+
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    error_samples = []
+
+    async def worker():
+        while True:
+            try:
+                name = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            response = await getattr(workload, name)()
+            latencies[name].append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors[name] += 1
+                if len(error_samples) < 10:
+                    error_samples.append({"operation": name, "status": response.status_code, "body": response.text[:200]})
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": summarize(all_latencies, sum(errors.values()), elapsed),
+        "operations": {name: summarize(latencies[name], errors[name], elapsed) for name in names},
+        "error_samples": error_samples,
+    }
+
+
+def compare(result: dict, baseline: dict) -> dict:
+    """Relative change per operation vs. a previous --output file (positive = slower / fewer req/s)"""
+    changes = {}
+    for name, current in {"overall": result["overall"], **result["operations"]}.items():
+        previous = baseline["overall"] if name == "overall" else baseline.get("operations", {}).get(name)
+        if not previous:
+            continue
+        changes[name] = {
+            metric: round((current[metric] - previous[metric]) / previous[metric] * 100, 1) if previous[metric] else None
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "requests_per_second")
+        }
+    return changes
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+    patient_module, insurance_module = load_services(args)
+
+    async with insurance_module.app.router.lifespan_context(insurance_module.app), \
+            patient_module.app.router.lifespan_context(patient_module.app):
+        seeded = await seed(patient_module, insurance_module, args, rng)
+        limits = httpx.Limits(max_connections=args.concurrency + 2)
+        async with httpx.AsyncClient(base_url="http://patient-service", limits=limits, timeout=60.0,
+                                     transport=httpx.ASGITransport(app=patient_module.app, raise_app_exceptions=False)) as patient_client, \
+                httpx.AsyncClient(base_url="http://insurance-service", limits=limits, timeout=60.0,
+                                  transport=httpx.ASGITransport(app=insurance_module.app, raise_app_exceptions=False)) as insurance_client:
+            workload = Workload(patient_client, insurance_client, seeded, args, rng)
+            await workload.prepare()
+            result = await drive(workload, weights, args)
+
+        if not args.keep:
+            await patient_module.mongo_client.drop_database(patient_module.DATABASE_NAME)
+            await insurance_module.mongo_client.drop_database(insurance_module.DATABASE_NAME)
+
+    return {
+        "config": {
+            "mongodb": "mongomock" if args.mongodb_url == "mongomock" else "mongodb",
+            "patients": args.patients,
+            "cards": args.cards,
+            "text_size": args.text_size,
+            "page_size": args.page_size,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "mix": weights,
+            "seed": args.seed,
+        },
+        "seed_seconds": seeded["seconds"],
+        **result,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongodb-url", default=os.getenv("LOAD_TEST_MONGODB_URL", "mongomock"),
+                        help="MongoDB server URL, or 'mongomock' for the in-memory stand-in")
+    parser.add_argument("--database", default="hospital_load_test",
+                        help="Throwaway database name (the insurance data goes to <name>_insurance)")
+    parser.add_argument("--patients", type=int, default=2000)
+    parser.add_argument("--cards", type=int, default=2000)
+    parser.add_argument("--text-size", type=int, default=40, help="Length of the seeded address fields")
+    parser.add_argument("--page-size", type=int, default=100, help="limit= for the list operation")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted operations, e.g. list=1,validate=3")
+    parser.add_argument("--bcrypt-rounds", type=int, help="Override BCRYPT_ROUNDS for the login operation")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and request order")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded databases")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="Previous --output file to compare against")
+    args = parser.parse_args()
+
+    # Service startup logs go to stderr so stdout stays a clean JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        result = asyncio.run(run(args))
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["change_vs_baseline_pct"] = compare(result, json.load(f))
+
+    report = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 # frontend/app.py
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, copy_current_request_context, Response, stream_with_context
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from collections import OrderedDict
 import os
+import threading
 from functools import wraps
 
 app = Flask(__name__)
@@ -12,6 +17,58 @@ app.secret_key = 'your-secret-key-here'  # Change in production
 PATIENT_SERVICE_URL = os.getenv('PATIENT_SERVICE_URL', 'http://127.0.0.1:8001')
 INSURANCE_SERVICE_URL = os.getenv('INSURANCE_SERVICE_URL', 'http://127.0.0.1:8002')
 
+# Backend HTTP connection pool
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '50'))
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '2'))
+HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', '0.2'))
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '10'))
+BACKEND_FANOUT_WORKERS = int(os.getenv('BACKEND_FANOUT_WORKERS', '16'))
+
+# Patients fetched by id are kept with their ETag and revalidated with If-None-Match (0 disables)
+PATIENT_CACHE_SIZE = int(os.getenv('PATIENT_CACHE_SIZE', '1000'))
+
+# One adapter (and so one urllib3 pool) shared by every thread; keep-alive connections are reused
+# Only idempotent methods are retried so a patient is never created twice
+http_adapter = HTTPAdapter(
+    pool_connections=HTTP_POOL_CONNECTIONS,
+    pool_maxsize=HTTP_POOL_MAXSIZE,
+    max_retries=Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+        raise_on_status=False,
+    ),
+)
+_thread_local = threading.local()
+
+# Worker threads for independent backend calls made by a single page
+backend_executor = ThreadPoolExecutor(max_workers=BACKEND_FANOUT_WORKERS, thread_name_prefix='backend')
+
+def get_http_session():
+    """
+    Per-thread requests.Session backed by the shared connection pool
+    (Session itself is not thread-safe, the urllib3 pool behind the adapter is)
+    """
+    http_session = getattr(_thread_local, 'http_session', None)
+    if http_session is None:
+        http_session = requests.Session()
+        http_session.mount('http://', http_adapter)
+        http_session.mount('https://', http_adapter)
+        _thread_local.http_session = http_session
+    return http_session
+
+def http_request(method, url, **kwargs):
+    """Send a request through the pooled session with a default timeout"""
+    kwargs.setdefault('timeout', HTTP_TIMEOUT)
+    return get_http_session().request(method.upper(), url, **kwargs)
+
+def run_concurrently(*calls):
+    """Run independent backend calls in parallel; returns their results in order"""
+    futures = [backend_executor.submit(copy_current_request_context(call)) for call in calls]
+    return [future.result() for future in futures]
+
 # Authentication decorator
 def login_required(f):
     @wraps(f)
@@ -46,7 +103,7 @@ def make_authenticated_request(method, url, **kwargs):
         headers['Authorization'] = f"Bearer {session['access_token']}"
         kwargs['headers'] = headers
     
-    response = getattr(requests, method.lower())(url, **kwargs)
+    response = http_request(method, url, **kwargs)
     return response
 
 class InsuranceService:
@@ -55,20 +112,42 @@ class InsuranceService:
     def __init__(self, base_url):
         self.base_url = base_url
     
-    def get_all_cards(self):
-        """Get all insurance cards"""
+    def get_cards(self, limit=50, cursor=None, issued_place=None, card_prefix=None):
+        """Get one page of insurance cards; returns (cards, next_cursor)"""
+        params = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        if issued_place:
+            params['issued_place'] = issued_place
+        if card_prefix:
+            params['card_prefix'] = card_prefix
+        
         try:
-            response = requests.get(f"{self.base_url}/api/v1/insurance/cards")
+            response = http_request('get', f"{self.base_url}/api/v1/insurance/cards", params=params)
             response.raise_for_status()
-            return response.json()
+            return response.json(), response.headers.get('X-Next-Cursor')
         except requests.RequestException as e:
             print(f"Error fetching insurance cards: {e}")
-            return []
+            return [], None
+    
+    def export_cards(self, export_format, issued_place=None, card_prefix=None):
+        """Open a streaming export (csv/ndjson) of insurance cards"""
+        params = {'format': export_format}
+        if issued_place:
+            params['issued_place'] = issued_place
+        if card_prefix:
+            params['card_prefix'] = card_prefix
+        response = http_request(
+            'get', f"{self.base_url}/api/v1/insurance/cards",
+            params=params, stream=True, timeout=(HTTP_TIMEOUT, None)
+        )
+        response.raise_for_status()
+        return response
     
     def get_stats(self):
         """Get insurance statistics"""
         try:
-            response = requests.get(f"{self.base_url}/api/v1/insurance/stats")
+            response = http_request('get', f"{self.base_url}/api/v1/insurance/stats")
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -80,6 +159,9 @@ class PatientService:
     
     def __init__(self, base_url):
         self.base_url = base_url
+        # patient_id -> (etag, patient); shared by every request thread
+        self._patient_cache = OrderedDict()
+        self._patient_cache_lock = threading.Lock()
     
     def get_patients(self, skip=0, limit=100, name=None, phone=None, email=None):
         """Get list of patients with optional filters"""
@@ -100,14 +182,42 @@ class PatientService:
             return []
     
     def get_patient(self, patient_id):
-        """Get a specific patient by ID"""
+        """
+        Get a specific patient by ID
+        A cached copy is revalidated with If-None-Match; on 304 Not Modified it is reused as is
+        """
+        with self._patient_cache_lock:
+            cached = self._patient_cache.get(patient_id)
+        headers = {'If-None-Match': cached[0]} if cached else {}
         try:
-            response = make_authenticated_request('get', f"{self.base_url}/api/v1/patients/{patient_id}")
+            response = make_authenticated_request(
+                'get', f"{self.base_url}/api/v1/patients/{patient_id}", headers=headers
+            )
+            if response.status_code == 304 and cached:
+                with self._patient_cache_lock:
+                    if patient_id in self._patient_cache:
+                        self._patient_cache.move_to_end(patient_id)
+                return cached[1]
             response.raise_for_status()
-            return response.json()
+            patient = response.json()
         except requests.RequestException as e:
+            if getattr(e.response, 'status_code', None) == 404:
+                self._forget_patient(patient_id)
             print(f"Error fetching patient {patient_id}: {e}")
             return None
+        
+        etag = response.headers.get('ETag')
+        if etag and PATIENT_CACHE_SIZE > 0:
+            with self._patient_cache_lock:
+                self._patient_cache[patient_id] = (etag, patient)
+                self._patient_cache.move_to_end(patient_id)
+                while len(self._patient_cache) > PATIENT_CACHE_SIZE:
+                    self._patient_cache.popitem(last=False)
+        return patient
+    
+    def _forget_patient(self, patient_id):
+        with self._patient_cache_lock:
+            self._patient_cache.pop(patient_id, None)
     
     def create_patient(self, patient_data):
         """Create a new patient"""
@@ -143,6 +253,7 @@ class PatientService:
         try:
             response = make_authenticated_request('delete', f"{self.base_url}/api/v1/patients/{patient_id}")
             response.raise_for_status()
+            self._forget_patient(patient_id)
             return True
         except requests.RequestException as e:
             print(f"Error deleting patient {patient_id}: {e}")
@@ -206,34 +317,35 @@ def index():
     email = request.args.get('email', '').strip()
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 10))
+    cursor = request.args.get('cursor') or None
     
-    # Calculate pagination
-    skip = (page - 1) * per_page
+    # Pages are walked with keyset cursors; a bare ?page=N still works through skip
+    skip = 0 if cursor else (page - 1) * per_page
     
-    # Get patients and total count using authenticated requests
+    # Get patients and total count in a single request (/search/page), so there is nothing to fan out
     patients = []
     total = 0
+    total_is_estimate = False
+    next_cursor = None
+    prev_cursor = None
     
     try:
-        patients_response = make_authenticated_request('GET', f"{PATIENT_SERVICE_URL}/api/v1/patients", params={
+        page_response = make_authenticated_request('GET', f"{PATIENT_SERVICE_URL}/api/v1/patients/search/page", params={
             'skip': skip,
             'limit': per_page,
+            'cursor': cursor,
             'name': name or None,
             'phone': phone or None,
             'email': email or None
         })
         
-        if patients_response.status_code == 200:
-            patients = patients_response.json()
-        
-        count_response = make_authenticated_request('GET', f"{PATIENT_SERVICE_URL}/api/v1/patients/search/count", params={
-            'name': name or None,
-            'phone': phone or None,
-            'email': email or None
-        })
-        
-        if count_response.status_code == 200:
-            total = count_response.json().get('total', 0)
+        if page_response.status_code == 200:
+            page_data = page_response.json()
+            patients = page_data.get('items', [])
+            total = page_data.get('total', 0)
+            total_is_estimate = page_data.get('total_is_estimate', False)
+            next_cursor = page_data.get('next_cursor')
+            prev_cursor = page_data.get('prev_cursor')
             
     except Exception as e:
         flash('Lỗi khi tải danh sách bệnh nhân', 'error')
@@ -241,17 +353,20 @@ def index():
     
     # Calculate pagination info
     total_pages = (total + per_page - 1) // per_page if total > 0 else 1
-    has_prev = page > 1
-    has_next = page < total_pages
+    has_prev = prev_cursor is not None
+    has_next = next_cursor is not None
     
     return render_template('patients/index.html', 
                          patients=patients,
                          total=total,
+                         total_is_estimate=total_is_estimate,
                          page=page,
                          per_page=per_page,
                          total_pages=total_pages,
                          has_prev=has_prev,
                          has_next=has_next,
+                         next_cursor=next_cursor,
+                         prev_cursor=prev_cursor,
                          search_name=name,
                          search_phone=phone,
                          search_email=email)
@@ -295,6 +410,7 @@ def new_patient():
 @app.route('/patients/<patient_id>')
 def view_patient(patient_id):
     """View patient details"""
+    # One call: the insurance status shown on the page is stored on the patient document
     patient = patient_service.get_patient(patient_id)
     if not patient:
         flash('Không tìm thấy bệnh nhân!', 'error')
@@ -382,7 +498,7 @@ def manage_insurance(patient_id):
                 else:
                     flash(f'❌ {validation_result["message"]}', 'error')
                 
-                # Refresh patient data to get updated insurance info
+                # Refresh patient data to get updated insurance info (depends on the validation, so sequential)
                 patient = patient_service.get_patient(patient_id)
             else:
                 flash('Không thể kết nối với dịch vụ bảo hiểm!', 'error')
@@ -391,13 +507,52 @@ def manage_insurance(patient_id):
 
 @app.route('/admin/insurance')
 def admin_insurance():
-    """Admin page to view all insurance cards"""
-    cards = insurance_service.get_all_cards()
-    stats = insurance_service.get_stats()
+    """Admin page to view insurance cards (paginated)"""
+    cursor = request.args.get('cursor') or None
+    issued_place = request.args.get('issued_place', '').strip()
+    card_prefix = request.args.get('card_prefix', '').strip()
+    per_page = int(request.args.get('per_page', 50))
+    
+    (cards, next_cursor), stats = run_concurrently(
+        lambda: insurance_service.get_cards(per_page, cursor, issued_place or None, card_prefix or None),
+        insurance_service.get_stats
+    )
     
     # Pass today's date to template for comparison
     from datetime import date
-    return render_template('admin/insurance.html', cards=cards, stats=stats, today=date.today())
+    return render_template('admin/insurance.html',
+                         cards=cards,
+                         stats=stats,
+                         today=date.today(),
+                         next_cursor=next_cursor,
+                         is_first_page=cursor is None,
+                         per_page=per_page,
+                         issued_place=issued_place,
+                         card_prefix=card_prefix)
+
+@app.route('/admin/insurance/export')
+def export_insurance_cards():
+    """Stream an insurance card export (csv or ndjson) from the Insurance Service"""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        export_format = 'csv'
+    
+    try:
+        upstream = insurance_service.export_cards(
+            export_format,
+            request.args.get('issued_place') or None,
+            request.args.get('card_prefix') or None
+        )
+    except requests.RequestException as e:
+        print(f"Error exporting insurance cards: {e}")
+        flash('Không thể xuất dữ liệu thẻ BHYT!', 'error')
+        return redirect(url_for('admin_insurance'))
+    
+    return Response(
+        stream_with_context(upstream.iter_content(chunk_size=64 * 1024)),
+        mimetype=upstream.headers.get('Content-Type', 'text/csv'),
+        headers={'Content-Disposition': f'attachment; filename=insurance_cards.{export_format}'}
+    )
 
 # Error handlers
 @app.errorhandler(404)
@@ -468,7 +623,7 @@ def login():
         
         try:
             # Call login API
-            response = requests.post(f"{PATIENT_SERVICE_URL}/api/v1/auth/login", json={
+            response = http_request('post', f"{PATIENT_SERVICE_URL}/api/v1/auth/login", json={
                 "email": email,
                 "password": password
             })
@@ -508,7 +663,7 @@ def register():
         
         try:
             # Call register API
-            response = requests.post(f"{PATIENT_SERVICE_URL}/api/v1/auth/register", json={
+            response = http_request('post', f"{PATIENT_SERVICE_URL}/api/v1/auth/register", json={
                 "email": email,
                 "full_name": full_name,
                 "role": role,
@@ -1,18 +1,9 @@
 import subprocess
 import sys
-import os
+from pathlib import Path
 
-def run_frontend():
-    print("📱 Starting Frontend Service...")
-    print("🌐 Frontend will run at: http://localhost:5000")
-    print("⏹️  Press Ctrl+C to stop")
-    print("-" * 50)
-    
-    # Set environment variable
-    os.environ['PATIENT_SERVICE_URL'] = 'http://localhost:8001'
-    
-    os.chdir("frontend")
-    subprocess.run([sys.executable, "app.py"])
+# Development: Frontend only, with auto-reload (settings in services.toml)
+LAUNCHER = Path(__file__).resolve().parents[2] / "run-services.py"
 
 if __name__ == "__main__":
-    run_frontend()
\ No newline at end of file
+    sys.exit(subprocess.call([sys.executable, str(LAUNCHER), "start", "--dev", "--only", "frontend"]))